@@ -0,0 +1,15 @@
+"""Pittsfield Township assessment data tools.
+
+    from pittsfield_tax import Dataset
+    Dataset().sales(2026)
+
+Dataset (dataset.py) is imported on first use, so importing one of the
+package's tools does not load the table machinery too.
+"""
+
+
+def __getattr__(name):
+    if name == "Dataset":
+        from pittsfield_tax.dataset import Dataset
+        return Dataset
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
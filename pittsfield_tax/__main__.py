@@ -0,0 +1,6 @@
+"""python -m pittsfield_tax -- the ptax query tool (ptax.py)."""
+import sys
+
+from pittsfield_tax.ptax import main
+
+sys.exit(main())
@@ -0,0 +1,163 @@
+"""Street addresses.
+
+The books spell the same street several ways -- "4562 CHRISTINA DR",
+"3543 Fieldcrest Ln", "1505 LONG MEADOW TRAIL" -- and cut long ones short,
+so "HEATHERWOOD LANE" is printed "HEATHERWOOD L" and "CENTER VALLEY
+DRIVE" "CENTER VALLEY D". normalize_address() folds them to one form:
+upper case, no punctuation, USPS suffix and directional abbreviations (a
+last word that starts only one suffix is taken for it, cut short), and a
+unit as "UNIT n". AddressIndex finds addresses by their trigrams, for partial and
+misspelled queries.
+"""
+import re
+from collections import Counter
+from itertools import chain
+
+_HOUSE_NUMBER = re.compile(r"\d+[A-Z]?\s+")
+
+# Street suffixes (and the spellings the books use) -> USPS abbreviation.
+SUFFIXES = {
+    "AVENUE": "AVE", "AV": "AVE", "AVE": "AVE",
+    "BOULEVARD": "BLVD", "BLV": "BLVD", "BLVD": "BLVD",
+    "CIRCLE": "CIR", "CIRCL": "CIR", "CIRC": "CIR", "CIR": "CIR",
+    "COURT": "CT", "CRT": "CT", "CT": "CT",
+    "CRESCENT": "CRES", "CRESC": "CRES", "CRES": "CRES",
+    "CROSSING": "XING", "CROS": "XING", "XING": "XING",
+    "DRIVE": "DR", "DRIV": "DR", "DRV": "DR", "DR": "DR",
+    "LANE": "LN", "LAN": "LN", "LA": "LN", "LN": "LN",
+    "PARK": "PARK", "PK": "PARK",
+    "PARKWAY": "PKWY", "PKY": "PKWY", "PKWY": "PKWY",
+    "PLACE": "PL", "PL": "PL",
+    "ROAD": "RD", "RD": "RD",
+    "STREET": "ST", "STR": "ST", "ST": "ST",
+    "TERRACE": "TER", "TERR": "TER", "TER": "TER",
+    "TRAIL": "TRL", "TR": "TRL", "TRL": "TRL",
+    "WAY": "WAY", "WA": "WAY",
+}
+_FULL_SUFFIXES = ("AVENUE", "BOULEVARD", "CIRCLE", "COURT", "CRESCENT", "CROSSING", "DRIVE", "LANE", "PARKWAY",
+                  "PLACE", "ROAD", "STREET", "TERRACE", "TRAIL")
+DIRECTIONS = {"NORTH": "N", "SOUTH": "S", "EAST": "E", "WEST": "W"}
+_UNIT_WORDS = {"#", "APT", "UNIT", "STE", "SUITE"}
+
+
+def street_name(address):
+    """The street of an address without its house number: "2673 GROSS RD" -> "GROSS RD"."""
+    address = " ".join(address.upper().split())
+    m = _HOUSE_NUMBER.match(address)
+    return address[m.end():] if m else address
+
+
+def _suffix(word, cut=False):
+    """word's USPS abbreviation if it is a suffix (or, if cut, starts only one), else None."""
+    if word in SUFFIXES:
+        return SUFFIXES[word]
+    if cut:
+        starting = [full for full in _FULL_SUFFIXES if full.startswith(word)]
+        if len(starting) == 1:
+            return SUFFIXES[starting[0]]
+    return None
+
+
+def normalize_address(address):
+    """The one spelling of an address: "4762 North Ashford Wa" -> "4762 N ASHFORD WAY".
+
+    "4190 PACKARD RD 1", "4190 Packard Road #1" and "4190 PACKARD RD APT 1"
+    are all "4190 PACKARD RD UNIT 1".
+    """
+    words = re.sub(r"[.,]", " ", address.upper()).replace("#", " # ").split()
+    unit = None
+    if len(words) > 2 and words[-2] in _UNIT_WORDS:
+        unit, words = words[-1], words[:-2]
+    elif len(words) > 3 and words[-1].isdigit() and _suffix(words[-2]):
+        unit, words = words[-1], words[:-1]
+    if not words:
+        return ""
+    start = 1 if words[0][0].isdigit() else 0
+    # Directionals before and after the street name; the suffix before a trailing one.
+    if len(words) - start > 2 and words[start] in DIRECTIONS:
+        words[start] = DIRECTIONS[words[start]]
+    last = len(words) - 1
+    if last - start > 1 and (words[last] in DIRECTIONS or words[last] in DIRECTIONS.values()):
+        words[last] = DIRECTIONS.get(words[last], words[last])
+        last -= 1
+    if last > start:
+        suffix = _suffix(words[last], cut=last == len(words) - 1)
+        if suffix:
+            words[last] = suffix
+    if unit is not None:
+        words += ["UNIT", unit]
+    return " ".join(words)
+
+
+def trigrams(text):
+    """The set of three-character runs of text, padded so a word's start and end count too."""
+    text = f"  {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class AddressIndex:
+    """Normalized addresses, found by trigrams.
+
+    addresses is a sequence of distinct normalized addresses; search() and
+    containing() return indexes into it. postings maps each trigram to the
+    indexes of the addresses that have it, ascending.
+    """
+
+    # A query's trigrams found in more than this share of addresses ("  1", " DR")
+    # do not nominate candidates; the rarer ones do.
+    COMMON = 0.02
+    # Candidates, by trigrams shared, scored exactly.
+    CANDIDATES = 20
+
+    def __init__(self, addresses):
+        self.addresses = list(addresses)
+        self.postings = {}
+        for i, address in enumerate(self.addresses):
+            for gram in trigrams(address):
+                self.postings.setdefault(gram, []).append(i)
+        self._sets = {}     # common trigram -> set of its postings
+        self._sizes = {}    # address index -> number of trigrams
+
+    def containing(self, text):
+        """Indexes of the addresses containing upper-case text, in order; none for text under three characters.
+
+        A letter or two is part of thousands of addresses, not a way to name any.
+        """
+        if len(text) < 3:
+            return []
+        # Every address containing text has all of text's trigrams; start from the rarest.
+        grams = sorted({text[i:i + 3] for i in range(len(text) - 2)}, key=lambda g: len(self.postings.get(g, ())))
+        if grams[0] not in self.postings:
+            return []
+        found = set(self.postings[grams[0]])
+        for gram in grams[1:]:
+            found.intersection_update(self.postings[gram])
+            if not found:
+                return []
+        return sorted(i for i in found if text in self.addresses[i])
+
+    def search(self, text, limit=5):
+        """(similarity, index) of the addresses nearest normalized text, best first.
+
+        similarity is the Jaccard index of the two trigram sets, 1.0 for the
+        same address. Candidates are the addresses sharing the query's rarer
+        trigrams, so a search touches a few dozen addresses, not all of them.
+        """
+        grams = trigrams(text)
+        common = max(1, int(self.COMMON * len(self.addresses)))
+        rare = [g for g in grams if len(self.postings.get(g, ())) <= common] or list(grams)
+        shared = Counter(chain.from_iterable(self.postings.get(g, ()) for g in rare))
+        others = [self._set(g) for g in grams.difference(rare) if g in self.postings]
+        scored = []
+        for i, n in shared.most_common(self.CANDIDATES):
+            n += sum(i in other for other in others)
+            size = self._sizes.get(i) or self._sizes.setdefault(i, len(trigrams(self.addresses[i])))
+            scored.append((n / (len(grams) + size - n), i))
+        scored.sort(key=lambda s: (-s[0], s[1]))
+        return [(round(score, 3), i) for score, i in scored[:limit]]
+
+    def _set(self, gram):
+        found = self._sets.get(gram)
+        if found is None:
+            found = self._sets[gram] = set(self.postings[gram])
+        return found
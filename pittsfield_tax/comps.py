@@ -0,0 +1,291 @@
+"""Comparable-sales selection by nearest neighbours over the sales and ECF books.
+
+python -m pittsfield_tax.comps PARCEL [PARCEL ...] [-k K] [--as-of YYYY-MM-DD]
+python -m pittsfield_tax.comps --all [-k K] [--csv PATH]
+
+The candidate comparables are the arm's-length sales of every ECF book
+(each sale once, from the latest book that lists it). Every parcel in the
+sales, ECF and land books is a possible subject. Both are described by
+the same feature vector:
+
+    price    log adjusted sale price (a subject's own latest arm's-length sale)
+    date     sale date in years (for subjects, the valuation date)
+    land     log land value
+    cost     log cost-manual value of the building
+    area     ECF area code
+    street   street name
+    style    building style (ONE-STORY, TWO-STORY, ...)
+
+Numeric features are scaled by their spread among the candidates;
+categorical ones are one-hot columns, so a mismatch costs the feature's
+weight. A subject may lack features (no sale, no ECF row); the distance
+is the weighted root mean square over the features it has, so every
+subject is scored on the same scale.
+
+Writing the squared distance as |x|^2 - 2 x.y + |y|^2 turns scoring a
+block of subjects against every candidate into one matrix product;
+batch() scores the whole township block by block.
+"""
+import argparse
+import csv
+import datetime
+import re
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from pittsfield_tax.addresses import street_name
+from pittsfield_tax.parcels import format_parcel, parcel_key
+from pittsfield_tax.ratio_study import ARMS_LENGTH
+from pittsfield_tax.tables import ECF, LAND, SALES, read_rows, sources
+
+NUMERIC = ("price", "date", "land", "cost")
+CATEGORICAL = ("area", "street", "style")
+WEIGHTS = {"price": 1.0, "date": 0.5, "land": 1.0, "cost": 1.5,
+           "area": 2.0, "street": 1.0, "style": 0.5}
+DEFAULT_K = 5
+DEFAULT_BLOCK = 1024
+
+_STYLE = re.compile(r"ONE-STORY|TWO-STORY|BI-LEVEL|TRI-LEVEL|DUPLEX|TOWNHOUSE|MODULAR")
+
+Comp = namedtuple("Comp", "parcel address year sale_date price area style distance")
+Comp.__doc__ = """One comparable sale: parcel, address, ECF book year, sale date, adjusted price,
+ECF area, building style, and its distance from the subject."""
+
+
+def building_style(value):
+    """The style word of an ECF book's Building_Style cell ("'BOR", notes and the like are None)."""
+    m = _STYLE.search(value or "")
+    return m.group(0) if m else None
+
+
+def _years(date):
+    return date.toordinal() / 365.25
+
+
+def _log(value):
+    return np.log(value) if value and value > 0 else None
+
+
+def _candidates(read):
+    """{(parcel key, sale date): row} of arm's-length ECF-book sales, latest book first."""
+    terms = {}
+    for source in sources(SALES):
+        for row in read(source):
+            terms[(parcel_key(row["Parcel_Number"] or ""), row["Sale_Date"])] = (
+                row["Terms_of_Sale"], row["ECF_Area"])
+    found = {}
+    for source in sorted(sources(ECF), key=lambda s: -s.year):
+        for row in read(source):
+            key = (parcel_key(row["Parcel_Number"] or ""), row["Sale_Date"])
+            term, area = terms.get(key, (None, None))
+            if key[0] is None or term != ARMS_LENGTH or key in found:
+                continue
+            if row["Adj_Sale"] and row["Land_Value"] and row["Cost_Man"] and row["Sale_Date"]:
+                found[key] = dict(row, year=source.year, ECF_Area=area or row["ECF_Area_Code"])
+    return found
+
+
+def _subjects(read):
+    """{parcel key: {feature: value}} from every sales, ECF and land row, later years winning."""
+    found = {}
+    for source in sources():
+        if source.table not in (SALES, ECF, LAND):
+            continue
+        for row in read(source):
+            key = parcel_key(row["Parcel_Number"] or "")
+            if key is None:
+                continue
+            features = found.setdefault(key, {})
+            area = row.get("ECF_Area") or row.get("ECF_Area_Code")
+            if area:
+                features["area"] = area
+            if row.get("Street_Address"):
+                features["street"] = street_name(row["Street_Address"])
+                features["address"] = row["Street_Address"]
+            land = row.get("Land_Value") or row.get("Land_Value_Current")
+            if land:
+                features["land"] = _log(land)
+            if row.get("Cost_Man"):
+                features["cost"] = _log(row["Cost_Man"])
+            if building_style(row.get("Building_Style")):
+                features["style"] = building_style(row["Building_Style"])
+            if row.get("Terms_of_Sale") == ARMS_LENGTH and row.get("Adj_Sale") and row.get("Sale_Date"):
+                if row["Sale_Date"] >= features.get("sold", row["Sale_Date"]):
+                    features["sold"] = row["Sale_Date"]
+                    features["price"] = _log(row["Adj_Sale"])
+    return found
+
+
+class CompIndex:
+    """Feature matrices of the candidate sales and of every parcel, ready for distance queries.
+
+    `read` reads a tables.Source's rows; pass a memoized one to share rows
+    already read elsewhere.
+    """
+
+    def __init__(self, as_of=None, read=read_rows):
+        candidates = _candidates(read)
+        self.sales = list(candidates.values())
+        self.sale_keys = np.array([key for key, _ in candidates], dtype=np.int64)
+        if as_of is None:
+            as_of = max(row["Sale_Date"] for row in self.sales)
+        self.as_of = as_of
+
+        subjects = _subjects(read)
+        self.subject_keys = np.array(sorted(subjects), dtype=np.int64)
+        self._position = {int(key): i for i, key in enumerate(self.subject_keys)}
+        self.addresses = [subjects[int(key)].get("address") for key in self.subject_keys]
+
+        sale_features = [{"price": _log(row["Adj_Sale"]), "date": _years(row["Sale_Date"]),
+                          "land": _log(row["Land_Value"]), "cost": _log(row["Cost_Man"]),
+                          "area": row["ECF_Area"], "street": street_name(row["Street_Address"] or ""),
+                          "style": building_style(row["Building_Style"])} for row in self.sales]
+        subject_features = [dict(subjects[int(key)], date=_years(as_of)) for key in self.subject_keys]
+        self._build_columns(sale_features)
+        self.candidates, _ = self._encode(sale_features)
+        self.subjects, self.subject_weight = self._encode(subject_features)
+
+    def _build_columns(self, sale_features):
+        """Fix the column layout, scale and weight of each feature from the candidates."""
+        self.columns, scales, weights = [], [], []
+        for name in NUMERIC:
+            values = np.array([f[name] for f in sale_features], dtype=np.float64)
+            self.columns.append((name, None))
+            scales.append(values.std() or 1.0)
+            weights.append(WEIGHTS[name])
+        for name in CATEGORICAL:
+            for value in sorted({f[name] for f in sale_features if f[name]}):
+                self.columns.append((name, value))
+                scales.append(1.0)
+                # Two one-hot columns differ when the values differ: half the weight each.
+                weights.append(WEIGHTS[name] / 2)
+        self._column = {column: i for i, column in enumerate(self.columns)}
+        self._scales = np.array(scales)
+        self.column_weights = np.array(weights)
+        # Each feature's full weight on its first column only: a subject's mask
+        # times this sums the weights of the features it has.
+        self._feature_weights = np.zeros(len(self.columns))
+        for name in NUMERIC + CATEGORICAL:
+            first = next((j for j, (n, _) in enumerate(self.columns) if n == name), None)
+            if first is not None:
+                self._feature_weights[first] = WEIGHTS[name]
+
+    def _encode(self, features):
+        """(values, mask) matrices of feature dicts; mask is 0 for a feature a row lacks."""
+        values = np.zeros((len(features), len(self.columns)))
+        mask = np.zeros_like(values)
+        for i, f in enumerate(features):
+            for name in NUMERIC:
+                if f.get(name) is not None:
+                    j = self._column[(name, None)]
+                    values[i, j] = f[name] / self._scales[j]
+                    mask[i, j] = 1.0
+            for name in CATEGORICAL:
+                if f.get(name):
+                    mask[i, [j for j, (n, _) in enumerate(self.columns) if n == name]] = 1.0
+                    j = self._column.get((name, f[name]))
+                    if j is not None:
+                        values[i, j] = 1.0
+        return values, mask
+
+    def __len__(self):
+        return len(self.subject_keys)
+
+    def _distances(self, rows):
+        """(len(rows), candidates) distances of subject rows; a parcel's own sales are inf."""
+        x, weight = self.subjects[rows], self.subject_weight[rows] * self.column_weights
+        squared = ((x ** 2) * weight).sum(axis=1)[:, None] - 2 * (x * weight) @ self.candidates.T
+        squared += weight @ (self.candidates ** 2).T
+        total = self.subject_weight[rows] @ self._feature_weights
+        with np.errstate(divide="ignore", invalid="ignore"):
+            distance = np.sqrt(np.maximum(squared, 0) / total[:, None])
+        distance[self.subject_keys[rows][:, None] == self.sale_keys[None, :]] = np.inf
+        return distance
+
+    def _top(self, distance, k):
+        k = min(k, distance.shape[1])
+        nearest = np.argpartition(distance, k - 1, axis=1)[:, :k]
+        order = np.take_along_axis(distance, nearest, axis=1).argsort(axis=1)
+        nearest = np.take_along_axis(nearest, order, axis=1)
+        return nearest, np.take_along_axis(distance, nearest, axis=1)
+
+    def comps(self, parcel, k=DEFAULT_K):
+        """The k nearest arm's-length sales to a parcel (any spelling), nearest first."""
+        row = self._position.get(parcel_key(parcel))
+        if row is None:
+            raise KeyError(f"{parcel} is not in the sales, ECF or land books")
+        nearest, distance = self._top(self._distances(np.array([row])), k)
+        return [self._comp(i, d) for i, d in zip(nearest[0], distance[0])]
+
+    def _comp(self, i, distance):
+        row = self.sales[i]
+        return Comp(format_parcel(int(self.sale_keys[i])), row["Street_Address"], row["year"],
+                    row["Sale_Date"], row["Adj_Sale"], row["ECF_Area"],
+                    building_style(row["Building_Style"]), float(distance))
+
+    def batch(self, k=DEFAULT_K, block=DEFAULT_BLOCK):
+        """(candidate indexes, distances) of every subject's k nearest sales, each (subjects, k)."""
+        k = min(k, len(self.sales))
+        nearest = np.empty((len(self), k), dtype=np.int64)
+        distances = np.empty((len(self), k))
+        for start in range(0, len(self), block):
+            rows = np.arange(start, min(start + block, len(self)))
+            nearest[rows], distances[rows] = self._top(self._distances(rows), k)
+        return nearest, distances
+
+
+def write_batch(index, nearest, distances, path):
+    """Write one row per (subject, comparable) pair."""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Parcel_Number", "Street_Address", "Rank", "Comp_Parcel_Number",
+                         "Comp_Street_Address", "Comp_Sale_Date", "Comp_Adj_Sale", "Comp_ECF_Area",
+                         "Distance"])
+        for s, key in enumerate(index.subject_keys):
+            for rank, (i, d) in enumerate(zip(nearest[s], distances[s]), 1):
+                comp = index._comp(i, d)
+                writer.writerow([format_parcel(int(key)), index.addresses[s] or "", rank, comp.parcel,
+                                 comp.address, comp.sale_date.isoformat(), comp.price, comp.area,
+                                 f"{d:.4f}"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pittsfield_tax.comps",
+                                     description="Nearest arm's-length comparable sales.")
+    parser.add_argument("parcels", nargs="*", help="subject parcel numbers")
+    parser.add_argument("-k", type=int, default=DEFAULT_K, help=f"comparables per parcel (default {DEFAULT_K})")
+    parser.add_argument("--as-of", type=datetime.date.fromisoformat,
+                        help="valuation date sales are dated against (default: latest sale)")
+    parser.add_argument("--all", action="store_true", help="score every parcel in the township")
+    parser.add_argument("--csv", metavar="PATH", help="with --all, write every parcel's comparables")
+    args = parser.parse_args(argv)
+    if not args.parcels and not args.all:
+        parser.error("give parcel numbers or --all")
+
+    index = CompIndex(args.as_of)
+    for parcel in args.parcels:
+        try:
+            comps = index.comps(parcel, args.k)
+        except KeyError as e:
+            print(e.args[0], file=sys.stderr)
+            return 1
+        print(f"{parcel}:")
+        for comp in comps:
+            print(f"  {comp.parcel}  {comp.address:<26} {comp.sale_date:%m/%d/%Y}  "
+                  f"${comp.price:>9,}  {comp.area or '-':<6} {comp.style or '-':<10} {comp.distance:.3f}")
+    if args.all:
+        start = time.perf_counter()
+        nearest, distances = index.batch(args.k)
+        print(f"Scored {len(index)} parcels against {len(index.sales)} sales "
+              f"in {time.perf_counter() - start:.2f}s")
+        if args.csv:
+            write_batch(index, nearest, distances, args.csv)
+            print(f"Wrote {args.csv}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
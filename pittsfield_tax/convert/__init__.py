@@ -0,0 +1 @@
+"""PDF -> CSV conversion helpers shared by the analysis/<year>/convert_*.py scripts."""
@@ -0,0 +1,30 @@
+"""python -m pittsfield_tax.convert <sales|ecf|land|all> [year] [--workers N] [--no-cache] [--prescan]
+    [--export parquet|arrow]
+
+With `all` and/or no year, every matching registered spec is converted in
+one process, which is the fast way to refresh the whole corpus from the
+page cache.
+"""
+import argparse
+
+from pittsfield_tax.convert.cache import cache_from_args
+from pittsfield_tax.convert.engine import add_convert_arguments, convert, spec_from_args
+from pittsfield_tax.convert.specs import DOC_TYPES, get_spec, years
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m pittsfield_tax.convert",
+                                     description="Convert township study book PDFs to CSV.")
+    parser.add_argument("doc_type", choices=DOC_TYPES + ("all",))
+    parser.add_argument("year", type=int, nargs="?",
+                        help="study year (default: every year with layout specs)")
+    add_convert_arguments(parser)
+    args = parser.parse_args()
+    if args.year is not None and args.year not in years():
+        parser.error(f"no layout specs for {args.year}")
+
+    cache = cache_from_args(args)
+    doc_types = DOC_TYPES if args.doc_type == "all" else (args.doc_type,)
+    for year in [args.year] if args.year is not None else years():
+        for doc_type in doc_types:
+            convert(spec_from_args(get_spec(doc_type, year), args), args.workers, cache,
+                    args.prescan, args.export)
@@ -0,0 +1,377 @@
+"""Converter throughput benchmark on synthetic study books.
+
+python -m pittsfield_tax.convert.bench [sales|ecf|land|all] [--scales 1,10,100] [--workers N]
+
+Each document type is re-drawn from the rows already parsed out of a real
+study year's CSVs, with the AnalysisPDF class the appeal-analysis PDFs are
+built with: subdivision header lines, a "Parcel Number" table per
+subdivision and the summary lines, with every value written the way the
+year's LayoutSpec expects to read it. Books are generated at multiples of
+the real book's page count (cycling through the rows) and kept in the
+benchmark directory for later runs.
+
+Every (document, scale) case runs the converter pipeline in a fresh
+process, without the page cache, so peak RSS is the run's own. Results
+are written to a JSON file for comparing runs:
+
+    pages, rows, summaries, seconds, pages_per_s, rows_per_s,
+    peak_rss_mb, worker_peak_rss_mb,
+    stages: prescan, extract, classify, parse, write (seconds)
+
+`extract` is time spent waiting for pdfplumber layout (in the pool, with
+--workers), `classify` is ParsePlan.page_events(), `parse` is stitch(),
+and `write` is the CSV sinks.
+"""
+import argparse
+import csv
+import dataclasses
+import json
+import multiprocessing
+import os
+import platform
+import re
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from pittsfield_tax.convert.cache import CacheStats
+from pittsfield_tax.convert.engine import (
+    EXTRACTIONS, ROW, CsvSink, ParsePlan, csv_path, iter_page_events, pdf_path, summary_path,
+)
+from pittsfield_tax.convert.layout import AREA, AVG, SUB, VALUE, Buckets, Collect, Rest
+from pittsfield_tax.convert.pages import add_workers_argument, page_count
+from pittsfield_tax.convert.probe import ScanStats
+from pittsfield_tax.convert.specs import DOC_TYPES, get_spec, years
+from pittsfield_tax.paths import ANALYSIS_DIR, REPO_ROOT
+
+DEFAULT_BENCH_DIR = os.path.join(ANALYSIS_DIR, ".bench")
+STAGES = ("prescan", "extract", "classify", "parse", "write")
+SCALES = (1, 10, 100)
+
+# The subdivision header line each document type opens a section with,
+# from the section's header state; None when the state is empty (rows
+# before the first header).
+SECTION_HEADERS = {
+    "sales": lambda s: s[SUB] or None,
+    "ecf": lambda s: f"{s[AREA]} - {s[SUB]}" if s[AREA] and s[SUB] else None,
+    "land": lambda s: (f"{s[SUB]} {s[AREA]} "
+                       + (f"AVERAGE ${int(s[AVG]):,}" if s[AVG].isdigit() else "NO CHANGE")
+                       if s[SUB] and s[AREA] else None),
+}
+# Summary line closing a section, from the summary value and study year.
+SUMMARY_LINES = {
+    "ecf": lambda value, year: f"Ave. E.C.F. => {value}",
+    "land": lambda value, year: f"{value} ADJUST {year - 1} LAND VALUE BY",
+}
+_DIGITS = re.compile(r"\d+$")
+
+
+def _money(value, dollar=True):
+    if not _DIGITS.match(value):
+        return value
+    return ("$" if dollar else "") + f"{int(value):,}"
+
+
+def _cell_writers(spec):
+    """(field name, renderer, alignment) for each table column.
+
+    The renderer writes a CSV value the way the book prints it: money with
+    $ and thousands commas, area codes with their leading quote.
+    """
+    writers = [(name, str, "L") for name in ("Parcel_Number", "Street_Address", "Sale_Date")]
+    columns = spec.columns
+    if isinstance(columns, Buckets):
+        writers += [(name, _money, "R") for name in columns.money]
+        writers += [(columns.numeric, str, "R"), (columns.text, str, "L")]
+        return writers
+    for column in columns:
+        if isinstance(column, (Collect, Rest)):
+            writers.append((column.name, str, "L"))
+            continue
+        token = column.token
+        if token.money:
+            writers.append((column.name, lambda v, dollar=bool(token.prefix): _money(v, dollar),
+                            "R"))
+        elif token.strip:
+            writers.append((column.name, lambda v, quote=token.strip: quote + v if v else v, "L"))
+        else:
+            writers.append((column.name, str, "L"))
+    return writers
+
+
+def _read_csv(path):
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def _sections(spec):
+    """The real book's rows grouped into (header state, rows, summary values) sections."""
+    rows = _read_csv(csv_path(spec))
+    summaries = {}
+    if spec.summary is not None and os.path.exists(summary_path(spec)):
+        for record in _read_csv(summary_path(spec)):
+            key = tuple(record[name] for name, src in spec.summary.fields if src != VALUE)
+            value = next(record[name] for name, src in spec.summary.fields if src == VALUE)
+            summaries.setdefault(key, []).append(value)
+    if isinstance(spec.columns, Buckets):
+        # Buckets fill money columns positionally, so a blank one would shift the rest.
+        rows = [r for r in rows if all(r[name] for name in spec.columns.money)]
+
+    sections = []
+    for row in rows:
+        state = {SUB: "", AREA: "", AVG: ""}
+        for name, key in spec.context:
+            state[key] = row[name]
+        if not sections or sections[-1][0] != state:
+            sections.append((state, []))
+        sections[-1][1].append(row)
+    result = []
+    for state, section_rows in sections:
+        values = []
+        if spec.summary is not None:
+            key = tuple(state[src] for _, src in spec.summary.fields if src != VALUE)
+            values = summaries.get(key, [])
+        result.append((state, section_rows, values))
+    return result
+
+
+def generate_book(spec, path, target_pages):
+    """Draw a synthetic copy of spec's study book with at least target_pages pages.
+
+    Returns the number of pages and data rows drawn.
+    """
+    # Imported here so the converter cases, which never draw, do not load fpdf.
+    from pittsfield_tax.reports.pdf import AnalysisPDF
+
+    class StudyBookPDF(AnalysisPDF):
+        def header(self):
+            self.set_font("Helvetica", "B", 10)
+            self.cell(0, 6, f"Synthetic {spec.title}", align="L")
+            self.ln(8)
+
+        def book_table(self, labels, rows, col_widths, aligns, font_size):
+            # Like add_table(), but laid out as the township's spreadsheet
+            # exports are: each header label ends at its column's right edge,
+            # which is where the column-mode converter puts the boundary.
+            self.set_font("Helvetica", "B", font_size)
+            self.set_fill_color(0, 51, 102)
+            self.set_text_color(255, 255, 255)
+            for width, label in zip(col_widths, labels):
+                self.cell(width, 6, label, border=1, fill=True, align="R")
+            self.ln()
+            self.set_text_color(0, 0, 0)
+            self.set_font("Helvetica", "", font_size)
+            for r_idx, row in enumerate(rows):
+                fill = r_idx % 2 == 0
+                if fill:
+                    self.set_fill_color(240, 245, 255)
+                for width, align, value in zip(col_widths, aligns, row):
+                    self.cell(width, 5.5, value, border=1, fill=fill, align=align)
+                self.ln()
+            self.ln(3)
+
+    writers = _cell_writers(spec)
+    labels = [name.replace("_", " ") for name, _, _ in writers]
+    aligns = [align for _, _, align in writers]
+    section_header = SECTION_HEADERS[spec.doc_type]
+    summary_line = SUMMARY_LINES.get(spec.doc_type)
+    sections = _sections(spec)
+    if not sections:
+        raise ValueError(f"{csv_path(spec)} has no rows to draw a {spec.doc_type} book from")
+
+    pdf = StudyBookPDF(orientation="L", format="A3")
+    pdf.alias_nb_pages()
+    pdf.set_auto_page_break(auto=True, margin=20)
+    pdf.add_page()
+
+    # Column widths fit the widest label or value, with room between columns
+    # for the converter to tell them apart.
+    font_size = 8
+    widths = []
+    for i, (name, write, _) in enumerate(writers):
+        pdf.set_font("Helvetica", "B", font_size)
+        width = pdf.get_string_width(labels[i])
+        pdf.set_font("Helvetica", "", font_size)
+        for _, section_rows, _ in sections:
+            for row in section_rows:
+                width = max(width, pdf.get_string_width(write(row[name])))
+        widths.append(width + 6)
+    available = pdf.w - pdf.l_margin - pdf.r_margin
+    if sum(widths) > available:
+        font_size = font_size * available / sum(widths)
+        widths = [w * available / sum(widths) for w in widths]
+
+    drawn = 0
+    while pdf.page_no() < target_pages:
+        for state, section_rows, values in sections:
+            header = section_header(state)
+            if header:
+                pdf.set_font("Helvetica", "B", 10)
+                pdf.cell(0, 7, header, new_x="LMARGIN", new_y="NEXT")
+            cells = [[write(row[name]) for name, write, _ in writers] for row in section_rows]
+            pdf.book_table(labels, cells, widths, aligns, font_size)
+            drawn += len(cells)
+            if summary_line is not None:
+                pdf.set_font("Helvetica", "", 9)
+                for value in values:
+                    pdf.cell(0, 6, summary_line(value, spec.year), new_x="LMARGIN", new_y="NEXT")
+            if pdf.page_no() >= target_pages:
+                break
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pdf.output(path)
+    return pdf.page_no(), drawn
+
+
+def synthetic_spec(spec, scale, bench_dir):
+    """A copy of spec reading and writing its scaled synthetic book in bench_dir."""
+    stem = f"{spec.doc_type}_{spec.year}_x{scale}"
+    return dataclasses.replace(spec, pdf=os.path.join(bench_dir, stem + ".pdf"),
+                               csv=os.path.join(bench_dir, stem + ".csv"))
+
+
+def ensure_book(spec, scale, bench_dir, regenerate=False):
+    """Generate (or reuse) the scaled synthetic book; returns (spec for it, rows drawn)."""
+    book = synthetic_spec(spec, scale, bench_dir)
+    path = pdf_path(book)
+    info_path = path.replace(".pdf", ".json")
+    if regenerate or not (os.path.exists(path) and os.path.exists(info_path)):
+        target = scale * page_count(pdf_path(spec))
+        print(f"Generating {os.path.basename(path)} ({target} pages)...", flush=True)
+        pages, rows = generate_book(spec, path, target)
+        with open(info_path, "w") as f:
+            json.dump({"pages": pages, "rows": rows}, f)
+    with open(info_path) as f:
+        return book, json.load(f)["rows"]
+
+
+def _timed(func, times, stage):
+    def timed(*args):
+        start = time.perf_counter()
+        result = func(*args)
+        times[stage] += time.perf_counter() - start
+        return result
+    return timed
+
+
+def run_case(spec, workers=1):
+    """Convert one book uncached, timing each stage; runs in its own process."""
+    plan = ParsePlan(spec)
+    times = dict.fromkeys(STAGES, 0.0)
+    plan.page_events = _timed(plan.page_events, times, "classify")
+    stats, scan = CacheStats(), ScanStats()
+    state = plan.initial_state()
+    rows = CsvSink(csv_path(spec), plan.fieldnames).open()
+    summaries = CsvSink(summary_path(spec), spec.summary.fieldnames) if spec.summary else None
+
+    start = time.perf_counter()
+    for events in iter_page_events(spec, plan, workers, None, stats, scan):
+        parsed = time.perf_counter()
+        records = list(plan.stitch(events, state))
+        written = time.perf_counter()
+        times["parse"] += written - parsed
+        for kind, record in records:
+            (rows if kind == ROW else summaries).write(record)
+        times["write"] += time.perf_counter() - written
+    closing = time.perf_counter()
+    rows.close()
+    if summaries is not None:
+        summaries.close()
+    end = time.perf_counter()
+    times["write"] += end - closing
+    times["prescan"] = scan.probe_time
+    times["extract"] = scan.extract_time
+
+    seconds = end - start
+    worker_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {
+        "pages": stats.pages,
+        "rows": rows.count,
+        "summaries": summaries.count if summaries is not None else 0,
+        "seconds": round(seconds, 3),
+        "pages_per_s": round(stats.pages / seconds, 2),
+        "rows_per_s": round(rows.count / seconds, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "worker_peak_rss_mb": round(worker_rss / 1024, 1) if worker_rss else None,
+        "stages": {stage: round(t, 3) for stage, t in times.items()},
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _scales(value):
+    try:
+        scales = tuple(int(s) for s in value.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated integers, got {value!r}")
+    if not scales or min(scales) < 1:
+        raise argparse.ArgumentTypeError("scales must be at least 1")
+    return scales
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pittsfield_tax.convert.bench",
+                                     description="Benchmark the converters on synthetic study books.")
+    parser.add_argument("doc_type", nargs="?", default="all", choices=DOC_TYPES + ("all",))
+    parser.add_argument("--year", type=int, default=max(years()),
+                        help="study year whose layout and page counts to copy (default: latest)")
+    parser.add_argument("--scales", type=_scales, default=SCALES,
+                        help="page-count multiples of the real book (default 1,10,100)")
+    add_workers_argument(parser)
+    parser.add_argument("--extraction", choices=EXTRACTIONS,
+                        help="override the spec's extraction mode")
+    parser.add_argument("--bench-dir", default=DEFAULT_BENCH_DIR,
+                        help="where synthetic books and their CSVs are kept "
+                             "(default analysis/.bench)")
+    parser.add_argument("--regenerate", action="store_true",
+                        help="draw the synthetic books again even if they exist")
+    parser.add_argument("--output", help="results JSON (default <bench-dir>/bench-<time>.json)")
+    args = parser.parse_args(argv)
+
+    started = datetime.now(timezone.utc)
+    doc_types = DOC_TYPES if args.doc_type == "all" else (args.doc_type,)
+    results = []
+    for doc_type in doc_types:
+        spec = get_spec(doc_type, args.year)
+        if args.extraction and not isinstance(spec.columns, Buckets):
+            spec = dataclasses.replace(spec, extraction=args.extraction)
+        for scale in args.scales:
+            book, drawn = ensure_book(spec, scale, args.bench_dir, args.regenerate)
+            # A fresh interpreter per case, so peak RSS is this run's alone.
+            with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                result = pool.submit(run_case, book, args.workers).result()
+            result = {"doc_type": doc_type, "year": args.year, "scale": scale,
+                      "extraction": book.extraction, "rows_drawn": drawn, **result}
+            results.append(result)
+            print(f"{doc_type} x{scale}: {result['pages']} pages, {result['rows']} rows in "
+                  f"{result['seconds']:.1f}s ({result['pages_per_s']:.1f} pages/s, "
+                  f"{result['rows_per_s']:.0f} rows/s, peak RSS {result['peak_rss_mb']:.0f} MB)",
+                  flush=True)
+
+    output = args.output or os.path.join(
+        args.bench_dir, started.strftime("bench-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "started": started.isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "workers": args.workers,
+            "results": results,
+        }, f, indent=2)
+        f.write("\n")
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
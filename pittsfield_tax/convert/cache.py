@@ -0,0 +1,141 @@
+"""Content-addressed on-disk cache of per-page extraction and parse results.
+
+Each page is keyed by a SHA-256 of its decoded content streams, so a
+republished PDF with a few corrected pages only needs those pages laid out
+again. A page entry holds what was extracted from the page -- its raw
+extract_text() output, or its extract_words() lines for column-mode specs
+-- plus the events each ParsePlan classified it to (keyed by the plan's
+fingerprint), which is what makes classify_page() results reusable: they
+do not depend on the header state carried in from earlier pages.
+
+A per-document manifest maps the whole file's SHA-256 to its list of page
+keys, so an unchanged PDF is never even opened.
+
+Layout of the cache directory::
+
+    docs/<file sha256>.json             ["<page key>", ...]
+    pages/<kk>/<page key>.<source>.json {"content": ..., "events": {"<plan>": [...]}}
+
+where <source> is "text" or "words". A page the pre-scan (probe.py) found
+nothing to parse on is stored with null content and its "probe" class, so
+it is skipped again without being opened.
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+from pittsfield_tax.paths import ANALYSIS_DIR
+
+DEFAULT_CACHE_DIR = os.path.join(ANALYSIS_DIR, ".convert_cache")
+
+
+def file_digest(path):
+    """SHA-256 of a file's bytes."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _write_json(path, obj):
+    """Write obj to path atomically, so a killed run never leaves a torn entry."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(obj, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class CacheStats:
+    """Per-document counts of how each page was obtained."""
+
+    def __init__(self):
+        self.pages = 0
+        self.parsed_hits = 0    # events reused, nothing recomputed
+        self.text_hits = 0      # extracted content reused, classified again for a new plan
+        self.extracted = 0      # laid out with pdfplumber
+        self.skipped = 0        # not laid out: the pre-scan found nothing to parse
+        self.manifest_hit = False
+
+    def report(self):
+        reused = self.parsed_hits + self.text_hits
+        pct = 100.0 * reused / self.pages if self.pages else 100.0
+        line = (f"Cache: {reused}/{self.pages} pages reused ({pct:.0f}%): "
+                f"{self.parsed_hits} parsed, {self.text_hits} re-parsed, "
+                f"{self.extracted} extracted")
+        if self.skipped:
+            line += f", {self.skipped} skipped"
+        if self.manifest_hit:
+            line += "; PDF unchanged"
+        return line
+
+
+class PageCache:
+    """Per-page text and event cache rooted at `root`."""
+
+    def __init__(self, root=DEFAULT_CACHE_DIR):
+        self.root = root
+
+    def _doc_path(self, digest):
+        return os.path.join(self.root, "docs", digest + ".json")
+
+    def _page_path(self, key, source):
+        return os.path.join(self.root, "pages", key[:2], f"{key}.{source}.json")
+
+    def page_keys(self, pdf_path, stats=None):
+        """Content keys of every page of pdf_path, from the manifest if the file is unchanged."""
+        digest = file_digest(pdf_path)
+        keys = _read_json(self._doc_path(digest))
+        if isinstance(keys, list):
+            if stats is not None:
+                stats.manifest_hit = True
+            return keys
+        from pittsfield_tax.convert.pages import page_digests
+
+        keys = page_digests(pdf_path)
+        _write_json(self._doc_path(digest), keys)
+        return keys
+
+    def has(self, key, source="text"):
+        return os.path.exists(self._page_path(key, source))
+
+    def load(self, key, source="text"):
+        """The cached entry for a page, or None if missing or unreadable."""
+        entry = _read_json(self._page_path(key, source))
+        if isinstance(entry, dict) and "content" in entry:
+            entry.setdefault("events", {})
+            return entry
+        return None
+
+    def store(self, key, entry, source="text"):
+        _write_json(self._page_path(key, source), entry)
+
+
+def add_cache_arguments(parser):
+    """Add the shared --no-cache / --cache-dir options to a converter's argument parser."""
+    parser.add_argument("--no-cache", action="store_true",
+                        help="extract every page again and leave the page cache untouched")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help="page cache directory (default analysis/.convert_cache)")
+
+
+def cache_from_args(args):
+    """The PageCache selected by add_cache_arguments() options, or None."""
+    if args.no_cache:
+        return None
+    return PageCache(args.cache_dir)
@@ -0,0 +1,179 @@
+"""Typed columnar copies of the converted CSVs (Parquet and Arrow IPC).
+
+The CSVs hold every field as text. A typed copy stores money as int64
+dollars, ratios and factors as float64, sale dates as date32, and the
+repetitive subdivision / area / terms / land table names dictionary-encoded.
+Empty cells, and cells that do not read as their type ("#DIV/0!"), become
+nulls. Each field's type follows from its spec: money token classes and
+ECF money buckets are dollars, decimal tokens and summary values are
+ratios.
+
+Arrow IPC files are written uncompressed so they can be memory-mapped
+(open_arrow()); Parquet is the smaller interchange copy.
+
+pyarrow is an optional dependency, imported only when a typed file is
+written or read.
+"""
+import csv
+import os
+import re
+from datetime import date
+
+from pittsfield_tax.convert.layout import AVG, LEAD_FIELDS, VALUE, Buckets, Slot
+
+MONEY = "money"
+RATIO = "ratio"
+DATE = "date"
+CATEGORY = "category"
+TEXT = "text"
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# Low-cardinality text fields, stored as dictionaries.
+CATEGORY_FIELDS = frozenset({
+    "Subdivision", "ECF_Area", "ECF_Area_Code", "Area_Code", "Terms_of_Sale", "Land_Table",
+})
+
+_DATE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{2}|\d{4})$")
+
+
+def require_pyarrow():
+    """The pyarrow module; a RuntimeError naming the package when it is not installed."""
+    try:
+        import pyarrow
+    except ImportError:
+        raise RuntimeError("typed tables need pyarrow (pip install pyarrow)") from None
+    return pyarrow
+
+
+def field_kinds(spec):
+    """Map each field of spec's main CSV to MONEY, RATIO, DATE, CATEGORY or TEXT."""
+    kinds = {name: MONEY if key == AVG else CATEGORY for name, key in spec.context}
+    kinds.update(dict.fromkeys(LEAD_FIELDS, TEXT))
+    kinds["Sale_Date"] = DATE
+    columns = spec.columns
+    if isinstance(columns, Buckets):
+        kinds.update(dict.fromkeys(columns.money, MONEY))
+        kinds[columns.numeric] = RATIO
+        kinds[columns.text] = TEXT
+    else:
+        for column in columns:
+            kind = TEXT
+            if isinstance(column, Slot):
+                if column.token.money:
+                    kind = MONEY
+                elif column.token.name == "decimal":
+                    kind = RATIO
+            kinds[column.name] = kind
+    for name in kinds:
+        if kinds[name] == TEXT and name in CATEGORY_FIELDS:
+            kinds[name] = CATEGORY
+    return kinds
+
+
+def summary_kinds(spec):
+    """Map each field of spec's summary CSV to its kind."""
+    return {name: RATIO if key == VALUE else CATEGORY for name, key in spec.summary.fields}
+
+
+def parse_money(value):
+    """Whole dollars from "$1,234", "1234" or "(1234)" (negative); None if not money."""
+    value = value.replace("$", "").replace(",", "").strip()
+    negative = value.startswith("(") and value.endswith(")")
+    if negative:
+        value = value[1:-1]
+    try:
+        dollars = round(float(value))
+    except ValueError:
+        return None
+    return -dollars if negative else dollars
+
+
+def parse_ratio(value):
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def parse_date(value):
+    """A date from M/D/YYYY or M/D/YY (20YY); None if not a valid date."""
+    m = _DATE.match(value.strip())
+    if m is None:
+        return None
+    month, day, year = (int(g) for g in m.groups())
+    if year < 100:
+        year += 2000
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+_PARSERS = {MONEY: parse_money, RATIO: parse_ratio, DATE: parse_date}
+
+
+def typed_table(rows, kinds):
+    """A pyarrow Table of rows (dicts of CSV strings) typed per `kinds`, in its field order."""
+    pa = require_pyarrow()
+    types = {MONEY: pa.int64(), RATIO: pa.float64(), DATE: pa.date32(),
+             CATEGORY: pa.string(), TEXT: pa.string()}
+    arrays = []
+    for name, kind in kinds.items():
+        parse = _PARSERS.get(kind)
+        values = [row[name] for row in rows]
+        if parse is None:
+            values = [v if v else None for v in values]
+        else:
+            values = [parse(v) if v else None for v in values]
+        array = pa.array(values, type=types[kind])
+        if kind == CATEGORY:
+            array = array.dictionary_encode()
+        arrays.append(array)
+    return pa.Table.from_arrays(arrays, names=list(kinds))
+
+
+def typed_path(path, fmt):
+    """The typed copy of a CSV path in format `fmt` (a FORMATS key)."""
+    return os.path.splitext(path)[0] + FORMATS[fmt]
+
+
+def write_typed(table, path, fmt):
+    """Write a typed table to `path` atomically."""
+    pa = require_pyarrow()
+    tmp = path + ".tmp"
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, tmp)
+    else:
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def read_typed(path):
+    """Read a typed copy written by write_typed(); Arrow files are memory-mapped."""
+    if path.endswith(FORMATS["parquet"]):
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path, memory_map=True)
+    return open_arrow(path)
+
+
+def open_arrow(path):
+    """Memory-map an Arrow IPC file; the table's buffers point into the mapping."""
+    pa = require_pyarrow()
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def export_csv(path, kinds, formats):
+    """Write typed copies of the CSV at `path` in each of `formats`; returns their paths."""
+    with open(path, newline="") as f:
+        table = typed_table(list(csv.DictReader(f)), kinds)
+    written = []
+    for fmt in formats:
+        out = typed_path(path, fmt)
+        write_typed(table, out, fmt)
+        written.append(out)
+    return written
@@ -0,0 +1,783 @@
+"""Compile layout specs into parse plans and run PDF -> CSV conversions.
+
+Every study book is parsed the same way: stripped text lines are
+classified as skipped, summary, data or header lines; data lines are split
+into parcel / street / sale date plus the tokens after the date, which
+the spec's column layout assigns to fields. A ParsePlan compiles all of
+that once, folding the column layout into the data-line regex, so a data
+line costs one regex match instead of a Python loop over its tokens.
+
+Classification does not depend on the running header state, so a page
+classifies to a list of events on its own; stitch() then applies the
+events in page order, filling the subdivision / area context into rows.
+That is also what lets the page cache (cache.py) keep classified events
+per page and reuse them when only some pages of a PDF change.
+
+stitch() yields each row as a plan's Row namedtuple (a Summary for summary
+lines): a tuple in CSV column order, with no per-row dict. Its values are
+interned: a book's subdivision, area, terms, instrument, land table,
+class and rate group columns each hold a few dozen distinct strings over
+thousands of rows, and a sale's Sale_Price and Adj_Sale are usually the
+same, so rows that share a value share one string.
+
+Specs with extraction="columns" read extract_words() output instead: the
+x-boundaries between columns are learned from the table header row, and
+each data line's words are assigned to columns by position. The learned
+boundaries travel through the header state like the subdivision does, so
+pages stay independent and a page without a header row reuses the last
+ones seen in the document.
+"""
+import argparse
+import csv
+import dataclasses
+import hashlib
+import os
+import re
+import sys
+import time
+from bisect import bisect
+from collections import namedtuple
+from functools import lru_cache
+
+from pittsfield_tax.convert.layout import (
+    AREA, AVG, LEAD_FIELDS, SUB, VALUE, Buckets, CapsHeader, Collect, Slot,
+)
+from pittsfield_tax.convert.cache import CacheStats, add_cache_arguments, cache_from_args
+from pittsfield_tax.convert.columnar import FORMATS, export_csv, field_kinds, summary_kinds
+from pittsfield_tax.convert.pages import (
+    add_workers_argument, iter_pages, normalize_dashes, page_count, page_lines, page_text,
+    page_words,
+)
+from pittsfield_tax.convert.probe import DATA, ScanStats
+from pittsfield_tax.paths import year_dir
+
+# Page event kinds.
+STATE = "state"
+ROW = "row"
+SUMMARY = "summary"
+COLUMNS = "columns"     # column x-boundaries learned from a table header row
+CELLS = "cells"         # a data line's positioned words, placed into columns by stitch()
+
+EXTRACTIONS = ("text", "columns")
+
+# Words closer than this fraction of their height belong to the same cell;
+# one space is narrower, the gap between two columns' text is wider. Header
+# labels sit further apart, and their words are sometimes spaced wider.
+# Fragments closer than TOUCHING points are one word that the PDF happens
+# to draw in pieces ("$42" "0,000").
+CELL_GAP_EM = 0.25
+LABEL_GAP_EM = 0.5
+TOUCHING = 0.5
+
+# Bump when a change to this module alters what a spec classifies lines to,
+# so cached page events from older runs are not reused.
+PLAN_VERSION = 1
+
+
+def clean_money(val):
+    if not val:
+        return ""
+    return val.replace("$", "").replace(",", "").strip()
+
+
+def _token_alternatives(token):
+    """Regex alternatives that hold at the start of a token of this class."""
+    alts = [re.escape(p) for p in token.prefix]
+    if token.values:
+        alts.append(r"(?:%s)(?!\S)" % "|".join(re.escape(v) for v in token.values))
+    if token.pattern:
+        pattern = token.pattern
+        if pattern.endswith("$") and not pattern.endswith("\\$"):
+            # "$" ends the token, not the line
+            pattern = pattern[:-1] + r"(?!\S)"
+        alts.append("(?:%s)" % pattern)
+    return alts
+
+
+def _token_regex(*tokens):
+    """Lookahead body matching the start of a token of any of these classes."""
+    return "|".join(alt for token in tokens for alt in _token_alternatives(token))
+
+
+def _caps_header(header):
+    exclude = header.exclude
+    reject = header.reject_prefix
+
+    def rule(line):
+        if (line.isupper() and len(line) > 3 and not (reject and line.startswith(reject))
+                and not any(kw in line for kw in exclude)):
+            return {SUB: line}
+        return None
+    return rule
+
+
+def _regex_header(header):
+    match = re.compile(header.pattern).match
+    reject = header.reject_prefix
+    name, exclude = header.name, header.exclude
+    code, max_code = header.code, header.max_code
+    assign, money = header.assign, header.money
+
+    def rule(line):
+        if reject and line.startswith(reject):
+            return None
+        m = match(line)
+        if m is None:
+            return None
+        groups = [line] + [(g or "").strip() for g in m.groups()]
+        if name and (not groups[name].isupper() or any(kw in groups[name] for kw in exclude)):
+            return None
+        if code and len(groups[code]) > max_code:
+            return None
+        updates = {key: template.format(*groups) for key, template in assign}
+        for key in money:
+            updates[key] = clean_money(updates[key])
+        return updates
+    return rule
+
+
+def _join(text):
+    return " ".join(text.split())
+
+
+def _cells(words, gap_em=CELL_GAP_EM):
+    """Merge a line's [x0, x1, text, height] words into [x0, x1, text] cells."""
+    cells = []
+    for x0, x1, text, height in words:
+        if cells:
+            cell = cells[-1]
+            gap = x0 - cell[1]
+            if gap < TOUCHING:
+                cell[1] = x1
+                cell[2] += text
+                continue
+            if gap <= gap_em * height:
+                cell[1] = x1
+                cell[2] += " " + text
+                continue
+        cells.append([x0, x1, text])
+    return cells
+
+
+def _column_boundaries(words, count):
+    """Column x-boundaries from a header row with `count` labels, or None if it has another count.
+
+    The tables are spreadsheet exports whose text cells are left-aligned
+    and may start right where a right-aligned neighbour ends, so a column
+    ends just past the right edge of its header label rather than midway
+    to the next one; a cell belongs to the first column whose end its
+    midpoint does not pass.
+    """
+    labels = _cells(words, LABEL_GAP_EM)
+    if len(labels) != count:
+        return None
+    margin = CELL_GAP_EM * max(word[3] for word in words)
+    return [label[1] + margin for label in labels[:-1]]
+
+
+def _plain_pattern(pattern):
+    if re.compile(pattern).groups:
+        raise ValueError(f"layout pattern {pattern!r} must not contain capturing groups")
+    return pattern
+
+
+class ParsePlan:
+    """A LayoutSpec compiled into one regex per line kind.
+
+    A data line is matched by a single regex covering the parcel, street,
+    sale date and every column slot after the date, with each slot's group
+    always participating (empty when the slot is absent), so the match
+    groups zip straight onto the field names. Only money columns and
+    multi-token columns need touching up afterwards.
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.fingerprint = hashlib.sha256(
+            f"{PLAN_VERSION}:{spec!r}".encode()).hexdigest()[:16]
+        self.fieldnames = spec.fieldnames
+        self.context = tuple(spec.context)
+        self.Row = namedtuple("Row", self.fieldnames)
+        self.Row.__doc__ = f"One row of the {spec.year} {spec.doc_type} CSV, in column order."
+        self.context_keys = tuple(key for _, key in self.context)
+        self.line_fields = tuple(self.fieldnames[len(self.context):])
+        self.skip_prefixes = tuple(spec.skip_prefixes)
+        self.skip_contains = tuple(spec.skip_contains)
+        self.data_match = re.compile(spec.data_pattern).match
+        self.normalize = spec.normalize_dashes
+        if spec.extraction not in EXTRACTIONS:
+            raise ValueError(f"unknown extraction {spec.extraction!r}; "
+                             f"expected one of {', '.join(EXTRACTIONS)}")
+        self.by_columns = spec.extraction == "columns"
+        self.source = "words" if self.by_columns else "text"
+        self.extract = page_words if self.by_columns else page_text
+        self.column_header = spec.column_header
+        self.date_match = re.compile(_plain_pattern(spec.date_pattern) + "$").match
+
+        parts = [r"(%s)\s+(.*?)\s*(%s)\s*" % (_plain_pattern(spec.parcel_pattern),
+                                             _plain_pattern(spec.date_pattern))]
+        self.names = list(LEAD_FIELDS)
+        self.money = []
+        self.stripped = []
+        self.joined = []
+        # For checking placed cells: the form of a slot after a collected text
+        # column (Class after Land Table), the stop tokens a collected cell
+        # must not hold, and each collect -> slot pair.
+        self.slot_forms = {}
+        self.collect_stops = {}
+        self.glued = []
+        if isinstance(spec.columns, Buckets):
+            if self.by_columns:
+                raise ValueError(f"{spec.doc_type} {spec.year}: column extraction needs "
+                                 "an ordered column layout, not Buckets")
+            self.buckets = True
+            parts.append(r"(.*)")
+            self.blank = dict.fromkeys(spec.column_names, "")
+            self.money_names = spec.columns.money
+            self.numeric_name = spec.columns.numeric
+            self.text_name = spec.columns.text
+            self.decimal = re.compile(r"[\d.]+$").match
+        else:
+            self.buckets = False
+            previous = None
+            for column in spec.columns:
+                if isinstance(column, Slot):
+                    token = column.token
+                    parts.append(r"((?=%s)\S+|)\s*" % _token_regex(token))
+                    if isinstance(previous, Collect):
+                        self.slot_forms[column.name] = re.compile(r"(?=%s)\S+$" % _token_regex(token)).match
+                        self.glued.append((len(self.names) - 1, previous.name, column.name))
+                    if token.money:
+                        self.money.append(column.name)
+                    elif token.strip:
+                        self.stripped.append((column.name, token.strip))
+                elif isinstance(column, Collect):
+                    parts.append(r"((?:(?!%s)\S+\s*)*)" % _token_regex(*column.stop))
+                    self.collect_stops[column.name] = re.compile(r"(?:^|\s)(?=%s)" % _token_regex(*column.stop)).search
+                    self.joined.append(column.name)
+                else:
+                    parts.append(r"(.*)")
+                    self.joined.append(column.name)
+                self.names.append(column.name)
+                previous = column
+        self.row_match = re.compile("".join(parts), re.DOTALL).match
+
+        self.headers = [_caps_header(h) if isinstance(h, CapsHeader) else _regex_header(h)
+                        for h in spec.headers]
+
+        summary = spec.summary
+        self.summary_prefixes = ()
+        self.summary_search = self.summary_match = None
+        if summary is not None:
+            if summary.prefixes:
+                self.summary_prefixes = tuple(summary.prefixes)
+                self.summary_search = re.compile(summary.pattern).search
+                self.emit_prefix = summary.emit_prefix
+            else:
+                self.summary_match = re.compile(summary.pattern).match
+            self.summary_fields = tuple(summary.fields)
+            self.summary_requires = summary.requires
+            self.Summary = namedtuple("Summary", summary.fieldnames)
+            self.Summary.__doc__ = f"One row of the {spec.year} {spec.doc_type} {summary.label} CSV."
+
+        # What the pre-scan (probe.py) takes as a sign of rows or summaries,
+        # and the header state a page's records can inherit from earlier pages.
+        markers = [spec.probe_pattern] + ([summary.pattern] if summary is not None else [])
+        self.probe_search = re.compile("|".join("(?:%s)" % m for m in markers)).search
+        self.state_keys = {key for _, key in self.context}
+        if summary is not None:
+            self.state_keys.update(key for _, key in summary.fields if key != VALUE)
+        if self.by_columns:
+            self.state_keys.add(COLUMNS)
+
+    def initial_state(self):
+        state = {SUB: "", AREA: "", AVG: ""}
+        if self.by_columns:
+            state[COLUMNS] = None
+        return state
+
+    def _bucket_values(self, tail):
+        money = []
+        numeric = []
+        text = []
+        decimal = self.decimal
+        for t in tail.split():
+            if t.startswith("$"):
+                money.append(t)
+            elif decimal(t):
+                numeric.append(t)
+            else:
+                text.append(t)
+        values = dict(self.blank)
+        for name, t in zip(self.money_names, money):
+            values[name] = clean_money(t)
+        if numeric:
+            values[self.numeric_name] = numeric[-1]
+        values[self.text_name] = " ".join(text)
+        return values
+
+    def parse_row(self, line):
+        """Parse a data line into its fields, or None if it has no sale date."""
+        m = self.row_match(line)
+        if m is None:
+            return None
+        groups = m.groups()
+        if self.buckets:
+            row = dict(zip(LEAD_FIELDS, groups))
+            row.update(self._bucket_values(groups[3]))
+            return row
+        row = dict(zip(self.names, groups))
+        for name in self.money:
+            value = row[name]
+            if value:
+                row[name] = value.replace("$", "").replace(",", "")
+        for name, chars in self.stripped:
+            row[name] = row[name].lstrip(chars)
+        for name in self.joined:
+            row[name] = _join(row[name])
+        return row
+
+    def place_cells(self, line, cells, boundaries):
+        """Build a row from a data line's cells using learned column boundaries.
+
+        Each cell goes to the column its midpoint falls in. A collected cell
+        that runs past its column into an empty slot column may end in that
+        slot's token drawn without a space ("AR4-MEADOWS OF AR401" is Land
+        Table "AR4-MEADOWS OF AR" and Class 401); the token is split off.
+        Falls back to parse_row() on the text when no boundaries are known
+        yet or the placed sale date does not look like one, and, when the
+        text parses, when the slot after a collected cell is not one token of
+        its class or a collected cell holds a stop token (Land Table
+        "MEADOWVIEW" and Class "SUB 401"; "CLUSTERS OF MEADO 407").
+        """
+        if boundaries is None:
+            return self.parse_row(line)
+        columns = [[] for _ in self.names]
+        ends = [None] * len(self.names)
+        for x0, x1, text in cells:
+            i = bisect(boundaries, (x0 + x1) / 2)
+            columns[i].append(text)
+            ends[i] = x1
+        row = {name: " ".join(parts) for name, parts in zip(self.names, columns)}
+        if not self.date_match(row["Sale_Date"]):
+            return self.parse_row(line)
+        for i, name, slot in self.glued:
+            if row[slot] or ends[i] is None or i >= len(boundaries) or ends[i] <= boundaries[i]:
+                continue
+            head, _, word = row[name].rpartition(" ")
+            for k in range(1, len(word)):
+                if self.slot_forms[slot](word[k:]):
+                    row[name], row[slot] = f"{head} {word[:k]}".lstrip(), word[k:]
+                    break
+        if any(row[name] and not form(row[name]) for name, form in self.slot_forms.items()) or \
+                any(stop(row[name]) for name, stop in self.collect_stops.items()):
+            parsed = self.parse_row(line)
+            if parsed is not None:
+                return parsed
+        for name in self.money:
+            value = row[name]
+            if value:
+                row[name] = value.replace("$", "").replace(",", "")
+        for name, chars in self.stripped:
+            row[name] = row[name].lstrip(chars)
+        return row
+
+    def classify(self, line, words=None):
+        """Classify one stripped line as a (kind, payload) event, or None.
+
+        In column mode `words` are the line's positioned words, and data
+        lines become CELLS events to be placed by stitch().
+        """
+        if line.startswith(self.skip_prefixes):
+            return None
+        for kw in self.skip_contains:
+            if kw in line:
+                return None
+        if self.summary_prefixes:
+            if line.startswith(self.summary_prefixes):
+                m = self.summary_search(line)
+                if m and line.startswith(self.emit_prefix):
+                    return SUMMARY, m.group(1)
+                return None
+        elif self.summary_match is not None:
+            m = self.summary_match(line)
+            if m:
+                return SUMMARY, m.group(1)
+        if self.data_match(line):
+            if words is not None:
+                return CELLS, [line, _cells(words)]
+            row = self.parse_row(line)
+            return (ROW, row) if row is not None else None
+        for rule in self.headers:
+            updates = rule(line)
+            if updates is not None:
+                return STATE, updates
+        return None
+
+    def classify_page(self, lines):
+        """Events for one page's lines; independent of the header state."""
+        events = []
+        for line in lines:
+            event = self.classify(line)
+            if event is not None:
+                events.append(event)
+        return events
+
+    def classify_words(self, word_lines):
+        """Events for one page's word lines (column mode); independent of the header state."""
+        events = []
+        count = len(self.names)
+        for words in word_lines:
+            if self.normalize:
+                words = [[x0, x1, normalize_dashes(text), h] for x0, x1, text, h in words]
+            line = " ".join(word[2] for word in words)
+            if line.startswith(self.column_header):
+                # A table laid out differently (None) falls back to text parsing.
+                events.append((COLUMNS, _column_boundaries(words, count)))
+                continue
+            event = self.classify(line, words)
+            if event is not None:
+                events.append(event)
+        return events
+
+    def page_events(self, content):
+        """Events for one page's extracted content (`self.extract` output)."""
+        if self.by_columns:
+            return self.classify_words(content)
+        return self.classify_page(page_lines(content, self.normalize))
+
+    def needs_state(self, events, unset):
+        """Whether a page's records depend on header state from before it.
+
+        `unset` holds the state keys no page since then has set; keys this
+        page sets are removed from it. Returns True if a record comes
+        while some are still unset, False once none are, and None when
+        the page leaves the question open (no records, keys still unset).
+        """
+        for kind, payload in events:
+            if kind == STATE:
+                unset.difference_update(payload)
+            elif kind == COLUMNS:
+                unset.discard(COLUMNS)
+            else:
+                return bool(unset)
+        return False if not unset else None
+
+    def record(self, state, fields):
+        """A Row of the header state's context fields and a parsed line's fields."""
+        intern = sys.intern
+        values = [intern(state[key]) for key in self.context_keys]
+        get = fields.get
+        values += [intern(get(name, "")) for name in self.line_fields]
+        return tuple.__new__(self.Row, values)
+
+    def stitch(self, events, state):
+        """Apply events in order, yielding (ROW, Row) and (SUMMARY, Summary) records.
+
+        `state` is the running header state and is updated in place, so
+        it carries from one page's events to the next.
+        """
+        for kind, payload in events:
+            if kind == STATE:
+                state.update(payload)
+            elif kind == ROW:
+                yield ROW, self.record(state, payload)
+            elif kind == CELLS:
+                fields = self.place_cells(payload[0], payload[1], state[COLUMNS])
+                if fields is not None:
+                    yield ROW, self.record(state, fields)
+            elif kind == COLUMNS:
+                state[COLUMNS] = payload
+            elif not (self.summary_requires and not state[self.summary_requires]):
+                yield SUMMARY, tuple.__new__(self.Summary, [payload if key == VALUE else sys.intern(state[key])
+                                                            for _, key in self.summary_fields])
+
+
+@lru_cache(maxsize=None)
+def compile_spec(spec):
+    """Compile a LayoutSpec once per process."""
+    return ParsePlan(spec)
+
+
+def pdf_path(spec):
+    return os.path.join(year_dir(spec.year), spec.pdf)
+
+
+def csv_path(spec):
+    return os.path.join(year_dir(spec.year), spec.csv)
+
+
+def summary_path(spec):
+    return csv_path(spec).replace(".csv", spec.summary.suffix + ".csv")
+
+
+class CsvSink:
+    """Incremental CSV writer for one output file.
+
+    Rows are sequences of values in fieldnames order (a plan's Row or
+    Summary records) and are written as they arrive to a temporary file next to `path`,
+    which replaces `path` only when close() is called, so an interrupted
+    run leaves the previous CSV intact. The file is created on the first
+    row, or by open() for outputs that are written even when empty.
+    """
+
+    def __init__(self, path, fieldnames):
+        self.path = path
+        self.fieldnames = fieldnames
+        self.count = 0
+        self._file = self._writer = None
+
+    def open(self):
+        if self._file is None:
+            self._tmp = self.path + ".tmp"
+            self._file = open(self._tmp, "w", newline="")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(self.fieldnames)
+        return self
+
+    def write(self, row):
+        if self._file is None:
+            self.open()
+        self._writer.writerow(row)
+        self.count += 1
+
+    def close(self):
+        """Finish the file and move it into place; returns whether one was written."""
+        if self._file is None:
+            return False
+        self._file.close()
+        self._file = None
+        os.replace(self._tmp, self.path)
+        return True
+
+    def discard(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            os.unlink(self._tmp)
+
+
+def _timed_next(pages, scan):
+    """next(pages), adding the time it took to the pre-scan's layout timing."""
+    if scan is None:
+        return next(pages)
+    start = time.perf_counter()
+    content = next(pages)
+    scan.extract_time += time.perf_counter() - start
+    scan.extracted += 1
+    return content
+
+
+def iter_page_events(spec, plan, workers=1, cache=None, stats=None, scan=None):
+    """Yield each page's classified events, in page order.
+
+    With a PageCache, pages whose content key is cached are not laid out
+    again, and their events are reused as-is when this plan has seen them
+    before; only the remaining pages go through pdfplumber.
+
+    With a ScanStats (`scan`), those remaining pages are pre-scanned first
+    (probe.py) and only data pages are laid out. A skipped page is held
+    back until the following pages show whether its header state could
+    matter: if a record turns up before every state key has been set
+    again, the held pages are laid out after all and yielded in order.
+    """
+    path = pdf_path(spec)
+    source, extract = plan.source, plan.extract
+    stats = stats if stats is not None else CacheStats()
+    if cache is not None:
+        keys = cache.page_keys(path, stats)
+        todo = [i for i, key in enumerate(keys) if not cache.has(key, source)]
+    else:
+        keys = [None] * page_count(path)
+        todo = list(range(len(keys)))
+    kinds = {}
+    if scan is not None and todo:
+        kinds = {i: kind for i, kind in scan.timed_probe(path, todo, plan.probe_search).items()
+                 if kind != DATA}
+        todo = [i for i in todo if i not in kinds]
+    extracted = iter_pages(path, workers, todo, extract) if todo else iter(())
+    todo = set(todo)
+
+    def lay_out(i):
+        # A held or unreadable page, extracted on its own.
+        stats.extracted += 1
+        return {"content": _timed_next(iter_pages(path, 1, [i], extract), scan), "events": {}}
+
+    def classified(key, entry, fresh):
+        events = entry["events"].get(plan.fingerprint)
+        if events is None:
+            if not fresh:
+                stats.text_hits += 1
+            events = plan.page_events(entry["content"])
+            entry["events"][plan.fingerprint] = events
+            if cache is not None:
+                cache.store(key, entry, source)
+        else:
+            stats.parsed_hits += 1
+        return events
+
+    def drop(item):
+        # A held page whose header state turned out not to matter.
+        _, _, kind, fresh = item
+        scan.skip(kind)
+        if fresh:
+            stats.skipped += 1
+        else:
+            stats.parsed_hits += 1
+
+    held = []       # skipped pages (i, key, kind, fresh) and the events of pages after them
+    for i, key in enumerate(keys):
+        stats.pages += 1
+        fresh = True
+        if i in kinds:
+            entry = {"content": None, "probe": kinds[i], "events": {}}
+            if cache is not None:
+                cache.store(key, entry, source)
+        elif i in todo:
+            entry = {"content": _timed_next(extracted, scan), "events": {}}
+            stats.extracted += 1
+        else:
+            entry = cache.load(key, source)
+            fresh = entry is None or (entry["content"] is None and scan is None)
+            if fresh:
+                entry = lay_out(i)
+
+        if entry["content"] is None:
+            # Track from the latest held page: once every key has been set
+            # since it, none of the held pages' state can reach a record.
+            unset = set(plan.state_keys)
+            held.append((i, key, entry["probe"], fresh))
+            continue
+        events = classified(key, entry, fresh)
+        if not held:
+            yield events
+            continue
+        held.append(events)
+        needed = plan.needs_state(events, unset)
+        if needed is None:
+            continue
+        for item in held:
+            if isinstance(item, list):
+                yield item
+            elif needed:
+                j, held_key, _, _ = item
+                scan.recovered += 1
+                yield classified(held_key, lay_out(j), True)
+            else:
+                drop(item)
+        held = []
+    # Nothing after the held pages used their state.
+    for item in held:
+        if isinstance(item, list):
+            yield item
+        else:
+            drop(item)
+
+
+def iter_records(spec, workers=1, cache=None, stats=None, scan=None):
+    """Yield (ROW, row) and (SUMMARY, row) records for one study book as pages are parsed.
+
+    Only the current page's events are held at a time (plus any pages
+    the pre-scan skipped, until their state is known not to matter), so
+    memory stays bounded by a few pages however long the document is.
+    """
+    plan = compile_spec(spec)
+    state = plan.initial_state()
+    for events in iter_page_events(spec, plan, workers, cache, stats, scan):
+        yield from plan.stitch(events, state)
+
+
+def convert(spec, workers=1, cache=None, prescan=False, exports=()):
+    """Convert one study book PDF to its CSV (and summary CSV, if any).
+
+    Rows are streamed to the output files as they are parsed; returns the
+    number of rows and summary rows written. With `prescan`, pages the
+    pre-scan finds no rows or summaries on are not laid out; it is off by
+    default, since probing every page costs more than the few skipped
+    layouts save, most of all when the page cache already holds them.
+    `exports` lists typed copies to write next to each CSV
+    (columnar.FORMATS keys).
+    """
+    plan = compile_spec(spec)
+    stats = CacheStats()
+    scan = ScanStats() if prescan else None
+    rows = CsvSink(csv_path(spec), plan.fieldnames).open()
+    summaries = CsvSink(summary_path(spec), spec.summary.fieldnames) if spec.summary else None
+    try:
+        for kind, record in iter_records(spec, workers, cache, stats, scan):
+            if kind == ROW:
+                rows.write(record)
+            else:
+                summaries.write(record)
+    except BaseException:
+        rows.discard()
+        if summaries is not None:
+            summaries.discard()
+        raise
+
+    rows.close()
+    print(f"Extracted {rows.count} rows to {rows.path}")
+    outputs = [(rows.path, field_kinds(spec))]
+    if summaries is not None and summaries.close():
+        print(f"Wrote {summaries.count} {spec.summary.label} to {summaries.path}")
+        outputs.append((summaries.path, summary_kinds(spec)))
+    if exports:
+        for path, kinds in outputs:
+            for written in export_csv(path, kinds, exports):
+                print(f"Wrote typed copy to {written}")
+    if spec.doc_type == "ecf":
+        _check_ecf(spec)
+    if scan is not None and (scan.probed or scan.total_skipped):
+        print(scan.report())
+    if cache is not None:
+        print(stats.report())
+    return rows.count, summaries.count if summaries is not None else 0
+
+
+def _check_ecf(spec):
+    """Print the ECF recomputation check of a just-converted ECF book, if NumPy is installed."""
+    try:
+        from pittsfield_tax.ecf import verify_spec
+    except ImportError:
+        return
+    for line in verify_spec(spec):
+        print(line)
+
+
+def add_convert_arguments(parser):
+    """Options shared by every converter entry point."""
+    add_workers_argument(parser)
+    add_cache_arguments(parser)
+    parser.add_argument("--prescan", action="store_true",
+                        help="skip laying out pages a pre-scan of their content "
+                             "finds no rows on")
+    parser.add_argument("--export", action="append", choices=tuple(FORMATS), default=[],
+                        help="also write a typed copy of each CSV in this format "
+                             "(repeatable; needs pyarrow)")
+    parser.add_argument("--extraction", choices=EXTRACTIONS,
+                        help="override the spec's extraction mode: text lines, or "
+                             "words placed by column position")
+
+
+def spec_from_args(spec, args):
+    """Apply add_convert_arguments() overrides to a spec.
+
+    Buckets layouts (the ECF books) have no column order to place words
+    by, so they keep text extraction.
+    """
+    if args.extraction and args.extraction != spec.extraction \
+            and not isinstance(spec.columns, Buckets):
+        spec = dataclasses.replace(spec, extraction=args.extraction)
+    return spec
+
+
+def main(doc_type, year, argv=None):
+    """Command-line entry point used by the analysis/<year>/convert_*.py scripts."""
+    from pittsfield_tax.convert.specs import get_spec
+
+    spec = get_spec(doc_type, year)
+    parser = argparse.ArgumentParser(description=spec.title)
+    add_convert_arguments(parser)
+    args = parser.parse_args(argv)
+    convert(spec_from_args(spec, args), args.workers, cache_from_args(args),
+            args.prescan, args.export)
@@ -0,0 +1,175 @@
+"""Declarative vocabulary for describing a study book's text layout.
+
+A LayoutSpec says what one document type looks like in one year: which
+lines to skip, how subdivision/area headers and summary lines read, and
+what the columns after a parcel's sale date are. Specs carry no parsing
+code; engine.compile_spec() turns them into a ParsePlan.
+"""
+from dataclasses import dataclass
+
+# Header state keys a spec can fill in and copy into rows / summaries.
+SUB = "sub"
+AREA = "area"
+AVG = "avg"
+# Source name for the value captured by a SummaryLine.
+VALUE = "value"
+
+LEAD_FIELDS = ("Parcel_Number", "Street_Address", "Sale_Date")
+
+
+@dataclass(frozen=True)
+class TokenClass:
+    """A kind of whitespace token in a data line.
+
+    A token belongs to the class if it starts with `prefix`, is one of
+    `values`, or matches `pattern` (re.match, so anchor with $ where the
+    whole token must match). `money` tokens are stored without $ and
+    commas; `strip` characters are removed from the left.
+    """
+    name: str
+    prefix: tuple = ()
+    values: tuple = ()
+    pattern: str = ""
+    money: bool = False
+    strip: str = ""
+
+
+MONEY = TokenClass("money", prefix=("$",), money=True)
+AMOUNT = TokenClass("amount", prefix=("$",), pattern=r"[\d,]+$", money=True)
+WHOLE = TokenClass("whole", pattern=r"[\d,]+$", money=True)
+DECIMAL = TokenClass("decimal", pattern=r"[\d.]+$")
+QUOTED_AREA = TokenClass("quoted_area", prefix=("'",), strip="'")
+AREA_CODE = TokenClass("area_code", prefix=("'",), pattern=r"[A-Z]{2,}-?\d", strip="'")
+PARCEL_REF = TokenClass("parcel_ref", prefix=("L",))
+CLASS_CODE = TokenClass("class_code", pattern=r"\d{3}$")
+
+
+def instruments(*codes):
+    """Token class for the deed instrument column (WD, CD, ...)."""
+    return TokenClass("instrument", values=tuple(codes))
+
+
+@dataclass(frozen=True)
+class Slot:
+    """One optional token: taken if the next token is of class `token`."""
+    name: str
+    token: TokenClass
+
+
+@dataclass(frozen=True)
+class Collect:
+    """Tokens up to (not including) the first one of a `stop` class, space-joined."""
+    name: str
+    stop: tuple
+
+
+@dataclass(frozen=True)
+class Rest:
+    """All remaining tokens, space-joined."""
+    name: str
+
+
+@dataclass(frozen=True)
+class Buckets:
+    """Order-free layout used by the ECF books.
+
+    `$` tokens fill `money` fields positionally, the last decimal token is
+    `numeric`, and everything else is joined into `text`.
+    """
+    money: tuple
+    numeric: str
+    text: str
+
+    @property
+    def names(self):
+        return self.money + (self.numeric, self.text)
+
+
+@dataclass(frozen=True)
+class CapsHeader:
+    """An all-caps line longer than three characters sets the subdivision."""
+    exclude: tuple = ()
+    reject_prefix: str = ""
+
+
+@dataclass(frozen=True)
+class RegexHeader:
+    """A header line matched by `pattern` (re.match).
+
+    `assign` pairs header state keys with str.format templates over the
+    stripped groups, e.g. (SUB, "{1} {2}"). If `name` is set, that group
+    must be upper case and contain none of `exclude`; if `code` is set,
+    that group must be at most `max_code` characters. Keys listed in `money` are
+    stored without $ and commas.
+    """
+    pattern: str
+    assign: tuple
+    name: int = 0
+    exclude: tuple = ()
+    code: int = 0
+    max_code: int = 10
+    reject_prefix: str = ""
+    money: tuple = ()
+
+
+@dataclass(frozen=True)
+class SummaryLine:
+    """A per-area summary line written to the side CSV.
+
+    Lines starting with any of `prefixes` are consumed; when `pattern`
+    is found in them (re.search) and the line also starts with
+    `emit_prefix`, a summary row is recorded. With no `prefixes`, lines
+    matching `pattern` (re.match) are consumed and recorded. `fields` maps
+    the side CSV's columns to header state keys or VALUE. If `requires` is
+    set, nothing is recorded while that header state key is empty.
+    """
+    pattern: str
+    fields: tuple
+    suffix: str
+    label: str
+    prefixes: tuple = ()
+    emit_prefix: str = ""
+    requires: str = ""
+
+    @property
+    def fieldnames(self):
+        return [name for name, _ in self.fields]
+
+
+@dataclass(frozen=True)
+class LayoutSpec:
+    """How to read one document type for one study year."""
+    doc_type: str
+    year: int
+    title: str
+    pdf: str
+    csv: str
+    context: tuple
+    columns: object
+    headers: tuple = ()
+    summary: SummaryLine = None
+    skip_prefixes: tuple = ("Parcel Number", "Totals:")
+    skip_contains: tuple = ()
+    date_pattern: str = r"\d{1,2}/\d{1,2}/\d{4}"
+    normalize_dashes: bool = True
+    parcel_pattern: str = r"L\s*-[\d-]+"
+    data_pattern: str = r"L\s*-\d{2}-\d{2}"
+    # data_pattern as probe.py sees raw page strings, where dashes drawn
+    # as glyph ids come out as spaces.
+    probe_pattern: str = r"L\W{1,3}\d{2}\W{1,3}\d{2}\b"
+    # "text" parses extract_text() lines; "columns" assigns extract_words()
+    # words to columns whose x-boundaries are learned from the table header
+    # row starting with `column_header` (one header label per field).
+    extraction: str = "text"
+    column_header: str = "Parcel Number"
+
+    @property
+    def column_names(self):
+        if isinstance(self.columns, Buckets):
+            return self.columns.names
+        return tuple(column.name for column in self.columns)
+
+    @property
+    def fieldnames(self):
+        return [name for name, _ in self.context] + list(LEAD_FIELDS) + list(self.column_names)
+
@@ -0,0 +1,165 @@
+"""Per-page text extraction for the converters, optionally fanned out over a process pool.
+
+pdfplumber's extract_text() dominates conversion time and every page is
+independent, so pages can be laid out in parallel. Parsing still happens
+in the calling process, in page order, so the running subdivision / area
+header state carries across page boundaries exactly as in a serial run.
+
+pdfplumber is imported only when a PDF actually has to be opened, so a
+conversion served entirely from the page cache never pays for it.
+"""
+import hashlib
+import os
+from collections import deque
+from itertools import islice
+
+DASHES = str.maketrans({c: "-" for c in "\u2010\u2011\u2012\u2013\u2014\u2212"})
+
+# Each worker process opens the PDF once and keeps it for all of its pages.
+_worker_pdf = None
+
+
+def open_pdf(pdf_path):
+    import pdfplumber
+
+    return pdfplumber.open(pdf_path)
+
+
+def normalize_dashes(s):
+    """Replace en-dashes and other dash variants with regular hyphens."""
+    return s.translate(DASHES)
+
+
+def page_text(page):
+    """A pdfplumber page's extracted text ("" for an empty page)."""
+    return page.extract_text() or ""
+
+
+def page_words(page, x_tolerance=1, y_tolerance=3):
+    """A pdfplumber page's words grouped into lines, top to bottom.
+
+    Each line is a list of [x0, x1, text, height] words in reading order;
+    the lists are JSON-friendly so they can be kept in the page cache.
+    """
+    lines = []
+    line = None
+    top = None
+    for w in page.extract_words(x_tolerance=x_tolerance):
+        if line is None or abs(w["top"] - top) > y_tolerance:
+            line = []
+            lines.append(line)
+            top = w["top"]
+        line.append([round(w["x0"], 2), round(w["x1"], 2), w["text"],
+                     round(w["bottom"] - w["top"], 2)])
+    return lines
+
+
+def page_lines(text, normalize=False):
+    """Return the stripped, non-empty lines of a page's extracted text."""
+    if normalize:
+        text = normalize_dashes(text)
+    lines = []
+    for line in text.split("\n"):
+        ls = line.strip()
+        if ls:
+            lines.append(ls)
+    return lines
+
+
+def page_digest(page):
+    """Content key of a page: SHA-256 of its page size and decoded content streams."""
+    from pdfminer.pdftypes import resolve1
+
+    h = hashlib.sha256(repr(tuple(page.bbox)).encode())
+    for stream in page.page_obj.contents:
+        stream = resolve1(stream)
+        if stream is not None:
+            h.update(stream.get_data())
+    return h.hexdigest()
+
+
+def page_stream(page):
+    """A pdfplumber page's decoded content streams, joined."""
+    from pdfminer.pdftypes import resolve1
+
+    streams = (resolve1(stream) for stream in page.page_obj.contents)
+    return b"\n".join(stream.get_data() for stream in streams if stream is not None)
+
+
+def page_count(pdf_path):
+    with open_pdf(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def page_digests(pdf_path):
+    """Content keys of every page of pdf_path, in page order."""
+    with open_pdf(pdf_path) as pdf:
+        return [page_digest(page) for page in pdf.pages]
+
+
+def _init_worker(pdf_path):
+    global _worker_pdf
+    _worker_pdf = open_pdf(pdf_path)
+
+
+def _extract_page(job):
+    index, extract = job
+    page = _worker_pdf.pages[index]
+    content = extract(page)
+    page.close()
+    return content
+
+
+def resolve_workers(workers):
+    """Map the --workers value to a process count (0 means one per CPU)."""
+    if workers is None or workers < 0:
+        return 1
+    if workers == 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def iter_pages(pdf_path, workers=1, indices=None, extract=page_text):
+    """Yield extract(page) -- by default its text -- for each page of pdf_path, in page order.
+
+    `indices` restricts extraction to those (ascending) page numbers. With
+    workers > 1 pages are extracted in a process pool; results are still
+    yielded strictly in page order, and only a couple of pages per worker
+    are in flight so a slow consumer does not pile up the whole document.
+    """
+    workers = resolve_workers(workers)
+    with open_pdf(pdf_path) as pdf:
+        if indices is None:
+            indices = range(len(pdf.pages))
+        if workers == 1 or len(indices) < 2:
+            for i in indices:
+                page = pdf.pages[i]
+                yield extract(page)
+                page.close()
+            return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = min(workers, len(indices))
+    pending = iter(indices)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(pdf_path,)) as pool:
+        window = deque(pool.submit(_extract_page, (i, extract))
+                       for i in islice(pending, 2 * workers))
+        while window:
+            content = window.popleft().result()
+            for i in islice(pending, 1):
+                window.append(pool.submit(_extract_page, (i, extract)))
+            yield content
+
+
+def iter_page_lines(pdf_path, workers=1, normalize=False):
+    """Yield the lines of each page of pdf_path, in page order."""
+    for text in iter_pages(pdf_path, workers):
+        yield page_lines(text, normalize)
+
+
+def add_workers_argument(parser):
+    """Add the shared --workers option to a converter's argument parser."""
+    parser.add_argument("--workers", type=int, default=1,
+                        help="extract pages in N worker processes (0 = one per CPU, default 1)")
@@ -0,0 +1,134 @@
+"""Cheap pre-scan that finds pages worth laying out.
+
+Laying a page out (pdfminer's character parsing behind extract_text() and
+extract_words()) is the slow part of a conversion. The township PDFs
+draw their text with plain string operators, so the strings in a page's
+content stream already say whether it holds parcel rows or summary lines;
+reading them costs a few milliseconds a page. Pages are classed as
+
+    data         parcel rows or summary lines -- laid out as usual
+    header-only  text, but no rows (cover, "NO SALES", column headings)
+    empty        no text at all
+
+Only data pages are laid out. A header-only page can still set the
+subdivision for rows on the next page, so the engine lays skipped pages
+out after all when the following data page needs header state from before
+it (ParsePlan.needs_state()); the output never depends on the pre-scan.
+"""
+import re
+import time
+
+from pittsfield_tax.convert.pages import open_pdf, page_stream
+
+DATA = "data"
+HEADER_ONLY = "header-only"
+EMPTY = "empty"
+
+# A text-showing operator: [...] TJ, (...) Tj / ' / ", or <hex> Tj.
+_TEXT_OP = re.compile(
+    rb"\[((?:[^\]\\]|\\.)*)\]\s*TJ"
+    rb"|\(((?:[^)\\]|\\.)*)\)\s*(?:Tj|'|\")"
+    rb"|<[0-9A-Fa-f\s]*>\s*Tj", re.S)
+_TJ_PART = re.compile(rb"\(((?:[^)\\]|\\.)*)\)|<[0-9A-Fa-f\s]*>|(-?[\d.]+)")
+_ESCAPE = re.compile(rb"\\([nrtbf()\\]|[0-7]{1,3})")
+_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f"}
+# TJ adjustments (thousandths of an em) at least this far left are gaps
+# between cells rather than kerning.
+_GAP_ADJUST = -200
+# Form XObjects hide text from the page stream; such pages are never skipped.
+_XOBJECT = re.compile(rb"/[^\s/]+\s+Do\b")
+
+
+def _unescape(m):
+    c = m.group(1)
+    if c[:1].isdigit():
+        return bytes([int(c, 8) & 0xFF])
+    return _ESCAPES.get(c, c)
+
+
+def _literal(raw):
+    return _ESCAPE.sub(_unescape, raw)
+
+
+def probe_text(data):
+    """Approximate text of a page content stream, without layout.
+
+    Literal strings are kept; hex strings (the 2025 books draw spaces and
+    dashes as glyph ids) and wide TJ gaps become spaces, so words and
+    cells stay apart.
+    """
+    parts = []
+    for m in _TEXT_OP.finditer(data):
+        array, single = m.group(1), m.group(2)
+        if single is not None:
+            parts.append(_literal(single))
+        elif array is None:
+            parts.append(b" ")
+        else:
+            for piece in _TJ_PART.finditer(array):
+                if piece.group(1) is not None:
+                    parts.append(_literal(piece.group(1)))
+                elif piece.group(2) is None or float(piece.group(2)) <= _GAP_ADJUST:
+                    parts.append(b" ")
+        parts.append(b" ")
+    return b"".join(parts).decode("latin-1")
+
+
+def classify_stream(data, search):
+    """DATA, HEADER_ONLY or EMPTY for a page's content stream; `search` finds data markers."""
+    if _XOBJECT.search(data):
+        return DATA
+    text = probe_text(data)
+    if search(text):
+        return DATA
+    return HEADER_ONLY if text.strip() else EMPTY
+
+
+def probe_pages(pdf_path, indices, search):
+    """Map each page index in `indices` to its pre-scan class."""
+    kinds = {}
+    with open_pdf(pdf_path) as pdf:
+        for i in indices:
+            page = pdf.pages[i]
+            kinds[i] = classify_stream(page_stream(page), search)
+            page.close()
+    return kinds
+
+
+class ScanStats:
+    """Per-document pre-scan counts and timings."""
+
+    def __init__(self):
+        self.probed = 0
+        self.skipped = {HEADER_ONLY: 0, EMPTY: 0}
+        self.recovered = 0      # skipped, then laid out for header state
+        self.probe_time = 0.0
+        self.extracted = 0
+        self.extract_time = 0.0
+
+    def timed_probe(self, pdf_path, indices, search):
+        start = time.perf_counter()
+        kinds = probe_pages(pdf_path, indices, search)
+        self.probe_time += time.perf_counter() - start
+        self.probed += len(kinds)
+        return kinds
+
+    def skip(self, kind):
+        self.skipped[kind] += 1
+
+    @property
+    def total_skipped(self):
+        return sum(self.skipped.values())
+
+    def report(self):
+        skipped = self.total_skipped
+        line = (f"Pre-scan: {skipped} pages skipped ({self.skipped[HEADER_ONLY]} header-only, "
+                f"{self.skipped[EMPTY]} empty)")
+        if self.recovered:
+            line += f", {self.recovered} laid out for header state"
+        if self.probed:
+            line += f"; probe {self.probe_time:.2f}s"
+            if skipped and self.extracted:
+                saved = skipped * self.extract_time / self.extracted
+                line += f", ~{saved:.2f}s of layout saved"
+        return line
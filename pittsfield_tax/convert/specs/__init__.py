@@ -0,0 +1,35 @@
+"""Per-year layout specs for the township study books.
+
+Each ``yearNNNN`` module in this package defines SALES, ECF and LAND
+LayoutSpecs and lists them in SPECS; modules are discovered automatically,
+so supporting a new study year means adding one module here.
+"""
+import importlib
+import pkgutil
+from functools import lru_cache
+
+DOC_TYPES = ("sales", "ecf", "land")
+
+
+@lru_cache(maxsize=None)
+def registry():
+    """Map (doc_type, year) to its LayoutSpec."""
+    specs = {}
+    for info in pkgutil.iter_modules(__path__):
+        if info.name.startswith("year"):
+            module = importlib.import_module(f"{__name__}.{info.name}")
+            for spec in module.SPECS:
+                specs[(spec.doc_type, spec.year)] = spec
+    return specs
+
+
+def years():
+    return sorted({year for _, year in registry()})
+
+
+def get_spec(doc_type, year):
+    try:
+        return registry()[(doc_type, int(year))]
+    except KeyError:
+        raise ValueError(f"no layout spec for {doc_type} {year}; "
+                         f"available years: {', '.join(map(str, years()))}") from None
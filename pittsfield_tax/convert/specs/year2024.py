@@ -0,0 +1,109 @@
+"""Layouts of the 2024 study books."""
+from pittsfield_tax.convert.layout import (
+    AMOUNT, AREA, AREA_CODE, AVG, CLASS_CODE, DECIMAL, MONEY, PARCEL_REF, QUOTED_AREA,
+    SUB, VALUE, Buckets, CapsHeader, Collect, LayoutSpec, RegexHeader, Rest, Slot,
+    SummaryLine, instruments,
+)
+
+SALES = LayoutSpec(
+    doc_type="sales",
+    year=2024,
+    title="Convert 2024 Residential Sales Analysis PDF to CSV.",
+    pdf="2024%20Residential%20Sale%20Analysis.pdf",
+    csv="2024_Residential_Sales_Analysis.csv",
+    extraction="columns",
+    date_pattern=r"\d{1,2}/\d{1,2}/\d{2,4}",
+    context=(("Subdivision", SUB),),
+    columns=(
+        Slot("Sale_Price", MONEY),
+        Slot("Instr", instruments("WD", "CD", "SD", "PTA", "OTH", "LC", "QC")),
+        Collect("Terms_of_Sale", stop=(MONEY, QUOTED_AREA)),
+        Slot("Adj_Sale", MONEY),
+        Slot("Asd_When_Sold", MONEY),
+        Slot("Asd_Adj_Sale", DECIMAL),
+        Slot("Cur_Appraisal", MONEY),
+        Slot("ECF_Area", QUOTED_AREA),
+        Slot("Other_Parcels_in_Sale", PARCEL_REF),
+        Rest("Land_Table"),
+    ),
+    skip_prefixes=("Parcel Number", "Totals:", "Sale. Ratio", "Std. Dev."),
+    skip_contains=("NO SALES", "NO CHANGE"),
+    headers=(
+        # Subdivision header: all caps, not a column-heading line
+        CapsHeader(exclude=("PARCEL", "TOTALS", "$", "SALE.", "STD.", "ADJ.", "CUR.",
+                            "STREET", "TERMS", "INSTR", "ASD", "ECF", "LAND"),
+                   reject_prefix="L"),
+    ),
+)
+
+ECF = LayoutSpec(
+    doc_type="ecf",
+    year=2024,
+    title="Convert 2024 Residential ECF Analysis PDF to CSV.",
+    pdf="Copy%20of%20RES%20ECF%20ANALYSIS%202024%20-%20website_202404090957495714.pdf",
+    csv="2024_Residential_ECF_Analysis.csv",
+    date_pattern=r"\d{1,2}/\d{1,2}/\d{2,4}",
+    context=(("Subdivision", SUB), ("ECF_Area_Code", AREA)),
+    columns=Buckets(
+        money=("Sale_Price", "Adj_Sale", "Land_Value", "Land_Yard", "Bldg_Residual", "Cost_Man"),
+        numeric="ECF",
+        text="Building_Style",
+    ),
+    headers=(
+        # "AR-4 - ARBOR RIDGE MEADOWS"
+        RegexHeader(r"^([A-Z]{2,5}-?\d*\.?\d*)\s*-\s*(.+)", assign=((AREA, "{1}"), (SUB, "{2}"))),
+        # "ARBOR RIDGE -MEADOWS AR-4"
+        RegexHeader(r"^(.+?)\s+([A-Z]{2,5}-?\d+)\s*$", assign=((SUB, "{1}"), (AREA, "{2}")), name=1),
+    ),
+    summary=SummaryLine(
+        pattern=r"=>\s*([\d.]+)",
+        prefixes=("E.C.F.", "Ave. E.C.F."),
+        emit_prefix="Ave.",
+        requires=AREA,
+        fields=(("ECF_Area", AREA), ("Subdivision", SUB), ("Ave_ECF", VALUE)),
+        suffix="_ECF_Summaries",
+        label="ECF summaries",
+    ),
+)
+
+LAND = LayoutSpec(
+    doc_type="land",
+    year=2024,
+    title="Convert 2024 Residential Land Analysis PDF to CSV.",
+    pdf="2024%20Residential%20Land%20Analysis.pdf",
+    csv="2024_Residential_Land_Analysis.csv",
+    extraction="columns",
+    date_pattern=r"\d{1,2}/\d{1,2}/\d{2,4}",
+    context=(("Subdivision", SUB), ("Area_Code", AREA), ("Avg_Land_Value", AVG)),
+    columns=(
+        Slot("Sale_Price", MONEY),
+        Collect("Terms_of_Sale", stop=(MONEY, QUOTED_AREA)),
+        Slot("Adj_Sale", MONEY),
+        Slot("Land_Residual", MONEY),
+        Slot("Land_Value_2023", MONEY),
+        Slot("Ratio_LV_SP", DECIMAL),
+        Slot("Adj_Land_Value", AMOUNT),
+        Slot("Land_Value_2024", AMOUNT),
+        Slot("Adj_Alloc_Ratio_LV_SP", DECIMAL),
+        Slot("Total_Acres", DECIMAL),
+        Slot("ECF_Area", AREA_CODE),
+        Collect("Land_Table", stop=(CLASS_CODE,)),
+        Slot("Class", CLASS_CODE),
+        Rest("Rate_Group"),
+    ),
+    headers=(
+        # "ARBOR RIDGE MEADOWS AR-4 AVERAGE $99,200" or "... NO CHANGE"
+        RegexHeader(r"^(.+?)\s+([A-Z]{2,5}-?\d*\.?\d*)\s+(?:AVERAGE\s+\$?([\d,]+)|NO\s+CHANGE)",
+                    assign=((SUB, "{1}"), (AREA, "{2}"), (AVG, "{3}")), money=(AVG,),
+                    name=1, code=2,
+                    reject_prefix="L"),
+    ),
+    summary=SummaryLine(
+        pattern=r"([\d.]+)\s*ADJUST\s+2023\s+LAND\s+VALUE\s+BY",
+        fields=(("Area_Code", AREA), ("Subdivision", SUB), ("Adjust_Factor", VALUE)),
+        suffix="_Adjustments",
+        label="adjustment factors",
+    ),
+)
+
+SPECS = (SALES, ECF, LAND)
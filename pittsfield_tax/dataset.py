@@ -0,0 +1,115 @@
+"""The converted study books as one lazily loaded dataset.
+
+    from pittsfield_tax import Dataset
+
+    data = Dataset()
+    data.years()                          # [2024, 2025, 2026]
+    sales = data.sales(2026)              # the 2026 sales CSV as a Table
+    sales.rows[0]["Terms_of_Sale"]        # typed rows, as tables.read_rows() gives them
+    sales["Adj_Sale"]                     # one column as a NumPy array
+    data.land(2025)["Land_Value_Current"]
+
+Nothing is read until a table is asked for, and then only that year's CSV.
+Each CSV is parsed once per process (tables.read_rows(), so columns carry
+the harmonized names -- the land books' Land_Value_<year> columns are
+Land_Value_Prior / Land_Value_Current -- and typed values), however many
+Datasets ask for it; the memo is keyed by the file's size and modification
+time, so a CSV rewritten by a converter is read again. A Table's column
+arrays are built on first access: money and ratios as float64 with NaN for
+empty cells, sale dates as datetime64[D] with NaT, and text as object
+arrays with None. NumPy is imported only then.
+"""
+import os
+
+from pittsfield_tax.convert.columnar import DATE, MONEY, RATIO
+from pittsfield_tax.tables import (
+    ECF, ECF_SUMMARIES, LAND, LAND_ADJUSTMENTS, SALES, TABLES, read_rows, sources,
+)
+
+_loaded = {}    # path -> ((size, mtime), Table)
+
+
+class Table:
+    """One converted CSV: its typed rows, and its columns as arrays on demand."""
+
+    def __init__(self, source, rows):
+        self.source = source
+        self.table = source.table
+        self.year = source.year
+        self.rows = rows
+        self._arrays = {}
+
+    @property
+    def columns(self):
+        """The harmonized column names, in CSV order."""
+        return list(self.source.kinds)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __getitem__(self, column):
+        """A column as an array, built once."""
+        array = self._arrays.get(column)
+        if array is None:
+            kind = self.source.kinds[column]    # KeyError for an unknown column
+            import numpy as np
+
+            values = [row[column] for row in self.rows]
+            if kind in (MONEY, RATIO):
+                array = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            elif kind == DATE:
+                array = np.array(["NaT" if v is None else v for v in values], dtype="datetime64[D]")
+            else:
+                array = np.array(values, dtype=object)
+            array.flags.writeable = False
+            self._arrays[column] = array
+        return array
+
+    def __repr__(self):
+        return f"<Table {self.table} {self.year}: {len(self.rows)} rows>"
+
+
+def load(source):
+    """The Table of a source CSV, read once per process while the file is unchanged."""
+    stat = os.stat(source.path)
+    stamp = (stat.st_size, stat.st_mtime_ns)
+    found = _loaded.get(source.path)
+    if found is None or found[0] != stamp:
+        found = _loaded[source.path] = (stamp, Table(source, read_rows(source)))
+    return found[1]
+
+
+class Dataset:
+    """Every converted table of every study year, each loaded on first use."""
+
+    def years(self, table=None):
+        """The study years with a table (any table by default)."""
+        return sorted({s.year for s in sources(table)})
+
+    def table(self, table, year):
+        """The Table of one table (tables.TABLES) for one study year."""
+        if table not in TABLES:
+            raise ValueError(f"unknown table {table!r}; expected one of {', '.join(TABLES)}")
+        found = sources(table, int(year))
+        if not found:
+            raise ValueError(f"no {table} table for {year}; "
+                             f"available years: {', '.join(map(str, self.years(table)))}")
+        return load(found[0])
+
+    def sales(self, year):
+        return self.table(SALES, year)
+
+    def ecf(self, year):
+        return self.table(ECF, year)
+
+    def land(self, year):
+        return self.table(LAND, year)
+
+    def ecf_summaries(self, year):
+        return self.table(ECF_SUMMARIES, year)
+
+    def land_adjustments(self, year):
+        return self.table(LAND_ADJUSTMENTS, year)
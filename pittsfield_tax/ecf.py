@@ -0,0 +1,182 @@
+"""Recompute ECFs from the ECF books and check the extracted values.
+
+python -m pittsfield_tax.ecf [year ...] [--tolerance T] [--list] [--strict]
+
+A sale's ECF (economic condition factor) is its building residual over
+its cost-manual value, Bldg_Residual / Cost_Man. The converters take the
+ECF column to be the last decimal on the line, which on some rows is a
+different number altogether (45, 53, ...). This stage loads every ECF row
+into NumPy arrays and, in one vectorized pass over all years,
+
+- recomputes each row's ECF and flags rows whose extracted value
+  disagrees with it, and
+- recomputes every (year, area) group's mean ECF and its weighted ECF
+  (sum of residuals over sum of cost-manual values), and checks each
+  "Ave. E.C.F." line of the summaries CSV against them.
+
+A book can print several average lines for one area, each over a subset
+of its sales, so a summary line counts as confirmed when it matches
+either figure.
+"""
+import argparse
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+from pittsfield_tax.tables import ECF, ECF_SUMMARIES, read_rows, sources, spec_sources
+
+DEFAULT_TOLERANCE = 0.001
+
+RowCheck = namedtuple("RowCheck", "recomputed flagged unrecomputable")
+AreaStats = namedtuple("AreaStats", "keys count mean weighted")
+SummaryCheck = namedtuple("SummaryCheck", "keys value mean weighted matches_mean matches_weighted")
+
+
+def _floats(values):
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+class EcfRows:
+    """The ECF books' rows as column arrays, in source order."""
+
+    def __init__(self, sources_rows):
+        year, area, parcel, residual, cost, ecf = [], [], [], [], [], []
+        for source, rows in sources_rows:
+            year += [source.year] * len(rows)
+            for row in rows:
+                area.append(row["ECF_Area_Code"] or "")
+                parcel.append(row["Parcel_Number"] or "")
+                residual.append(row["Bldg_Residual"])
+                cost.append(row["Cost_Man"])
+                ecf.append(row["ECF"])
+        self.year = np.array(year, dtype=np.int32)
+        self.area = np.array(area, dtype=object)
+        self.parcel = np.array(parcel, dtype=object)
+        self.residual = _floats(residual)
+        self.cost = _floats(cost)
+        self.ecf = _floats(ecf)
+
+    @classmethod
+    def load(cls, years=None):
+        return cls([(s, read_rows(s)) for s in sources(ECF) if years is None or s.year in years])
+
+    def __len__(self):
+        return len(self.year)
+
+
+def recompute(rows):
+    """Bldg_Residual / Cost_Man per row; NaN where either is missing or the cost is not positive."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(rows.cost > 0, rows.residual / rows.cost, np.nan)
+
+
+def check_rows(rows, tolerance=DEFAULT_TOLERANCE):
+    """Recomputed ECFs, which rows disagree with the extracted ECF, and which cannot be recomputed."""
+    recomputed = recompute(rows)
+    unrecomputable = np.isnan(recomputed)
+    with np.errstate(invalid="ignore"):
+        flagged = ~unrecomputable & ~(np.abs(recomputed - rows.ecf) <= tolerance)
+    return RowCheck(recomputed, flagged, unrecomputable)
+
+
+def area_stats(rows, recomputed=None):
+    """Per (year, area) sale count, mean ECF and weighted ECF over the recomputable rows."""
+    if recomputed is None:
+        recomputed = recompute(rows)
+    years, year_idx = np.unique(rows.year, return_inverse=True)
+    areas, area_idx = np.unique(rows.area.astype(str), return_inverse=True)
+    groups, group = np.unique(year_idx * len(areas) + area_idx, return_inverse=True)
+    valid = ~np.isnan(recomputed)
+    count = np.bincount(group, weights=valid, minlength=len(groups))
+    total = np.bincount(group, weights=np.where(valid, recomputed, 0.0), minlength=len(groups))
+    residual = np.bincount(group, weights=np.where(valid, rows.residual, 0.0), minlength=len(groups))
+    cost = np.bincount(group, weights=np.where(valid, rows.cost, 0.0), minlength=len(groups))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = total / count
+        weighted = residual / cost
+    keys = [(int(years[g // len(areas)]), str(areas[g % len(areas)])) for g in groups]
+    return AreaStats(keys, count.astype(np.int64), mean, weighted)
+
+
+def check_summaries(stats, summaries, tolerance=DEFAULT_TOLERANCE):
+    """Check (year, area, Ave_ECF) summary lines against the recomputed area figures."""
+    position = {key: i for i, key in enumerate(stats.keys)}
+    keys = [(year, area) for year, area, _ in summaries]
+    found = np.array([position.get(key, -1) for key in keys], dtype=np.int64)
+    value = _floats([v for _, _, v in summaries])
+    missing = found < 0
+    mean = np.where(missing, np.nan, stats.mean[found])
+    weighted = np.where(missing, np.nan, stats.weighted[found])
+    with np.errstate(invalid="ignore"):
+        return SummaryCheck(keys, value, mean, weighted, np.abs(value - mean) <= tolerance,
+                            np.abs(value - weighted) <= tolerance)
+
+
+def load_summaries(years=None):
+    """(year, area, Ave_ECF) for every ECF summary line."""
+    return [(s.year, row["ECF_Area"] or "", row["Ave_ECF"])
+            for s in sources(ECF_SUMMARIES) if years is None or s.year in years
+            for row in read_rows(s)]
+
+
+def report(rows, summaries, tolerance=DEFAULT_TOLERANCE):
+    """Per-year report lines for the row and summary checks."""
+    checked = check_rows(rows, tolerance)
+    stats = area_stats(rows, checked.recomputed)
+    summary = check_summaries(stats, summaries, tolerance)
+    summary_years = np.array([year for year, _ in summary.keys], dtype=np.int32)
+    lines = []
+    for year in np.unique(rows.year):
+        in_year = rows.year == year
+        line = (f"ECF {year}: {int(checked.flagged[in_year].sum())} of {int(in_year.sum())} rows "
+                f"disagree with Bldg_Residual / Cost_Man")
+        unrecomputable = int(checked.unrecomputable[in_year].sum())
+        if unrecomputable:
+            line += f", {unrecomputable} cannot be recomputed"
+        lines.append(line)
+        in_year = summary_years == year
+        if in_year.any():
+            by_mean = summary.matches_mean[in_year]
+            by_weighted = summary.matches_weighted[in_year] & ~by_mean
+            neither = int((~by_mean & ~by_weighted).sum())
+            lines.append(f"  area averages: {int(by_mean.sum())} of {int(in_year.sum())} match the "
+                         f"mean ECF, {int(by_weighted.sum())} the weighted ECF, {neither} neither")
+    return lines
+
+
+def verify_spec(spec, tolerance=DEFAULT_TOLERANCE):
+    """Report lines checking one ECF book's converted CSVs (used after each conversion)."""
+    found = spec_sources(spec)
+    rows = EcfRows([(found[0], read_rows(found[0]))])
+    summaries = []
+    if len(found) > 1:
+        summaries = [(spec.year, row["ECF_Area"] or "", row["Ave_ECF"]) for row in read_rows(found[1])]
+    return report(rows, summaries, tolerance)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pittsfield_tax.ecf",
+                                     description="Recompute ECFs and check the converted values.")
+    parser.add_argument("years", type=int, nargs="*", help="study years (default: all)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"allowed difference from the recomputed value (default {DEFAULT_TOLERANCE})")
+    parser.add_argument("--list", action="store_true", help="list the disagreeing rows")
+    parser.add_argument("--strict", action="store_true",
+                        help="exit with status 1 if any row disagrees")
+    args = parser.parse_args(argv)
+    years = set(args.years) or None
+
+    rows = EcfRows.load(years)
+    for line in report(rows, load_summaries(years), args.tolerance):
+        print(line)
+    checked = check_rows(rows, args.tolerance)
+    if args.list:
+        for i in np.flatnonzero(checked.flagged):
+            print(f"{rows.year[i]} {rows.parcel[i]} {rows.area[i] or '-'}: extracted "
+                  f"{rows.ecf[i]:g}, Bldg_Residual / Cost_Man = {checked.recomputed[i]:.3f}")
+    return 1 if args.strict and checked.flagged.any() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""Every parcel's rows in every study year, joined, as one columnar file.
+
+python -m pittsfield_tax.history [--path PATH]
+
+The appeal analyses cross-reference a sale from book to book by hand --
+3984 Palisades Blvd has ECF 0.869 in the 2025 book and 0.875 in 2026. The
+history (analysis/parcel_history.arrow) holds one row per parcel and study
+year in which any of the sales, ECF or land books lists the parcel, with
+that year's figures side by side:
+
+    parcel_key, Parcel_Number, year, Street_Address, ECF_Area, Subdivision
+    sales      Sale_Date, Adj_Sale, Terms_of_Sale, Asd_When_Sold,
+               Cur_Appraisal, Book_Sales (the book's rows for the parcel)
+    ECF        Land_Value, Bldg_Residual, Cost_Man, ECF, Building_Style
+    land       Land_Residual, Land_Value_Prior, Land_Value_Current, Total_Acres
+    changes    ECF_Prior and ECF_Drift (against the parcel's ECF in the last
+               earlier book that has one), Land_Value_Change (current minus
+               prior land value), Adjust_Factor (the area's land adjustment
+               factor that year) and Land_Factor_Applied (current over prior
+               land value: the factor this parcel's land actually got)
+
+ECF is Bldg_Residual / Cost_Man, as the reports compute it; the printed
+column is not always the ECF. When a book lists a parcel more than once
+(it sold twice), the latest sale's row is used. The sale columns come from
+the ECF or land book when the sales book does not list the parcel. A
+year's ECF area is the sales or land book's code, else the ECF book's.
+
+The file is Arrow IPC, uncompressed and sorted by parcel and year, so it
+is memory-mapped and a parcel's rows are one contiguous slice found by a
+binary search on parcel_key. Like the ptax snapshot it records the size
+and modification time of every CSV it was built from, and load_history()
+rebuilds it when a CSV has changed. It needs pyarrow (and NumPy).
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+
+from pittsfield_tax.convert.columnar import (
+    CATEGORY, DATE, MONEY, RATIO, TEXT, open_arrow, require_pyarrow, write_typed,
+)
+from pittsfield_tax.parcels import format_parcel, parcel_key
+from pittsfield_tax.paths import ANALYSIS_DIR, REPO_ROOT
+from pittsfield_tax.tables import ECF, LAND, LAND_ADJUSTMENTS, SALES, sources
+
+DEFAULT_HISTORY_PATH = os.path.join(ANALYSIS_DIR, "parcel_history.arrow")
+HISTORY_VERSION = 1
+
+KEY = "key"
+YEAR = "year"
+COUNT = "count"
+
+# Column -> kind, in file order.
+COLUMNS = {
+    "parcel_key": KEY, "Parcel_Number": TEXT, "year": YEAR, "Street_Address": TEXT,
+    "ECF_Area": CATEGORY, "Subdivision": CATEGORY,
+    "Sale_Date": DATE, "Adj_Sale": MONEY, "Terms_of_Sale": CATEGORY, "Asd_When_Sold": MONEY,
+    "Cur_Appraisal": MONEY, "Book_Sales": COUNT,
+    "Land_Value": MONEY, "Bldg_Residual": MONEY, "Cost_Man": MONEY, "ECF": RATIO, "Building_Style": CATEGORY,
+    "Land_Residual": MONEY, "Land_Value_Prior": MONEY, "Land_Value_Current": MONEY, "Total_Acres": RATIO,
+    "ECF_Prior": RATIO, "ECF_Drift": RATIO, "Land_Value_Change": MONEY, "Adjust_Factor": RATIO,
+    "Land_Factor_Applied": RATIO,
+}
+# The columns each book contributes, as the tables name them.
+SALES_COLUMNS = ("Sale_Date", "Adj_Sale", "Terms_of_Sale", "Asd_When_Sold", "Cur_Appraisal")
+ECF_COLUMNS = ("Land_Value", "Bldg_Residual", "Cost_Man", "Building_Style")
+LAND_COLUMNS = ("Land_Residual", "Land_Value_Prior", "Land_Value_Current", "Total_Acres")
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _latest(rows):
+    """The row of the latest sale among a book's rows for one parcel."""
+    return max(rows, key=lambda row: row["Sale_Date"] or datetime.date.min) if rows else None
+
+
+def _first(rows, name):
+    """The first non-empty value of a column among rows (None rows skipped)."""
+    return next((row[name] for row in rows if row is not None and row.get(name)), None)
+
+
+def _ecf(row):
+    if row is None or row["Bldg_Residual"] is None or not row["Cost_Man"]:
+        return None
+    return row["Bldg_Residual"] / row["Cost_Man"]
+
+
+def history_records(found):
+    """(parcel key, year) -> column values, for the typed rows of the sources in found.
+
+    found is [(source, rows)] of sales, ECF, land and land adjustment
+    sources; the records come back sorted by parcel and year.
+    """
+    books, factors = {}, {}
+    for source, rows in found:
+        if source.table == LAND_ADJUSTMENTS:
+            for row in rows:
+                factors.setdefault((source.year, row["Area_Code"]), row["Adjust_Factor"])
+            continue
+        for row in rows:
+            key = parcel_key(row["Parcel_Number"] or "")
+            if key is not None:
+                books.setdefault((key, source.year), {}).setdefault(source.table, []).append(row)
+
+    records = {}
+    prior_ecf = {}      # parcel key -> its ECF in the latest book so far
+    for (key, year), listed in sorted(books.items()):
+        sales, ecf, land = (_latest(listed.get(table)) for table in (SALES, ECF, LAND))
+        record = dict.fromkeys(COLUMNS)
+        record.update(parcel_key=key, Parcel_Number=format_parcel(key), year=year,
+                      Street_Address=_first((sales, land, ecf), "Street_Address"),
+                      ECF_Area=_first((sales, land), "ECF_Area") or _first((ecf,), "ECF_Area_Code"),
+                      Subdivision=_first((sales, land, ecf), "Subdivision"),
+                      Book_Sales=len(listed.get(SALES, ())))
+        for row, names in ((sales, SALES_COLUMNS), (ecf, ECF_COLUMNS), (land, LAND_COLUMNS)):
+            if row is not None:
+                record.update((name, row.get(name)) for name in names)
+        # The ECF and land books list the sale too, when the sales book does not.
+        for name in ("Sale_Date", "Adj_Sale", "Terms_of_Sale"):
+            if record[name] is None:
+                record[name] = _first((ecf, land), name)
+
+        record["ECF"] = _ecf(ecf)
+        if record["ECF"] is not None:
+            record["ECF_Prior"] = prior_ecf.get(key)
+            if record["ECF_Prior"] is not None:
+                record["ECF_Drift"] = record["ECF"] - record["ECF_Prior"]
+            prior_ecf[key] = record["ECF"]
+        prior, current = record["Land_Value_Prior"], record["Land_Value_Current"]
+        if prior is not None and current is not None:
+            record["Land_Value_Change"] = current - prior
+            if prior:
+                record["Land_Factor_Applied"] = current / prior
+        area = _first((land,), "Area_Code") or record["ECF_Area"]
+        record["Adjust_Factor"] = factors.get((year, area))
+        records[(key, year)] = record
+    return records
+
+
+def build_history():
+    """The history of the current CSVs as a pyarrow Table, with its sources in the schema metadata."""
+    pa = require_pyarrow()
+    from pittsfield_tax.dataset import load
+
+    found = [s for s in sources() if s.table in (SALES, ECF, LAND, LAND_ADJUSTMENTS)]
+    records = list(history_records([(s, load(s).rows) for s in found]).values())
+    types = {KEY: pa.int64(), YEAR: pa.int16(), COUNT: pa.int16(), MONEY: pa.int64(), RATIO: pa.float64(),
+             DATE: pa.date32(), CATEGORY: pa.string(), TEXT: pa.string()}
+    arrays = []
+    for name, kind in COLUMNS.items():
+        array = pa.array([record[name] for record in records], type=types[kind])
+        arrays.append(array.dictionary_encode() if kind == CATEGORY else array)
+    metadata = {"version": str(HISTORY_VERSION),
+                "sources": json.dumps([[os.path.relpath(s.path, REPO_ROOT)] + _stamp(s.path) for s in found])}
+    return pa.Table.from_arrays(arrays, names=list(COLUMNS), metadata=metadata)
+
+
+def save_history(table, path=DEFAULT_HISTORY_PATH):
+    write_typed(table, path, "arrow")
+
+
+class ParcelHistory:
+    """The memory-mapped history file; rows() reads one parcel's years."""
+
+    def __init__(self, table):
+        self.table = table
+        # Zero-copy: the key column's buffer is the mapped file.
+        self._keys = table.column("parcel_key").to_numpy()
+
+    def __len__(self):
+        return self.table.num_rows
+
+    def slice(self, key):
+        """The parcel's rows as a pyarrow Table (empty if no book lists it)."""
+        import numpy as np
+
+        lo, hi = np.searchsorted(self._keys, [key, key + 1])
+        return self.table.slice(lo, hi - lo)
+
+    def rows(self, key):
+        """The parcel's rows as dicts, oldest study year first."""
+        return self.slice(key).to_pylist()
+
+
+def read_history(path=DEFAULT_HISTORY_PATH):
+    """The saved history, or None if it is missing, stale or from another version."""
+    try:
+        table = open_arrow(path)
+    except (OSError, ValueError):
+        return None
+    metadata = table.schema.metadata or {}
+    if metadata.get(b"version") != str(HISTORY_VERSION).encode():
+        return None
+    for relpath, size, mtime in json.loads(metadata[b"sources"]):
+        try:
+            if _stamp(os.path.join(REPO_ROOT, relpath)) != [size, mtime]:
+                return None
+        except OSError:
+            return None
+    return ParcelHistory(table)
+
+
+def load_history(path=DEFAULT_HISTORY_PATH):
+    """The history, rebuilt and saved first if missing or stale."""
+    history = read_history(path)
+    if history is None:
+        save_history(build_history(), path)
+        history = read_history(path)
+        if history is None:
+            raise RuntimeError(f"{path} could not be read back after rebuilding it")
+    return history
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pittsfield_tax.history",
+                                     description="Build the cross-year parcel history from the CSVs.")
+    parser.add_argument("--path", default=DEFAULT_HISTORY_PATH,
+                        help="history file (default analysis/parcel_history.arrow)")
+    args = parser.parse_args(argv)
+    table = build_history()
+    save_history(table, args.path)
+    print(f"Wrote {args.path}: {table.num_rows} parcel-years of "
+          f"{len(set(table.column('parcel_key').to_pylist()))} parcels")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
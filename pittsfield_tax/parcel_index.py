@@ -0,0 +1,132 @@
+"""Prebuilt index from parcel key to its rows in every sales, ECF and land CSV.
+
+python -m pittsfield_tax.parcel_index [--path PATH]
+
+A parcel's three-year history is spread over nine CSVs. The index maps
+each packed parcel key (parcels.parcel_key()) to the (source, row offset)
+pairs it appears at, so finding a parcel's rows is one dict lookup rather
+than a scan of every file. Row offsets count data rows from 0, in file
+order, which is also the order tables.read_rows() returns them in.
+
+The index is saved as JSON alongside the size and modification time of
+each CSV it covers; load_index() rebuilds it when any of them changed.
+"""
+import argparse
+import csv
+import json
+import os
+
+from pittsfield_tax.parcels import parcel_key
+from pittsfield_tax.paths import ANALYSIS_DIR, REPO_ROOT
+from pittsfield_tax.tables import ECF, LAND, SALES, read_rows, sources
+
+DEFAULT_INDEX_PATH = os.path.join(ANALYSIS_DIR, "parcel_index.json")
+INDEX_VERSION = 1
+INDEXED_TABLES = (SALES, ECF, LAND)
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+class ParcelIndex:
+    """Parcel key -> [(source number, row offset), ...] over the sales, ECF and land CSVs."""
+
+    def __init__(self, sources, entries):
+        self.sources = sources
+        self.entries = entries
+        self._rows = {}
+
+    @classmethod
+    def build(cls):
+        found = [s for s in sources() if s.table in INDEXED_TABLES]
+        entries = {}
+        for number, source in enumerate(found):
+            with open(source.path, newline="") as f:
+                for offset, record in enumerate(csv.DictReader(f)):
+                    key = parcel_key(record["Parcel_Number"])
+                    if key is not None:
+                        entries.setdefault(key, []).append((number, offset))
+        return cls(found, entries)
+
+    def save(self, path=DEFAULT_INDEX_PATH):
+        data = {
+            "version": INDEX_VERSION,
+            "sources": [[s.table, s.year, os.path.relpath(s.path, REPO_ROOT), _stamp(s.path)]
+                        for s in self.sources],
+            # Each hit packs into one int: source number * 1,000,000 + row offset.
+            "parcels": {str(key): [n * 1_000_000 + offset for n, offset in hits]
+                        for key, hits in self.entries.items()},
+        }
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_PATH):
+        """The saved index, or None if it is missing, stale or from another version."""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        current = [s for s in sources() if s.table in INDEXED_TABLES]
+        saved = data.get("sources", [])
+        if data.get("version") != INDEX_VERSION or len(saved) != len(current):
+            return None
+        for source, (table, year, relpath, stamp) in zip(current, saved):
+            if (source.table, source.year) != (table, year) \
+                    or os.path.relpath(source.path, REPO_ROOT) != relpath:
+                return None
+            if not os.path.exists(source.path) or _stamp(source.path) != stamp:
+                return None
+        entries = {int(key): [divmod(hit, 1_000_000) for hit in hits]
+                   for key, hits in data["parcels"].items()}
+        return cls(current, entries)
+
+    def __contains__(self, parcel):
+        return parcel_key(parcel) in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def locate(self, parcel):
+        """{(table, year): [row offsets]} where a parcel number (any spelling) appears."""
+        found = {}
+        for number, offset in self.entries.get(parcel_key(parcel), ()):
+            source = self.sources[number]
+            found.setdefault((source.table, source.year), []).append(offset)
+        return found
+
+    def history(self, parcel):
+        """{(table, year): [rows]} of a parcel, reading each CSV once per index."""
+        found = {}
+        for number, offset in self.entries.get(parcel_key(parcel), ()):
+            source = self.sources[number]
+            rows = self._rows.get(number)
+            if rows is None:
+                rows = self._rows[number] = read_rows(source)
+            found.setdefault((source.table, source.year), []).append(rows[offset])
+        return found
+
+
+def load_index(path=DEFAULT_INDEX_PATH):
+    """The parcel index, rebuilt and saved first if missing or stale."""
+    index = ParcelIndex.load(path)
+    if index is None:
+        index = ParcelIndex.build()
+        index.save(path)
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m pittsfield_tax.parcel_index",
+                                     description="Build the parcel -> CSV rows index.")
+    parser.add_argument("--path", default=DEFAULT_INDEX_PATH,
+                        help="index file (default analysis/parcel_index.json)")
+    args = parser.parse_args()
+    index = ParcelIndex.build()
+    index.save(args.path)
+    print(f"Indexed {len(index)} parcels across {len(index.sources)} CSVs to {args.path}")
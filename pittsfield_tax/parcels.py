@@ -0,0 +1,50 @@
+"""Parcel numbers.
+
+The study books print parcel numbers as "L -12-13-401-009" and the appeal
+reports write "L-12-13-401-009". Both parse to the same
+(prefix, township, section, block, lot) tuple, ("L", 12, 13, 401, 9), and
+pack into one int64 key whose decimal digits are the tuple's fields:
+
+    L-12-13-401-009  ->  76 12 13 401 009  ->  761213401009
+
+(76 is ord("L")). Keys sort like the parcel numbers do and are what
+joins across files should compare.
+"""
+import re
+
+from pittsfield_tax.convert.pages import normalize_dashes
+
+_PARCEL = re.compile(r"([A-Z])\s*-?\s*(\d{2})\s*-?\s*(\d{2})\s*-?\s*(\d{3})\s*-?\s*(\d{3})$")
+
+
+def parse_parcel(value):
+    """(prefix, township, section, block, lot) of a parcel number, or None if it is not one."""
+    m = _PARCEL.match(normalize_dashes(value).strip().upper())
+    if m is None:
+        return None
+    prefix, township, section, block, lot = m.groups()
+    return prefix, int(township), int(section), int(block), int(lot)
+
+
+def parcel_key(value):
+    """The packed int64 key of a parcel number, or None if it is not one."""
+    parts = parse_parcel(value)
+    if parts is None:
+        return None
+    prefix, township, section, block, lot = parts
+    return (((ord(prefix) * 100 + township) * 100 + section) * 1000 + block) * 1000 + lot
+
+
+def format_parcel(key):
+    """The "L-12-13-401-009" form of a packed parcel key."""
+    rest, lot = divmod(key, 1000)
+    rest, block = divmod(rest, 1000)
+    rest, section = divmod(rest, 100)
+    prefix, township = divmod(rest, 100)
+    return f"{chr(prefix)}-{township:02d}-{section:02d}-{block:03d}-{lot:03d}"
+
+
+def normalize_parcel(value):
+    """The canonical "L-12-13-401-009" form of a parcel number, or None if it is not one."""
+    key = parcel_key(value)
+    return format_parcel(key) if key is not None else None
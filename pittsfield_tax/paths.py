@@ -0,0 +1,10 @@
+"""Filesystem locations of the township source PDFs and converted CSVs."""
+import os
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ANALYSIS_DIR = os.path.join(REPO_ROOT, "analysis")
+
+
+def year_dir(year):
+    """Folder holding one study year's PDFs and CSVs, e.g. analysis/2026."""
+    return os.path.join(ANALYSIS_DIR, str(year))
@@ -0,0 +1,295 @@
+"""ptax -- quick answers from the converted study books.
+
+python -m pittsfield_tax lookup PARCEL|ADDRESS [--json]
+python -m pittsfield_tax area CODE|PARCEL|ADDRESS [--limit N] [--json]
+python -m pittsfield_tax comps PARCEL [-k K] [--json]
+python -m pittsfield_tax trend CODE|PARCEL|ADDRESS [--json]
+python -m pittsfield_tax history PARCEL|ADDRESS [--json]
+python -m pittsfield_tax build
+
+(alias ptax="python -m pittsfield_tax"). Every query reads the prebuilt
+snapshot (snapshot.py) and imports no more than the standard library and
+the parcel-number parser, so one answer -- interpreter start included --
+takes a few tens of milliseconds, and shell loops over hundreds of parcels
+stay cheap. The snapshot is rebuilt on the first query after a CSV
+changes (a second or two), or on demand with `build`.
+
+    lookup   a parcel's address, ECF area and every sales, ECF and land row
+    area     an area's subdivisions, parcel count and arm's-length sales
+    comps    a parcel's nearest arm's-length comparables
+    trend    an area's ECF, sales and land adjustment figures per study year
+    history  a parcel's study years side by side, with its ECF drift and land
+             value changes (from history.py's file, so this one command
+             loads pyarrow and takes a few hundred milliseconds)
+
+An ADDRESS may be in any case and spell its suffix or unit any way
+("4807 Paulina Drive"), be part of an address ("paulina"), or be
+misspelt ("4807 pauline dr"); see addresses.py. area and trend take an
+address or parcel number in place of the area code, for owners who do
+not know theirs."""
+import argparse
+import sys
+
+from pittsfield_tax.addresses import AddressIndex, normalize_address
+from pittsfield_tax.parcels import format_parcel, parcel_key
+from pittsfield_tax.snapshot import DEFAULT_SNAPSHOT_PATH, SNAPSHOT_COMPS, HISTORY_FIELDS, load_snapshot
+
+# How alike (addresses.AddressIndex.search) a misspelt address must be to its match.
+MIN_SIMILARITY = 0.5
+
+
+def _money(value):
+    return "-" if value is None else f"${value:,.0f}"
+
+
+def _number(value, digits=3):
+    return "-" if value is None else f"{value:.{digits}f}"
+
+
+def _date(iso):
+    if not iso:
+        return "-"
+    year, month, day = iso.split("-")
+    return f"{month}/{day}/{year}"
+
+
+def _plain(value):
+    """A date as its ISO string; anything else as it is."""
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def _print_json(value):
+    import json
+
+    print(json.dumps(value, indent=1))
+
+
+def address_index(snapshot):
+    """An AddressIndex of the snapshot's addresses (a few tens of milliseconds to build)."""
+    return AddressIndex(sorted(snapshot["addresses"]))
+
+
+def find_parcels(snapshot, query, index=None):
+    """Parcel keys matching a parcel number or an address.
+
+    An address is looked up as written (any case, suffix spelling or unit
+    form), then as part of an address ("paulina" -> every PAULINA DR
+    parcel), then as a misspelling: the nearest addresses, if they are at
+    least MIN_SIMILARITY alike. The last two search index, built here when
+    not given. A query shorter than three characters is too short to be part
+    of one street and is only matched as a misspelling; an empty query is a
+    ValueError.
+    """
+    if not query.strip():
+        raise ValueError("empty parcel or address query")
+    key = parcel_key(query)
+    if key is not None:
+        return [key] if key in snapshot["parcels"] else []
+    address = normalize_address(query)
+    if address in snapshot["addresses"]:
+        return sorted(snapshot["addresses"][address])
+    index = index or address_index(snapshot)
+    text = " ".join(query.upper().split())
+    found = index.containing(text) or (index.containing(address) if address != text else [])
+    if not found:
+        nearest = index.search(address)
+        found = [i for score, i in nearest if score == nearest[0][0] >= MIN_SIMILARITY]
+    return sorted(key for i in found for key in snapshot["addresses"][index.addresses[i]])
+
+
+def find_area(snapshot, query, index=None):
+    """The ECF area code a query names: an area code, or a parcel or address in exactly one area."""
+    code = query.strip().upper()
+    if code in snapshot["areas"]:
+        return code
+    areas = {snapshot["parcels"][key][1] for key in find_parcels(snapshot, query, index)}
+    return areas.pop() if len(areas) == 1 and None not in areas else None
+
+
+TREND_FIELDS = ("year", "ave_ecf", "ave_ecf_lines", "mean_ecf", "ecf_rows", "sales", "median_sale",
+                "land_factor")
+
+
+def parcel_record(snapshot, key):
+    """A parcel's address, area and rows, as JSON-ready values."""
+    address, area = snapshot["parcels"][key]
+    return {"parcel": format_parcel(key), "address": address, "area": area,
+            "rows": [dict(table=row[0], year=row[1], **dict(zip(HISTORY_FIELDS[row[0]], row[2:])))
+                     for row in snapshot["history"][key]]}
+
+
+def area_record(snapshot, code, limit=None):
+    """An area's subdivisions, parcel count and arm's-length sales (the latest `limit`), JSON-ready."""
+    names, count = snapshot["areas"][code]
+    sales = snapshot["sales"].get(code, [])
+    return {"area": code, "subdivisions": names, "parcels": count, "arms_length_sales": len(sales),
+            "sales": [{"sale_date": date, "parcel": format_parcel(key), "address": address,
+                       "adj_sale": price, "book": year}
+                      for date, key, address, price, year in (sales[:limit] if limit else sales)]}
+
+
+def comp_records(snapshot, key, k):
+    """A parcel's k nearest comparables, JSON-ready."""
+    return [{"parcel": format_parcel(sale), "address": address, "book": year, "sale_date": date,
+             "adj_sale": price, "area": code, "style": style, "distance": distance}
+            for sale, address, year, date, price, code, style, distance in snapshot["comps"].get(key, [])[:k]]
+
+
+def trend_records(snapshot, code):
+    """An area's trend lines, JSON-ready."""
+    return [dict(zip(TREND_FIELDS, line)) for line in snapshot["trend"].get(code, [])]
+
+
+def lookup(snapshot, args):
+    keys = find_parcels(snapshot, args.query)
+    if not keys:
+        print(f"{args.query}: no parcel in the sales, ECF or land books", file=sys.stderr)
+        return 1
+    if args.json:
+        _print_json([parcel_record(snapshot, key) for key in keys])
+        return 0
+    for key in keys:
+        address, area = snapshot["parcels"][key]
+        print(f"{format_parcel(key)}  {address or '-'}  ({area or 'no ECF area'})")
+        for table, year, *values in snapshot["history"][key]:
+            if table == "sales":
+                date, price, terms, assessed = values
+                detail = f"{_money(price):>10}  {terms or '-'}  assessed {_money(assessed)}"
+            elif table == "ecf":
+                date, price, residual, cost, ecf = values
+                detail = f"{_money(price):>10}  residual {_money(residual)}  cost {_money(cost)}  ECF {_number(ecf)}"
+            else:
+                date, price, prior, current = values
+                detail = f"{_money(price):>10}  land {_money(prior)} -> {_money(current)}"
+            print(f"  {year} {table:<5}  {_date(date):>10}  {detail}")
+    return 0
+
+
+def area(snapshot, args):
+    code = find_area(snapshot, args.code)
+    if code is None:
+        print(f"{args.code}: no such ECF area, or no parcel in exactly one", file=sys.stderr)
+        return 1
+    if args.json:
+        _print_json(area_record(snapshot, code, args.limit))
+        return 0
+    names, count = snapshot["areas"][code]
+    sales = snapshot["sales"].get(code, [])
+    shown = sales[:args.limit] if args.limit else sales
+    print(f"{code}: {', '.join(names) or '-'} ({count} parcels, {len(sales)} arm's-length sales)")
+    for date, key, address, price, year in shown:
+        print(f"  {_date(date):>10}  {format_parcel(key)}  {address or '-':<26} {_money(price):>10}  ({year} book)")
+    return 0
+
+
+def comps(snapshot, args):
+    keys = find_parcels(snapshot, args.query)
+    key = keys[0] if len(keys) == 1 else None
+    if key is None or key not in snapshot["comps"]:
+        reason = "matches several parcels" if len(keys) > 1 else "is not in the sales, ECF or land books"
+        print(f"{args.query} {reason}", file=sys.stderr)
+        return 1
+    if args.json:
+        _print_json(comp_records(snapshot, key, args.k))
+        return 0
+    found = snapshot["comps"][key][:args.k]
+    print(f"{format_parcel(key)}  {snapshot['parcels'][key][0] or '-'}:")
+    for sale, address, year, date, price, code, style, distance in found:
+        print(f"  {format_parcel(sale)}  {address or '-':<26} {_date(date):>10}  {_money(price):>10}  "
+              f"{code or '-':<6} {style or '-':<10} {distance:.3f}")
+    return 0
+
+
+def trend(snapshot, args):
+    code = find_area(snapshot, args.code)
+    lines = snapshot["trend"].get(code)
+    if not lines:
+        print(f"{args.code}: no such ECF area, or no parcel in exactly one", file=sys.stderr)
+        return 1
+    if args.json:
+        _print_json(trend_records(snapshot, code))
+        return 0
+    print(f"{code}  year  Ave. ECF (lines)  mean ECF (rows)  sales  median sale  land factor")
+    for year, ave, printed, mean, rows, sales, median, factor in lines:
+        print(f"{'':{len(code)}}  {year}  {_number(ave):>8} ({printed:>3})  {_number(mean):>8} ({rows:>3})  "
+              f"{sales:>5}  {_money(median):>11}  {_number(factor, 4):>11}")
+    return 0
+
+
+def history(snapshot, args):
+    from pittsfield_tax.history import load_history
+
+    keys = find_parcels(snapshot, args.query)
+    if not keys:
+        print(f"{args.query}: no parcel in the sales, ECF or land books", file=sys.stderr)
+        return 1
+    found = load_history()
+    if args.json:
+        _print_json([{"parcel": format_parcel(key),
+                      "years": [{name: _plain(value) for name, value in row.items() if name != "parcel_key"}
+                                for row in found.rows(key)]} for key in keys])
+        return 0
+    for key in keys:
+        rows = found.rows(key)
+        if not rows:
+            print(f"{format_parcel(key)}: not in the parcel history", file=sys.stderr)
+            continue
+        print(f"{format_parcel(key)}  {rows[-1]['Street_Address'] or '-'}")
+        print("  year  area    sale date   adj. sale    ECF   drift   land prior -> current  change"
+              "  factor (area)")
+        for row in rows:
+            drift = "-" if row["ECF_Drift"] is None else f"{row['ECF_Drift']:+.3f}"
+            change = "-" if row["Land_Value_Change"] is None else f"{row['Land_Value_Change']:+,}"
+            print(f"  {row['year']}  {row['ECF_Area'] or '-':<6} {_date(_plain(row['Sale_Date'])):>10}  "
+                  f"{_money(row['Adj_Sale']):>10}  {_number(row['ECF']):>5}  {drift:>6}  "
+                  f"{_money(row['Land_Value_Prior']):>10} -> {_money(row['Land_Value_Current']):>8}  {change:>7}  "
+                  f"{_number(row['Land_Factor_Applied'], 4):>6} ({_number(row['Adjust_Factor'], 4)})")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="ptax", description="Quick answers from the converted study books.")
+    parser.add_argument("--snapshot", default=DEFAULT_SNAPSHOT_PATH,
+                        help="snapshot file (default analysis/ptax.snapshot)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    command = commands.add_parser("lookup", help="a parcel's (or address's) rows in every book")
+    command.add_argument("query", metavar="PARCEL|ADDRESS")
+    command.set_defaults(run=lookup)
+    command = commands.add_parser("area", help="an ECF area's parcels and arm's-length sales")
+    command.add_argument("code", metavar="CODE|PARCEL|ADDRESS", help="ECF area code, e.g. AR-4, or a parcel in it")
+    command.add_argument("--limit", type=int, help="show only the N latest sales")
+    command.set_defaults(run=area)
+    command = commands.add_parser("comps", help="a parcel's nearest arm's-length comparables")
+    command.add_argument("query", metavar="PARCEL|ADDRESS")
+    command.add_argument("-k", type=int, default=5, help=f"comparables to show (default 5, at most {SNAPSHOT_COMPS})")
+    command.set_defaults(run=comps)
+    command = commands.add_parser("trend", help="an ECF area's figures per study year")
+    command.add_argument("code", metavar="CODE|PARCEL|ADDRESS", help="ECF area code, e.g. UNF, or a parcel in it")
+    command.set_defaults(run=trend)
+    command = commands.add_parser("history", help="a parcel's study years side by side, with changes")
+    command.add_argument("query", metavar="PARCEL|ADDRESS")
+    command.set_defaults(run=history)
+    commands.add_parser("build", help="rebuild the snapshot from the CSVs")
+    for name in ("lookup", "area", "comps", "trend", "history"):
+        commands.choices[name].add_argument("--json", action="store_true", help="print JSON")
+    args = parser.parse_args(argv)
+    query = vars(args).get("query", vars(args).get("code"))
+    if query is not None and not query.strip():
+        parser.error(f"{args.command}: the query is empty")
+
+    if args.command == "build":
+        import time
+
+        from pittsfield_tax.snapshot import build_snapshot, save_snapshot
+
+        start = time.perf_counter()
+        snapshot = build_snapshot()
+        save_snapshot(snapshot, args.snapshot)
+        print(f"Wrote {args.snapshot}: {len(snapshot['parcels'])} parcels, {len(snapshot['areas'])} areas "
+              f"({time.perf_counter() - start:.2f}s)")
+        return 0
+    return args.run(load_snapshot(args.snapshot), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""Sales-ratio study per ECF area and year.
+
+python -m pittsfield_tax.ratio_study [year ...] [--bootstrap N] [--confidence C]
+                                     [--min-sales N] [--all-terms] [--seed S] [--csv PATH]
+
+A sale's ratio is its assessment when sold over its adjusted sale price,
+Asd_When_Sold / Adj_Sale (the sales books print it as a percentage,
+Asd_Adj_Sale). For every (year, ECF area) group of arm's-length sales this
+computes the IAAO statistics
+
+    median   median ratio
+    COD      coefficient of dispersion: 100 * mean |ratio - median| / median
+    PRD      price-related differential: mean ratio / (sum assessed / sum price)
+    PRB      price-related bias: slope of (ratio - median) / median on
+             log2 of value, value = (assessed / median + price) / 2
+
+with percentile bootstrap confidence intervals. Sales are sorted by group
+once, and every statistic of every group -- and of every bootstrap
+replicate -- comes out of the same few array operations; there is no
+per-group loop. Years whose book prints no assessments (2025) are left out.
+"""
+import argparse
+import csv
+import sys
+import warnings
+from collections import namedtuple
+
+import numpy as np
+
+from pittsfield_tax.tables import SALES, read_rows, sources
+
+# The one Terms_of_Sale code a ratio study uses; multi-parcel arm's-length sales
+# are left out because Asd_When_Sold covers only the first parcel.
+ARMS_LENGTH = "03-ARM'S LENGTH"
+
+STATISTICS = ("median", "cod", "prd", "prb")
+DEFAULT_BOOTSTRAP = 1000
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_MIN_SALES = 5
+
+# IAAO standard ranges for residential property.
+IAAO_RANGES = {"cod": (0.0, 15.0), "prd": (0.98, 1.03), "prb": (-0.05, 0.05)}
+
+# Bootstrap replicates computed per batch, bounding the (replicates x sales) arrays.
+_BATCH = 250
+
+Sample = namedtuple("Sample", "keys group starts counts assessed price")
+Sample.__doc__ = """Study sales sorted by group: (year, area) keys, group ids, group offsets and sizes,
+assessments and prices."""
+
+RatioStudy = namedtuple("RatioStudy", "keys count median cod prd prb intervals")
+RatioStudy.__doc__ = """Per-group statistics; intervals maps each statistic to (low, high) arrays."""
+
+
+def load_sample(years=None, all_terms=False):
+    """The sales a ratio study uses, grouped by (year, ECF area)."""
+    year, area, assessed, price = [], [], [], []
+    for source in sources(SALES):
+        if years is not None and source.year not in years or "Asd_When_Sold" not in source.kinds:
+            continue
+        for row in read_rows(source):
+            if not all_terms and row["Terms_of_Sale"] != ARMS_LENGTH:
+                continue
+            if (row["Asd_When_Sold"] or 0) > 0 and (row["Adj_Sale"] or 0) > 0:
+                year.append(source.year)
+                area.append(row["ECF_Area"] or "")
+                assessed.append(row["Asd_When_Sold"])
+                price.append(row["Adj_Sale"])
+    return make_sample(year, area, assessed, price)
+
+
+def make_sample(year, area, assessed, price):
+    """A Sample from parallel per-sale sequences, in any order."""
+    years, year_idx = np.unique(np.asarray(year, dtype=np.int32), return_inverse=True)
+    areas, area_idx = np.unique(np.asarray(area, dtype=str), return_inverse=True)
+    groups, group = np.unique(year_idx * len(areas) + area_idx, return_inverse=True)
+    order = np.argsort(group, kind="stable")
+    group = group[order]
+    counts = np.bincount(group, minlength=len(groups))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    keys = [(int(years[g // len(areas)]), str(areas[g % len(areas)])) for g in groups]
+    return Sample(keys, group, starts, counts, np.asarray(assessed, dtype=np.float64)[order],
+                  np.asarray(price, dtype=np.float64)[order])
+
+
+def _group_sums(values, group, n_groups):
+    """Sum a (replicates, sales) array by group: (replicates, groups)."""
+    reps = values.shape[0]
+    ids = (np.arange(reps)[:, None] * n_groups + group).ravel()
+    return np.bincount(ids, weights=values.ravel(), minlength=reps * n_groups).reshape(reps, n_groups)
+
+
+def _statistics(sample, assessed, price):
+    """{statistic: (replicates, groups) array} for (replicates, sales) assessments and prices.
+
+    Each replicate row must keep the sample's group layout: the sales of
+    group g in columns starts[g] .. starts[g] + counts[g].
+    """
+    group, starts, counts = sample.group, sample.starts, sample.counts
+    n_groups = len(counts)
+    ratio = assessed / price
+
+    # Sort ratios within each group in one sort: the integer part of the key
+    # keeps groups in place, the fractional part orders ratios inside them.
+    scale = np.nanmax(ratio) + 1.0
+    ordered = (np.sort(group + ratio / scale, axis=1) - group) * scale
+    median = (ordered[:, starts + (counts - 1) // 2] + ordered[:, starts + counts // 2]) / 2
+    per_sale = median[:, group]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cod = 100 * _group_sums(np.abs(ratio - per_sale), group, n_groups) / counts / median
+        prd = (_group_sums(ratio, group, n_groups) / counts) / (
+            _group_sums(assessed, group, n_groups) / _group_sums(price, group, n_groups))
+        x = np.log2((assessed / per_sale + price) / 2)
+        x -= (_group_sums(x, group, n_groups) / counts)[:, group]
+        y = (ratio - per_sale) / per_sale
+        prb = _group_sums(x * y, group, n_groups) / _group_sums(x * x, group, n_groups)
+    prb[:, counts < 3] = np.nan
+    return {"median": median, "cod": cod, "prd": prd, "prb": np.where(np.isfinite(prb), prb, np.nan)}
+
+
+def _bootstrap(sample, replicates, rng):
+    """Yield {statistic: (batch, groups)} for batches of resampled-within-group replicates."""
+    first = sample.starts[sample.group]
+    size = sample.counts[sample.group]
+    for done in range(0, replicates, _BATCH):
+        batch = min(_BATCH, replicates - done)
+        idx = first + (rng.random((batch, len(sample.group))) * size).astype(np.int64)
+        yield _statistics(sample, sample.assessed[idx], sample.price[idx])
+
+
+def study(sample, replicates=DEFAULT_BOOTSTRAP, confidence=DEFAULT_CONFIDENCE, seed=None):
+    """IAAO ratio statistics of every group, with bootstrap confidence intervals (none for no sales)."""
+    if not len(sample.group):
+        empty = np.empty(0)
+        return RatioStudy([], sample.counts, *(empty for _ in STATISTICS), {})
+    point = _statistics(sample, sample.assessed[None, :], sample.price[None, :])
+    intervals = {}
+    if replicates and len(sample.group):
+        batches = list(_bootstrap(sample, replicates, np.random.default_rng(seed)))
+        tail = 100 * (1 - confidence) / 2
+        for name in STATISTICS:
+            draws = np.concatenate([b[name] for b in batches])
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)   # groups too small for PRB
+                low, high = np.nanpercentile(draws, [tail, 100 - tail], axis=0)
+            intervals[name] = (low, high)
+    return RatioStudy(sample.keys, sample.counts,
+                      *(point[name][0] for name in STATISTICS), intervals)
+
+
+def _outside(name, value):
+    if name not in IAAO_RANGES or np.isnan(value):
+        return False
+    low, high = IAAO_RANGES[name]
+    return not low <= value <= high
+
+
+def _format(result, name, i):
+    value = getattr(result, name)[i]
+    digits = 1 if name == "cod" else 3
+    text = "-" if np.isnan(value) else f"{value:.{digits}f}"
+    if name in result.intervals:
+        low, high = result.intervals[name][0][i], result.intervals[name][1][i]
+        if not np.isnan(low):
+            text += f" [{low:.{digits}f}, {high:.{digits}f}]"
+    return text + ("*" if _outside(name, value) else "")
+
+
+def write_csv(result, path):
+    """Write one row per group: year, area, sales, each statistic and its interval."""
+    fieldnames = ["Year", "ECF_Area", "Sales"]
+    for name in STATISTICS:
+        label = name.upper() if name != "median" else "Median_Ratio"
+        fieldnames += [label] + ([f"{label}_Low", f"{label}_High"] if name in result.intervals else [])
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        for i, (year, area) in enumerate(result.keys):
+            row = [year, area, int(result.count[i])]
+            for name in STATISTICS:
+                row.append(_cell(getattr(result, name)[i]))
+                if name in result.intervals:
+                    row += [_cell(bound[i]) for bound in result.intervals[name]]
+            writer.writerow(row)
+
+
+def _cell(value):
+    return "" if np.isnan(value) else f"{value:.6g}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pittsfield_tax.ratio_study",
+                                     description="IAAO sales-ratio statistics per ECF area and year.")
+    parser.add_argument("years", type=int, nargs="*", help="study years (default: all)")
+    parser.add_argument("--bootstrap", type=int, default=DEFAULT_BOOTSTRAP, metavar="N",
+                        help=f"bootstrap replicates, 0 for none (default {DEFAULT_BOOTSTRAP})")
+    parser.add_argument("--confidence", type=float, default=DEFAULT_CONFIDENCE,
+                        help=f"confidence level of the intervals (default {DEFAULT_CONFIDENCE})")
+    parser.add_argument("--min-sales", type=int, default=DEFAULT_MIN_SALES, metavar="N",
+                        help=f"only print areas with at least N sales (default {DEFAULT_MIN_SALES})")
+    parser.add_argument("--all-terms", action="store_true",
+                        help="use every sale, not only arm's-length ones")
+    parser.add_argument("--seed", type=int, help="random seed, for repeatable intervals")
+    parser.add_argument("--csv", metavar="PATH", help="also write every area's statistics to a CSV")
+    args = parser.parse_args(argv)
+
+    result = study(load_sample(set(args.years) or None, args.all_terms),
+                   args.bootstrap, args.confidence, args.seed)
+    if not result.keys:
+        years = ", ".join(map(str, sorted(set(args.years)))) or "any year"
+        print(f"No sale in {years} has an assessed-when-sold value (Asd_When_Sold)", file=sys.stderr)
+        return 1
+    print(f"{'Year':<5} {'Area':<8} {'Sales':>5}  " + "  ".join(
+        f"{name.upper() if name != 'median' else 'Median':<24}" for name in STATISTICS).rstrip())
+    for i, (year, area) in enumerate(result.keys):
+        if result.count[i] >= args.min_sales:
+            print(f"{year:<5} {area or '-':<8} {result.count[i]:>5}  " + "  ".join(
+                f"{_format(result, name, i):<24}" for name in STATISTICS).rstrip())
+    print("* outside the IAAO residential range (COD <= 15, PRD 0.98-1.03, PRB +/-0.05)")
+    if args.csv:
+        write_csv(result, args.csv)
+        print(f"Wrote {len(result.keys)} areas to {args.csv}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Appeal-analysis reports built from the converted study-book data."""
@@ -0,0 +1,33 @@
+"""python -m pittsfield_tax.reports PARCEL [--sev N] [--taxable N] [--area CODE] [--address TEXT]
+    [--output PATH]
+
+Writes the appeal-analysis PDF for one parcel to
+analysis/reports/<parcel>_Tax_Appeal_Analysis.pdf (or --output). A parcel
+no study book lists needs --area (and, for a readable title, --address).
+"""
+import argparse
+import sys
+import time
+
+from pittsfield_tax.reports.engine import ReportData, build_report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m pittsfield_tax.reports",
+                                     description="Build a parcel's appeal-analysis PDF from the study data.")
+    parser.add_argument("parcel", help="parcel number, e.g. L-12-12-315-027")
+    parser.add_argument("--sev", type=int, help="the parcel's SEV (assessed value) this year")
+    parser.add_argument("--taxable", type=int, help="the parcel's taxable value this year")
+    parser.add_argument("--area", help="ECF area code, if no study book lists the parcel")
+    parser.add_argument("--address", help="street address, if no study book lists the parcel")
+    parser.add_argument("--output", help="PDF path (default analysis/reports/<parcel>_Tax_Appeal_Analysis.pdf)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    data = ReportData()
+    loaded = time.perf_counter()
+    try:
+        subject = data.subject(args.parcel, args.sev, args.taxable, args.area, args.address)
+    except (KeyError, ValueError) as e:
+        sys.exit(e.args[0])
+    path = build_report(data, subject, args.output)
+    print(f"Generated: {path} (data {loaded - start:.2f}s, report {time.perf_counter() - loaded:.2f}s)")
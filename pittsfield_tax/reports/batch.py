@@ -0,0 +1,158 @@
+"""Appeal packets -- the analysis PDF and the Word guide -- for whole areas.
+
+python -m pittsfield_tax.reports.batch [AREA ...] [--all] [--workers N] [--output-dir DIR] [--no-guide]
+                                       [--force]
+
+Writes analysis/reports/<AREA>/<parcel>_Tax_Appeal_Analysis.pdf and
+<parcel>_Appeal_Guide.docx for every parcel the study books place in each
+area (--all: every area). The data and the guide's document skeleton
+(guide.GuideTemplate) are built once, in this process, before the worker
+pool starts: with the fork start method the workers share them
+copy-on-write, and otherwise each worker builds them once in its
+initializer. Every file is written to a temporary name and renamed into
+place, so an interrupted run never leaves a half-written packet.
+
+Packets whose inputs have not changed since they were last written are
+skipped (see deps); --force rebuilds them anyway.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pittsfield_tax.convert.pages import add_workers_argument, resolve_workers
+from pittsfield_tax.parcels import format_parcel
+from pittsfield_tax.reports.deps import BuildManifest, Fingerprints
+from pittsfield_tax.reports.engine import DEFAULT_REPORT_DIR, ReportData, build_report, report_path
+
+_worker_data = None
+_worker_template = None
+
+
+def _load_data():
+    """A ReportData with its comparables index built, ready to share with workers."""
+    data = ReportData()
+    data.comps
+    return data
+
+
+def _guide_template(data):
+    from pittsfield_tax.reports.guide import GuideTemplate
+    return GuideTemplate(data)
+
+
+def _init_worker(guide):
+    global _worker_data, _worker_template
+    if _worker_data is None:
+        _worker_data = _load_data()
+    if guide and _worker_template is None:
+        _worker_template = _guide_template(_worker_data)
+
+
+def _build_packet(job):
+    """Write the stale parts of one parcel's packet; returns the number of documents written."""
+    key, report_dir, pdf, guide = job
+    subject = _worker_data.subject(format_parcel(key))
+    if pdf:
+        build_report(_worker_data, subject, report_path(subject, report_dir))
+    if guide:
+        from pittsfield_tax.reports.guide import build_guide, guide_path
+        build_guide(_worker_data, subject, guide_path(subject, report_dir), _worker_template)
+    return pdf + guide
+
+
+def _outputs(subject, report_dir, guide):
+    paths = [report_path(subject, report_dir)]
+    if guide:
+        from pittsfield_tax.reports.guide import guide_path
+        paths.append(guide_path(subject, report_dir))
+    return paths
+
+
+def build_packets(data, areas, output_dir=DEFAULT_REPORT_DIR, workers=1, guide=True, force=False):
+    """Write the packet of every parcel in areas whose inputs changed since it was last written.
+
+    Returns (documents written, documents already up to date, data slices
+    changed since the last build).
+    """
+    global _worker_data, _worker_template
+    fingerprints = Fingerprints(data)
+    manifest = BuildManifest(output_dir)
+    changed = manifest.changed_slices(fingerprints.slices)
+    jobs, built, fresh = [], [], 0
+    for area in areas:
+        report_dir = os.path.join(output_dir, area)
+        for key in data.area_parcels(area):
+            subject = data.subject(format_parcel(key))
+            digest = fingerprints.digest(subject)
+            outputs = _outputs(subject, report_dir, guide)
+            stale = [force or manifest.stale(path, digest) for path in outputs]
+            fresh += stale.count(False)
+            if any(stale):
+                jobs.append((key, report_dir, stale[0], guide and stale[-1]))
+                built.append([(path, digest) for path, s in zip(outputs, stale) if s])
+    if not jobs:
+        return 0, fresh, len(changed)
+
+    workers = min(resolve_workers(workers), len(jobs))
+    _worker_data = data
+    _worker_template = _guide_template(data) if any(job[3] for job in jobs) else None
+    written = 0
+    try:
+        if workers == 1:
+            results = map(_build_packet, jobs)
+        else:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("fork" if "fork" in methods else None)
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                       initializer=_init_worker, initargs=(guide,))
+            results = pool.map(_build_packet, jobs, chunksize=max(1, len(jobs) // (4 * workers)))
+        # Record each packet as it completes, so an interrupted run keeps what it wrote.
+        for outputs, count in zip(built, results):
+            for path, digest in outputs:
+                manifest.record(path, digest)
+            written += count
+    finally:
+        if workers > 1:
+            pool.shutdown(cancel_futures=True)
+        manifest.save(fingerprints.slices)
+    return written, fresh, len(changed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pittsfield_tax.reports.batch",
+                                     description="Build the appeal PDF and Word guide for every parcel of an area.")
+    parser.add_argument("areas", nargs="*", metavar="AREA", help="ECF area codes, e.g. AR-4")
+    parser.add_argument("--all", action="store_true", help="every area the study books list")
+    parser.add_argument("--output-dir", default=DEFAULT_REPORT_DIR,
+                        help="packets go in <dir>/<AREA>/ (default analysis/reports)")
+    parser.add_argument("--no-guide", action="store_true", help="write only the analysis PDFs")
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild every packet, even those whose inputs have not changed")
+    add_workers_argument(parser)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    data = _load_data()
+    known = sorted(set(data.parcel_areas.values()))
+    areas = known if args.all else args.areas
+    if not areas:
+        parser.error("give one or more areas, or --all")
+    unknown = [a for a in areas if a not in known]
+    if unknown:
+        parser.error(f"no parcels in {', '.join(unknown)}")
+    loaded = time.perf_counter()
+    documents, fresh, changed = build_packets(data, areas, args.output_dir, args.workers, not args.no_guide,
+                                              args.force)
+    elapsed = time.perf_counter() - loaded
+    print(f"Wrote {documents} documents for {len(areas)} area(s) to {args.output_dir}, {fresh} up to date; "
+          f"{changed} data slices changed since the last build "
+          f"(data {loaded - start:.2f}s, documents {elapsed:.2f}s, "
+          f"{documents / elapsed if elapsed else 0:.1f} docs/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
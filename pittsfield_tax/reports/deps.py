@@ -0,0 +1,147 @@
+"""What each generated report is built from, for rebuilding only the stale ones.
+
+The rows a report reads are grouped into slices, each with a SHA-256 of
+its rows:
+
+    <table>/<year>/<area>   a year's rows of one table for an ECF area: rows
+                            of the area's parcels and rows coded with the area
+    parcel/<parcel>         every row of one parcel, any table and year
+    comps/<parcel>          the parcel's nearest comparables, as printed
+    counts                  the number of rows in each CSV (the Data Sources list)
+    code                    the report generators' own source
+
+A packet for a parcel in area A depends on every A slice, its parcel and
+comps slices, counts and code, plus the Subject itself. Its digest
+combines those; the build manifest (.build_manifest.json in the output
+directory) keeps the digest each output was last written with. After a
+converter re-runs, only the outputs whose digest changed are rebuilt: a
+corrected page of one area's sales touches that area's packets, not the
+township's.
+"""
+import glob
+import hashlib
+import json
+import os
+
+from pittsfield_tax.parcels import format_parcel, parcel_key
+from pittsfield_tax.paths import REPO_ROOT
+from pittsfield_tax.reports.engine import COMPARABLES
+from pittsfield_tax.tables import ECF, ECF_SUMMARIES, LAND_ADJUSTMENTS, sources
+
+MANIFEST_NAME = ".build_manifest.json"
+MANIFEST_VERSION = 1
+
+# Sources whose changes can change a report's pages.
+CODE_FILES = ("pittsfield_tax/reports/*.py", "pittsfield_tax/comps.py", "pittsfield_tax/ratio_study.py",
+              "pittsfield_tax/ecf.py", "pittsfield_tax/tables.py")
+
+
+def _row_areas(table, row, parcel_areas):
+    """The ECF areas a row belongs to: its parcel's and the one it is coded with."""
+    if table == ECF_SUMMARIES:
+        return {row["ECF_Area"]}
+    if table == LAND_ADJUSTMENTS:
+        return {row["Area_Code"]}
+    own = row.get("ECF_Area_Code") if table == ECF else row.get("ECF_Area")
+    key = parcel_key(row["Parcel_Number"] or "")
+    return {own, parcel_areas.get(key)} - {None, ""}
+
+
+def code_digest():
+    h = hashlib.sha256()
+    for pattern in CODE_FILES:
+        for path in sorted(glob.glob(os.path.join(REPO_ROOT, pattern))):
+            with open(path, "rb") as f:
+                h.update(f.read())
+    return h.hexdigest()
+
+
+class Fingerprints:
+    """Digests of every slice of a ReportData's rows."""
+
+    def __init__(self, data):
+        self.data = data
+        hashes = {}
+        counts = hashlib.sha256()
+        self._area_slices = {}
+        for source in sources():
+            rows = data.read(source)
+            counts.update(f"{source.table}/{source.year}:{len(rows)};".encode())
+            for row in rows:
+                record = repr(tuple(row.values())).encode()
+                for area in _row_areas(source.table, row, data.parcel_areas):
+                    name = f"{source.table}/{source.year}/{area}"
+                    if name not in hashes:
+                        hashes[name] = hashlib.sha256()
+                        self._area_slices.setdefault(area, []).append(name)
+                    hashes[name].update(record)
+                key = parcel_key(row.get("Parcel_Number") or "")
+                if key is not None:
+                    hashes.setdefault(f"parcel/{format_parcel(key)}", hashlib.sha256()).update(record)
+        self.slices = {name: h.hexdigest() for name, h in hashes.items()}
+        self.slices["counts"] = counts.hexdigest()
+        self.slices["code"] = code_digest()
+        self._add_comps()
+
+    def _add_comps(self):
+        """comps/<parcel> for every parcel, from one batch over the comparables index."""
+        index = self.data.comps
+        nearest, distances = index.batch(COMPARABLES)
+        for s, key in enumerate(index.subject_keys):
+            h = hashlib.sha256()
+            for i, d in zip(nearest[s], distances[s]):
+                h.update(f"{int(index.sale_keys[i])}:{index.sales[i]['year']}:{d:.3f};".encode())
+            self.slices[f"comps/{format_parcel(int(key))}"] = h.hexdigest()
+
+    def dependencies(self, subject):
+        """The names of the slices subject's packet is built from."""
+        names = list(self._area_slices.get(subject.area, ()))
+        names += [name for name in (f"parcel/{subject.parcel}", f"comps/{subject.parcel}")
+                  if name in self.slices]
+        return sorted(names + ["counts", "code"])
+
+    def digest(self, subject):
+        """One digest of subject and every slice its packet depends on."""
+        h = hashlib.sha256(repr(tuple(subject)).encode())
+        for name in self.dependencies(subject):
+            h.update(f"{name}={self.slices[name]};".encode())
+        return h.hexdigest()
+
+
+class BuildManifest:
+    """The digest every output in a directory was last built with."""
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            saved = None
+        if not saved or saved.get("version") != MANIFEST_VERSION:
+            saved = {"slices": {}, "outputs": {}}
+        self.slices = saved["slices"]
+        self.outputs = saved["outputs"]
+
+    def _name(self, path):
+        return os.path.relpath(path, self.output_dir)
+
+    def stale(self, path, digest):
+        return self.outputs.get(self._name(path)) != digest or not os.path.exists(path)
+
+    def record(self, path, digest):
+        self.outputs[self._name(path)] = digest
+
+    def changed_slices(self, slices):
+        """Names of slices that are new or differ from the last build."""
+        return sorted(name for name, digest in slices.items() if self.slices.get(name) != digest)
+
+    def save(self, slices):
+        self.slices = dict(slices)
+        os.makedirs(self.output_dir, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": MANIFEST_VERSION, "slices": self.slices, "outputs": self.outputs},
+                      f, separators=(",", ":"))
+        os.replace(tmp, self.path)
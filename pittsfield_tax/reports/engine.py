@@ -0,0 +1,545 @@
+"""Appeal-analysis reports for any parcel, built from the converted data.
+
+The hand-written FieldcrestLnAnalysis / PaulinaDrAnalysis generators type
+every sale, ECF and average into their tables. Here the same sections
+come from the CSVs of every study year:
+
+    ECF        the area's Ave. E.C.F. per year and each area parcel's ECF
+    sales      the area's arm's-length sales, statistics against the implied
+               TCV, and the nearest comparables from comps.CompIndex
+    land       land adjustment factors, the parcel's land values, land residuals
+    coverage   how many area sales each year's books used
+    ratios     the area's sales-ratio study (ratio_study)
+    legal, process, sources
+
+ReportData reads the CSVs once; each report after that is a few dict
+lookups and array operations plus the PDF drawing.
+"""
+import datetime
+import os
+import statistics
+from collections import namedtuple
+
+import numpy as np
+
+from pittsfield_tax.addresses import street_name
+from pittsfield_tax.comps import CompIndex
+from pittsfield_tax.convert.specs import registry
+from pittsfield_tax.ecf import DEFAULT_TOLERANCE
+from pittsfield_tax.parcels import format_parcel, normalize_parcel, parcel_key
+from pittsfield_tax.paths import ANALYSIS_DIR
+from pittsfield_tax.ratio_study import ARMS_LENGTH, make_sample, study
+from pittsfield_tax.reports.pdf import AnalysisPDF
+from pittsfield_tax.tables import (
+    ECF, ECF_SUMMARIES, LAND, LAND_ADJUSTMENTS, SALES, read_rows, sources, spec_sources,
+)
+
+DEFAULT_REPORT_DIR = os.path.join(ANALYSIS_DIR, "reports")
+COMPARABLES = 8
+DOC_NAMES = {"sales": "Residential Sales Analysis", "ecf": "Residential ECF Analysis",
+             "land": "Residential Land Analysis"}
+
+# Board of Review and Tax Tribunal dates by assessment year; years not
+# listed print the process without dates.
+APPEAL_CALENDAR = {
+    2026: {
+        "deadline": "March 10, 2026 at 5:00 PM",
+        "organizational": "March 3, 2026, 9:00 AM",
+        "hearings": "Mar 9 (9am-12pm, 6pm-9pm), Mar 10 (9am-12pm), Mar 11 (1pm-5pm)",
+        "tribunal": "July 31, 2026",
+    },
+}
+
+LEGAL_STANDARDS = [
+    ["TCV = usual selling price", "MCL 211.27(1)", "Sales comps are the primary evidence"],
+    ["No presumption for assessor", "Alhi v Orion Twp, 110 Mich App 764", "Burden does NOT favor assessor"],
+    ["Sales comparison most persuasive", "Meadowlanes v Holland, 437 Mich 473",
+     "For residential, comps trump cost approach"],
+    ["Independent duty to find correct value", "Great Lakes v Ecorse, 227 Mich App 379",
+     "Tribunal must independently evaluate"],
+    ["Arm's-length transaction standard", "Huron Ridge v Ypsilanti, 275 Mich App 23",
+     "Non-arm's-length sales are excluded"],
+]
+
+Subject = namedtuple("Subject", "parcel address area area_name sev taxable")
+Subject.__doc__ = """The parcel a report is for: parcel number, address, ECF area code and name,
+and the owner's SEV and taxable value (None if not given)."""
+
+Sale = namedtuple("Sale", "parcel address date price terms area")
+
+
+def money(value):
+    return f"-${-value:,.0f}" if value < 0 else f"${value:,.0f}"
+
+
+def long_date(date):
+    return f"{date:%b} {date.day}, {date.year}"
+
+
+def title_case(text):
+    return " ".join(word if any(c.isdigit() for c in word) else word.capitalize()
+                    for word in text.split())
+
+
+class ReportData:
+    """Every study year's rows, indexed by parcel and area for the report sections."""
+
+    def __init__(self):
+        self._rows = {}
+        self.years = sorted({s.year for s in sources()})
+        self.area_names = {}
+        self.summaries = {}
+        self.adjustments = {}
+        self.ecf = {}            # parcel key -> {year: row}
+        self.land = {}           # parcel key -> {year: row}
+        self.study_sales = {}    # (year, area) -> [Sale] listed in that year's sales book
+        self.addresses = {}
+        self._area = {}          # parcel key -> ((year, rank), area)
+        for source in sources():
+            for row in self.read(source):
+                self._index(source, row)
+        self.parcel_areas = {key: area for key, (_, area) in self._area.items()}
+        self.sales = self._unique_sales()
+        self._comps = None
+
+    def read(self, source):
+        """A source's rows, read once per ReportData."""
+        rows = self._rows.get((source.table, source.year))
+        if rows is None:
+            rows = self._rows[(source.table, source.year)] = read_rows(source)
+        return rows
+
+    def _index(self, source, row):
+        year, table = source.year, source.table
+        if table == ECF_SUMMARIES:
+            self.summaries.setdefault((year, row["ECF_Area"]), []).append(row["Ave_ECF"])
+            self.area_names[row["ECF_Area"]] = row["Subdivision"]
+            return
+        if table == LAND_ADJUSTMENTS:
+            self.adjustments[(year, row["Area_Code"])] = row["Adjust_Factor"]
+            self.area_names[row["Area_Code"]] = row["Subdivision"]
+            return
+        key = parcel_key(row["Parcel_Number"] or "")
+        if key is None:
+            return
+        if row["Street_Address"]:
+            self.addresses[key] = row["Street_Address"]
+        # A parcel's area is its latest year's; within a year the sales and
+        # land books' codes beat the ECF book's, which are less reliable.
+        area = row.get("ECF_Area_Code") if table == ECF else row.get("ECF_Area")
+        rank = (year, table != ECF)
+        if area and rank >= self._area.get(key, ((0, False), None))[0]:
+            self._area[key] = (rank, area)
+        if table == ECF:
+            self.ecf.setdefault(key, {})[year] = row
+        elif table == LAND:
+            self.land.setdefault(key, {})[year] = row
+        elif table == SALES and row["Sale_Date"] and row["Adj_Sale"]:
+            sale = Sale(key, row["Street_Address"], row["Sale_Date"], row["Adj_Sale"],
+                        row["Terms_of_Sale"], row["ECF_Area"])
+            self.study_sales.setdefault((year, row["ECF_Area"]), []).append((sale, row))
+
+    def _unique_sales(self):
+        """{area: [Sale]} of every sale in any sales book, once each, newest first."""
+        found = {}
+        for (_, area), sales in sorted(self.study_sales.items(), reverse=True):
+            for sale, _ in sales:
+                found.setdefault((sale.parcel, sale.date), sale._replace(area=area))
+        by_area = {}
+        for sale in sorted(found.values(), key=lambda s: s.date, reverse=True):
+            by_area.setdefault(self.parcel_areas.get(sale.parcel, sale.area), []).append(sale)
+        return by_area
+
+    @property
+    def comps(self):
+        if self._comps is None:
+            self._comps = CompIndex(read=self.read)
+        return self._comps
+
+    def area_ecf(self, year, area):
+        """The area's township Ave. E.C.F. for a year, or None.
+
+        Some books print several average lines per area; prefer the one
+        matching the mean of the area's recomputed row ECFs.
+        """
+        printed = self.summaries.get((year, area))
+        if not printed:
+            return None
+        recomputed = [row_ecf(rows[year]) for key, rows in self.ecf.items()
+                      if year in rows and rows[year]["ECF_Area_Code"] == area]
+        recomputed = [e for e in recomputed if e is not None]
+        if recomputed:
+            mean = sum(recomputed) / len(recomputed)
+            for value in printed:
+                if value is not None and abs(value - mean) <= DEFAULT_TOLERANCE:
+                    return value
+        return printed[0]
+
+    def subject(self, parcel, sev=None, taxable=None, area=None, address=None):
+        """The Subject for a parcel number; area and address are needed if no book lists it."""
+        key = parcel_key(parcel)
+        if key is None:
+            raise ValueError(f"{parcel!r} is not a parcel number")
+        area = area or self.parcel_areas.get(key)
+        if area is None:
+            raise KeyError(f"{normalize_parcel(parcel)} is not in the study books; give its ECF area")
+        address = address or self.addresses.get(key) or normalize_parcel(parcel)
+        return Subject(normalize_parcel(parcel), title_case(address), area,
+                       title_case(self.area_names.get(area, area)), sev, taxable)
+
+    def area_parcels(self, area):
+        return sorted(key for key, a in self.parcel_areas.items() if a == area)
+
+
+def row_ecf(row):
+    """Bldg_Residual / Cost_Man of an ECF row (the printed ECF column is not always the ECF)."""
+    if row["Bldg_Residual"] is None or not row["Cost_Man"]:
+        return None
+    return row["Bldg_Residual"] / row["Cost_Man"]
+
+
+def implied_tcv(subject):
+    return subject.sev * 2 if subject.sev else None
+
+
+def area_sales(data, area):
+    """An area's arm's-length sales in any sales book, newest first."""
+    return [s for s in data.sales.get(area, ()) if s.terms == ARMS_LENGTH]
+
+
+def title_page(pdf, data, subject):
+    today = datetime.date.today()
+    pdf.title_block(f"{subject.address}, {subject.area_name} ({subject.area}), Pittsfield Township",
+                    data.years, f"{today:%B} {today.day}, {today.year}")
+    calendar = APPEAL_CALENDAR.get(data.years[-1])
+    if calendar:
+        pdf.deadline_box(f"APPEAL DEADLINE: {calendar['deadline']}")
+
+
+def executive_summary(pdf, data, subject):
+    pdf.section_heading("Executive Summary")
+    sales = area_sales(data, subject.area)
+    prices = [s.price for s in sales]
+    latest = data.years[-1]
+    ecf = data.area_ecf(latest, subject.area)
+    text = (f"Analysis of {len(data.years)} years of Pittsfield Township assessment data "
+            f"({data.years[0]}-{latest}) -- the Residential Sales, ECF and Land Analyses -- for "
+            f"{subject.address} in {subject.area_name} ({subject.area}).")
+    if ecf is not None:
+        text += (f" The township's {latest} Economic Condition Factor for {subject.area} is {ecf:.3f}"
+                 + (f": cost-approach values exceed sale prices by about {1 - ecf:.0%}." if ecf < 1 else "."))
+    pdf.body_text(text)
+
+    pdf.bold_text(f"For {subject.address} specifically:")
+    tcv = implied_tcv(subject)
+    if tcv:
+        pdf.bullet(f"{latest} SEV: {money(subject.sev)} -> Implied TCV: {money(tcv)}")
+    if subject.taxable:
+        pdf.bullet(f"Taxable Value: {money(subject.taxable)}")
+    if prices:
+        pdf.bullet(f"{len(prices)} arm's-length {subject.area} sales: average {money(statistics.mean(prices))}, "
+                   f"median {money(statistics.median(prices))}")
+        if tcv:
+            above = sum(p > tcv for p in prices)
+            pdf.bullet(f"{above} of {len(prices)} sales exceeded the implied TCV of {money(tcv)}")
+            low, high = np.percentile(prices, [25, 75])
+            if high < tcv:
+                pdf.bullet(f"Supported TCV: {money(low)}-{money(high)} (SEV: {money(low / 2)}-{money(high / 2)}); "
+                           f"potential reduction {money(subject.sev - high / 2)}-{money(subject.sev - low / 2)} "
+                           "in assessed value")
+    pdf.ln(3)
+
+
+def ecf_section(pdf, data, subject):
+    pdf.section_heading(f"1. The Township's ECF Data for {subject.area_name}")
+    pdf.body_text(
+        "The Economic Condition Factor (ECF) is the township's own metric comparing actual arm's-length "
+        "sale prices to cost-approach valuations. An ECF below 1.0 means the cost approach overvalues "
+        "properties compared to what they actually sell for."
+    )
+    pdf.section_heading(f"{subject.area} ECF Trend ({len(data.years)}-Year)", level=2)
+    trend = []
+    for year in data.years:
+        ecf = data.area_ecf(year, subject.area)
+        if ecf is None:
+            meaning = f"{subject.area} not in the {year} ECF summaries"
+        elif ecf < 1:
+            meaning = f"Cost values exceed market by {1 - ecf:.1%}"
+        else:
+            meaning = f"Market exceeds cost values by {ecf - 1:.1%}"
+        trend.append([str(year), "N/A" if ecf is None else f"{ecf:.3f}", meaning])
+    pdf.add_table(["Year", "Ave. ECF", "What It Means"], trend, col_widths=[25, 25, 120])
+
+    rows, values = [], []
+    for key in data.area_parcels(subject.area):
+        by_year = data.ecf.get(key)
+        if not by_year:
+            continue
+        latest = by_year[max(by_year)]
+        cells = []
+        for year in data.years:
+            ecf = row_ecf(by_year[year]) if year in by_year else None
+            cells.append("--" if ecf is None else f"{ecf:.3f}")
+            if ecf is not None:
+                values.append((ecf, year, latest["Street_Address"]))
+        rows.append([normalize_parcel(latest["Parcel_Number"]), title_case(latest["Street_Address"] or ""),
+                     money(latest["Adj_Sale"] or latest["Sale_Price"] or 0)] + cells)
+    if rows:
+        pdf.section_heading(f"ECF Per Individual Property ({subject.area})", level=2)
+        pdf.bulk_table(["Parcel", "Address", "Sale Price"] + [f"{year} ECF" for year in data.years], rows,
+                       col_widths=[32, 36, 22] + [22] * len(data.years), font_size=7.5)
+        if values:
+            below = [v for v in values if v[0] < 1]
+            lowest = min(values)
+            pdf.bold_text(f"{len(below)} of {len(values)} ECF values are below 1.0. The lowest was "
+                          f"{lowest[0]:.3f} ({title_case(lowest[2] or '')} in {lowest[1]}), meaning the cost "
+                          f"approach overvalued that property by {1 - lowest[0]:.1%} compared to its sale price."
+                          if lowest[0] < 1 else
+                          f"None of the {len(values)} ECF values is below 1.0.")
+
+    ecf = data.area_ecf(data.years[-1], subject.area)
+    tcv = implied_tcv(subject)
+    if tcv and ecf is not None and ecf < 1:
+        pdf.section_heading(f"What the ECF Means for {subject.address}", level=2)
+        pdf.body_text(f"If the cost approach produces the {data.years[-1]} assessment and the ECF for this "
+                      f"area is {ecf:.3f}, the market-adjusted value is approximately:")
+        pdf.bullet("Cost-based TCV x ECF = Market TCV")
+        pdf.bullet(f"{money(tcv)} x {ecf:.3f} = {money(tcv * ecf)}")
+        pdf.ln(2)
+
+
+def sales_section(pdf, data, subject):
+    pdf.section_heading("2. Comparable Sales Analysis")
+    tcv = implied_tcv(subject)
+    sales = area_sales(data, subject.area)
+    if sales:
+        pdf.section_heading(f"Arm's-Length Sales in {subject.area_name} ({subject.area})", level=2)
+        headers = ["#", "Address", "Sale Price", "Date"] + ([f"vs {money(tcv)} TCV"] if tcv else [])
+        rows = []
+        for i, sale in enumerate(sorted(sales, key=lambda s: -s.price), 1):
+            row = [str(i), title_case(sale.address or ""), money(sale.price), long_date(sale.date)]
+            if tcv:
+                diff = sale.price - tcv
+                row.append(f"{'+' if diff > 0 else ''}{money(diff)} ({abs(diff) / tcv:.1%})")
+            rows.append(row)
+        pdf.bulk_table(headers, rows, col_widths=[8, 45, 28, 30] + ([50] if tcv else []))
+
+        prices = [s.price for s in sales]
+        pdf.bold_text("Statistics:")
+        for label, value in (("Average", statistics.mean(prices)), ("Median", statistics.median(prices))):
+            vs = f" (assessment is {money(tcv - value)} {'above' if tcv > value else 'below'} " \
+                 f"{label.lower()})" if tcv else ""
+            pdf.bullet(f"{label}: {money(value)}{vs}")
+        pdf.bullet(f"Range: {money(min(prices))}-{money(max(prices))}")
+        if tcv:
+            above = sum(p > tcv for p in prices)
+            pdf.bullet(f"{above} of {len(prices)} sales ({above / len(prices):.0%}) exceeded {money(tcv)}")
+        pdf.ln(2)
+
+    try:
+        comps = data.comps.comps(subject.parcel, COMPARABLES)
+    except KeyError:
+        comps = []
+    if comps:
+        pdf.section_heading("Nearest Comparable Sales (Township-Wide)", level=2)
+        pdf.body_text("Arm's-length sales closest to this parcel in price, sale date, land value, "
+                      "cost-manual value, ECF area, street and building style:")
+        pdf.add_table(["#", "Address", "Area", "Sale Price", "Date", "Distance"],
+                      [[str(i), title_case(c.address or ""), c.area or "", money(c.price), long_date(c.sale_date),
+                        f"{c.distance:.3f}"] for i, c in enumerate(comps, 1)],
+                      col_widths=[8, 45, 18, 28, 30, 22])
+        nearby = [c for c in comps if street_name(c.address or "") == street_name(subject.address)]
+        if nearby:
+            pdf.italic_text(f"{len(nearby)} of the {len(comps)} nearest sales are on "
+                            f"{title_case(street_name(subject.address))}.")
+
+
+def land_section(pdf, data, subject):
+    pdf.section_heading("3. Land Value Analysis")
+    key = parcel_key(subject.parcel)
+    own = data.land.get(key, {})
+    rows = []
+    for year in data.years:
+        factor = data.adjustments.get((year, subject.area))
+        land = own.get(year)
+        rows.append([str(year),
+                     money(land["Land_Value_Prior"]) if land and land.get("Land_Value_Prior") else "--",
+                     f"{factor:.4f} ({factor - 1:+.1%})" if factor else "--",
+                     money(land["Land_Value_Current"]) if land and land.get("Land_Value_Current") else "--"])
+    pdf.body_text(f"The township's land analysis for {subject.area}"
+                  + (f" and {subject.address}:" if own else " (this parcel is not in the land books):"))
+    pdf.add_table(["Year", "Prior Land Value", "Adjustment Factor", "Current Land Value"], rows,
+                  col_widths=[25, 40, 40, 40])
+
+    residuals = []
+    for parcel in data.area_parcels(subject.area):
+        by_year = data.land.get(parcel, {})
+        if by_year:
+            row = by_year[max(by_year)]
+            if row["Land_Residual"] and row["Adj_Sale"]:
+                residuals.append(row)
+    if residuals:
+        pdf.section_heading("Land Residual Analysis (What the Market Says Land Is Worth)", level=2)
+        pdf.body_text('The township calculates "land residual" by subtracting building value from '
+                      f"sale price. For {subject.area} sales:")
+        shares = [row["Land_Residual"] / row["Adj_Sale"] for row in residuals]
+        pdf.bulk_table(["Address", "Sale Price", "Land Residual", "% of Sale"],
+                       [[title_case(row["Street_Address"] or ""), money(row["Adj_Sale"]), money(row["Land_Residual"]),
+                         f"{share:.1%}"] for row, share in zip(residuals, shares)],
+                       col_widths=[45, 30, 35, 25])
+        if len(shares) > 1:
+            pdf.body_text(f"Land residuals range from {min(shares):.1%} to {max(shares):.1%} of the sale "
+                          "price, which underscores the difficulty of the cost approach here and supports "
+                          "reliance on the sales-comparison method.")
+
+
+def coverage_section(pdf, data, subject):
+    pdf.section_heading("4. Year-Over-Year Sales Study Coverage")
+    rows, missing = [], []
+    for year in data.years:
+        sales = [s for s, _ in data.study_sales.get((year, subject.area), ())]
+        dates = sorted(s.date for s in sales)
+        used = f"{dates[0].year}-{dates[-1].year} sales" if dates else "(none in the sales analysis)"
+        rows.append([str(year), str(len(sales)), used])
+        if not sales:
+            missing.append(year)
+    pdf.add_table(["Year", f"# of {subject.area} Sales in Study", "Sales Used"], rows, col_widths=[25, 55, 65])
+    if missing and len(missing) < len(data.years):
+        pdf.bold_text(f"The {', '.join(map(str, missing))} sales analysis includes no {subject.area} sales. "
+                      f"What market evidence supports those {subject.area} assessments?")
+
+
+def ratio_section(pdf, data, subject):
+    year, area, assessed, price = [], [], [], []
+    for (study_year, study_area), sales in data.study_sales.items():
+        if study_area != subject.area:
+            continue
+        for sale, row in sales:
+            if sale.terms == ARMS_LENGTH and (row.get("Asd_When_Sold") or 0) > 0:
+                year.append(study_year)
+                area.append(study_area)
+                assessed.append(row["Asd_When_Sold"])
+                price.append(sale.price)
+    if not year:
+        return
+    result = study(make_sample(year, area, assessed, price), seed=0)
+    pdf.section_heading("5. Assessment Uniformity (Sales-Ratio Study)")
+    pdf.body_text(f"Assessment when sold over adjusted sale price for {subject.area}'s arm's-length sales. "
+                  "Michigan assesses at 50% of true cash value; IAAO standards call for a COD of 15 or "
+                  "less and a PRD between 0.98 and 1.03.")
+    rows = []
+    for i, (key_year, _) in enumerate(result.keys):
+        low, high = (result.intervals["median"][0][i], result.intervals["median"][1][i]) \
+            if result.intervals else (np.nan, np.nan)
+        rows.append([str(key_year), str(result.count[i]), f"{result.median[i]:.3f}",
+                     "--" if np.isnan(low) else f"{low:.3f}-{high:.3f}", f"{result.cod[i]:.1f}",
+                     f"{result.prd[i]:.3f}"])
+    pdf.add_table(["Year", "Sales", "Median Ratio", "95% CI", "COD", "PRD"], rows,
+                  col_widths=[20, 20, 30, 35, 20, 20])
+
+
+def legal_section(pdf, data, subject):
+    pdf.section_heading("6. Legal Framework")
+    pdf.section_heading("Key Legal Standards", level=2)
+    pdf.add_table(["Principle", "Citation", "Application"], LEGAL_STANDARDS, col_widths=[48, 55, 67],
+                  font_size=7.5)
+    if subject.taxable:
+        pdf.section_heading("Proposal A Taxable Value", level=2)
+        pdf.body_text(f"Even if the assessed value is reduced but remains above the taxable value "
+                      f"({money(subject.taxable)}), the reduction still benefits the homeowner by:")
+        pdf.bullet("Constraining future taxable value growth (TV grows from the lower base)")
+        pdf.bullet("Establishing a lower baseline for property transfer adjustments")
+        pdf.bullet("Demonstrating a pattern for future appeals")
+        pdf.ln(2)
+
+
+def process_section(pdf, data, subject):
+    calendar = APPEAL_CALENDAR.get(data.years[-1], {})
+    pdf.section_heading("7. Appeal Process")
+    pdf.section_heading("Step 1: Board of Review (REQUIRED)", level=2)
+    rows = [["Deadline", calendar["deadline"]]] if calendar else []
+    if calendar:
+        rows += [["Organizational Meeting", calendar["organizational"]],
+                 ["Public Hearings", calendar["hearings"]]]
+    rows += [
+        ["Location", "6201 W. Michigan Ave, Ann Arbor, MI 48108"],
+        ["Phone", "734-822-3115"],
+        ["Email", "assessing@pittsfield-mi.gov"],
+        ["Form", "L-4035 Petition to Board of Review"],
+        ["Written petitions", "Accepted in lieu of personal appearance"],
+    ]
+    pdf.add_table(["Detail", "Information"], rows, col_widths=[45, 125])
+    pdf.section_heading("Step 2: Michigan Tax Tribunal", level=2)
+    rows = [["Deadline", calendar["tribunal"]]] if calendar else []
+    rows += [
+        ["Filing Fee", "None if PRE >= 50%"],
+        ["Division", "Small Claims"],
+        ["Standard", "De novo (independent determination)"],
+        ["Burden", "Petitioner, preponderance of evidence"],
+        ["File", "michigan.gov/taxtrib"],
+    ]
+    pdf.add_table(["Detail", "Information"], rows, col_widths=[45, 125])
+
+
+def sources_section(pdf, data, subject):
+    pdf.section_heading("Data Sources")
+    pdf.body_text("All data in this analysis comes from official Pittsfield Township documents:")
+    for _, spec in sorted(registry().items(), key=lambda item: (item[0][1], DOC_NAMES[item[0][0]])):
+        count = len(data.read(spec_sources(spec)[0]))
+        unit = "sales" if spec.doc_type == "sales" else "properties"
+        pdf.bullet(f"{spec.year} {DOC_NAMES[spec.doc_type]} ({count:,} {unit})")
+    pdf.ln(3)
+    pdf.italic_text("These documents are available from the Pittsfield Township Assessing Office "
+                    "and at pittsfield-mi.gov/2230/Property-Assessment-Data.")
+
+
+def appendix_section(pdf, data, subject):
+    """Every sale and every ECF row the study books list for the area, one table each."""
+    sales = data.sales.get(subject.area, [])
+    if sales:
+        pdf.add_page()
+        pdf.section_heading(f"Appendix A: {subject.area} Sales in the Sales Studies")
+        pdf.bulk_table(["Sale Date", "Parcel", "Address", "Adj. Sale", "Terms of Sale"],
+                       [[f"{s.date:%m/%d/%Y}", format_parcel(s.parcel), title_case(s.address or ""), money(s.price),
+                         s.terms or ""] for s in sales],
+                       col_widths=[20, 30, 45, 22, 53], font_size=7.5)
+    rows = []
+    for key in data.area_parcels(subject.area):
+        for year, row in sorted(data.ecf.get(key, {}).items()):
+            ecf = row_ecf(row)
+            rows.append([str(year), format_parcel(key), title_case(row["Street_Address"] or ""),
+                         f"{row['Sale_Date']:%m/%d/%Y}" if row["Sale_Date"] else "",
+                         money(row["Adj_Sale"]) if row["Adj_Sale"] is not None else "",
+                         money(row["Bldg_Residual"]) if row["Bldg_Residual"] is not None else "",
+                         money(row["Cost_Man"]) if row["Cost_Man"] is not None else "",
+                         "--" if ecf is None else f"{ecf:.3f}"])
+    if rows:
+        rows.sort(key=lambda r: (r[0], r[1]))
+        pdf.section_heading(f"Appendix B: {subject.area} Rows in the ECF Analyses")
+        pdf.bulk_table(["Year", "Parcel", "Address", "Sale Date", "Adj. Sale", "Bldg. Residual", "Cost Man.", "ECF"],
+                       rows, col_widths=[12, 28, 38, 18, 20, 22, 20, 12], font_size=7.5)
+        pdf.footnote("ECF = Bldg. Residual / Cost Man., recomputed from each row.")
+
+
+SECTIONS = (title_page, executive_summary, ecf_section, sales_section, land_section, coverage_section,
+            ratio_section, legal_section, process_section, sources_section, appendix_section)
+
+
+def report_path(subject, report_dir=DEFAULT_REPORT_DIR):
+    return os.path.join(report_dir, f"{subject.parcel}_Tax_Appeal_Analysis.pdf")
+
+
+def build_report(data, subject, output=None):
+    """Draw subject's report with every section and write it atomically; returns the path written."""
+    pdf = AnalysisPDF(subject=f"{subject.address} ({subject.area})")
+    pdf.alias_nb_pages()
+    pdf.set_auto_page_break(auto=True, margin=20)
+    pdf.add_page()
+    for section in SECTIONS:
+        section(pdf, data, subject)
+    output = output or report_path(subject)
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    tmp = output + ".tmp"
+    pdf.output(tmp)
+    os.replace(tmp, output)
+    return output
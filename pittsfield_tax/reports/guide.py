@@ -0,0 +1,442 @@
+"""The Word appeal guide for any parcel, built from the converted data.
+
+The same document as the PaulinaDrAnalysis/generate_appeal_guide.py
+template -- why to appeal, how assessment works, the owner's property
+information, comparable sales with their ECFs, filing steps, what to
+include and the legal standards -- with the area's numbers, the parcel's
+details and its nearest comparables filled in from ReportData.
+"""
+import copy
+import io
+import os
+import re
+import statistics
+import zipfile
+
+from docx import Document
+from docx.enum.table import WD_TABLE_ALIGNMENT
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml.ns import qn
+from docx.shared import Pt, RGBColor
+from lxml import etree
+
+from pittsfield_tax.reports.engine import (
+    APPEAL_CALENDAR, COMPARABLES, DEFAULT_REPORT_DIR, area_sales, implied_tcv, money, row_ecf,
+    title_case,
+)
+
+_SLOT = re.compile(r"\{(\w+)\}")
+
+
+def add_heading_styled(doc, text, level=1):
+    h = doc.add_heading(text, level=level)
+    for run in h.runs:
+        run.font.color.rgb = RGBColor(0, 51, 102)
+    return h
+
+
+def add_table(doc, headers, rows):
+    table = doc.add_table(rows=1 + len(rows), cols=len(headers))
+    table.style = 'Light Grid Accent 1'
+    table.alignment = WD_TABLE_ALIGNMENT.CENTER
+    for i, h in enumerate(headers):
+        cell = table.rows[0].cells[i]
+        cell.text = h
+        for p in cell.paragraphs:
+            p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            for run in p.runs:
+                run.bold = True
+                run.font.size = Pt(9)
+    for r_idx, row in enumerate(rows):
+        for c_idx, val in enumerate(row):
+            cell = table.rows[r_idx + 1].cells[c_idx]
+            cell.text = val
+            for p in cell.paragraphs:
+                p.alignment = WD_ALIGN_PARAGRAPH.CENTER if c_idx > 0 else WD_ALIGN_PARAGRAPH.LEFT
+                for run in p.runs:
+                    run.font.size = Pt(9)
+    return table
+
+
+def _fill_in(doc, label, value, note=None, label2=None, value2=None):
+    p = doc.add_paragraph()
+    p.add_run(label).bold = True
+    p.add_run(value)
+    if label2:
+        p.add_run(label2).bold = True
+        p.add_run(value2)
+    if note:
+        p.add_run(note).font.color.rgb = RGBColor(128, 128, 128)
+
+
+def why_bullets(data, subject):
+    """The "why appeal" bullets: area ECF, resale ceiling, average sale, ECF and land trends."""
+    latest = data.years[-1]
+    bullets = []
+    ecf = data.area_ecf(latest, subject.area)
+    if ecf is not None and ecf < 1:
+        bullets.append(f"The Economic Condition Factor (ECF) for {subject.area} is {ecf:.3f}, meaning the "
+                       f"township's cost-approach values exceed actual sale prices by approximately {1 - ecf:.0%}.")
+    sales = area_sales(data, subject.area)
+    tcv = implied_tcv(subject)
+    if sales:
+        top = max(sales, key=lambda s: s.price)
+        if tcv and top.price < tcv:
+            bullets.append(f"No home in {subject.area} has sold at or above {money(tcv)}. The highest sale "
+                           f"was {money(top.price)} ({title_case(top.address or '')}, {top.date:%B %Y}).")
+        bullets.append(f"The average arm's-length sale price across {len(sales)} sales in {subject.area} is "
+                       f"{money(statistics.mean(s.price for s in sales))}.")
+    trend = [(year, data.area_ecf(year, subject.area)) for year in data.years]
+    trend = [(year, value) for year, value in trend if value is not None]
+    if len(trend) > 1 and all(value < 1 for _, value in trend):
+        bullets.append(f"ECF has been below 1.0 for {len(trend)} years: "
+                       + " -> ".join(f"{value:.3f} ({year})" for year, value in trend) + ".")
+    factors = [(year, data.adjustments.get((year, subject.area))) for year in data.years]
+    factors = [(year, f) for year, f in factors if f]
+    if factors:
+        total = 1.0
+        for _, f in factors:
+            total *= f
+        bullets.append(f"Land values in {subject.area} were adjusted {total - 1:+.1%} over {len(factors)} years: "
+                       + ", ".join(f"{f:.4f} ({year})" for year, f in factors) + ".")
+    return bullets
+
+
+def sales_rows(data, subject):
+    """Address, price, date and each year's ECF (newest year first) of the area's arm's-length sales."""
+    rows = []
+    for sale in area_sales(data, subject.area):
+        by_year = data.ecf.get(sale.parcel, {})
+        cells = []
+        for year in reversed(data.years):
+            ecf = row_ecf(by_year[year]) if year in by_year else None
+            cells.append("--" if ecf is None else f"{ecf:.3f}")
+        rows.append([title_case(sale.address or ""), money(sale.price), f"{sale.date:%m/%Y}"] + cells)
+    return rows
+
+
+def comp_rows(data, subject):
+    try:
+        comps = data.comps.comps(subject.parcel, COMPARABLES)
+    except KeyError:
+        return []
+    return [[f"{title_case(c.address or '')} ({c.area})", money(c.price), f"{c.sale_date:%m/%Y}",
+             f"{c.distance:.3f}"] for c in comps if c.area != subject.area]
+
+
+def _text(element):
+    return "".join(t.text or "" for t in element.iter(qn("w:t")))
+
+
+def _set_text(element, texts):
+    """Set the text of element's runs, in document order, to texts."""
+    for t, text in zip(element.iter(qn("w:t")), texts):
+        t.text = text
+
+
+def _detach(element):
+    element.getparent().remove(element)
+    return element
+
+
+class GuideTemplate:
+    """The guide's static skeleton, built once per ReportData and cloned per parcel.
+
+    Everything that is the same for every parcel -- styles, title, deadline,
+    the assessment, filing, evidence and legal sections, the contact block
+    -- is laid out once. Parcel text is a {slot} in the skeleton's runs;
+    the bullet lists and tables are marker paragraphs, filled from prototype
+    paragraphs, sections and table rows cut out of the skeleton. A parcel's
+    guide is a deep copy of the skeleton's body with the slots filled in:
+    no style lookups, no per-cell python-docx calls, and save() writes only
+    the new document.xml next to the package parts compressed once.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.latest = data.years[-1]
+        self._static = None
+        doc = self.skeleton = Document()
+        style = doc.styles['Normal']
+        style.font.name = 'Calibri'
+        style.font.size = Pt(11)
+        latest, calendar = self.latest, APPEAL_CALENDAR.get(self.latest)
+
+        title = doc.add_heading(f'{latest} Property Tax Appeal Guide', level=0)
+        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        for run in title.runs:
+            run.font.color.rgb = RGBColor(0, 51, 102)
+        subtitle = doc.add_paragraph()
+        subtitle.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        run = subtitle.add_run('{address} | {area_name} ({area}) | Pittsfield Township')
+        run.font.size = Pt(14)
+        run.font.color.rgb = RGBColor(100, 100, 100)
+
+        if calendar:
+            deadline = doc.add_paragraph()
+            deadline.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            run = deadline.add_run(f'\nDEADLINE: Written appeals must be received by {calendar["deadline"]}\n')
+            run.bold = True
+            run.font.size = Pt(13)
+            run.font.color.rgb = RGBColor(180, 0, 0)
+            run2 = deadline.add_run('Pittsfield Township Assessing, 6201 W. Michigan Ave, Ann Arbor, MI 48108\n')
+            run2.font.size = Pt(10)
+        doc.add_paragraph('_' * 75)
+
+        add_heading_styled(doc, 'Why You Should Consider Appealing', level=1)
+        doc.add_paragraph(f'The {latest} assessments for homes in {{area_name}} ({{area}}) may '
+                          'overstate market value. The township\'s own data shows:')
+        doc.add_paragraph('{why}')
+
+        add_heading_styled(doc, 'How Michigan Property Tax Assessment Works', level=1)
+        doc.add_paragraph(
+            'Under Michigan law, the Assessed Value (SEV) must equal 50% of the property\'s True Cash '
+            'Value (TCV), defined as the "usual selling price" - the price a willing buyer and seller '
+            'would agree to in an arm\'s-length transaction (MCL 211.27). Your Taxable Value (TV) is '
+            'capped by Proposal A at the lesser of 5% or the CPI increase per year.'
+        )
+        doc.add_paragraph(
+            'Even if reducing the assessed value does not immediately lower your tax bill (because '
+            'TV < AV), it constrains future taxable value growth and establishes a lower baseline '
+            'for when the property transfers or when TV catches up to AV.'
+        )
+
+        add_heading_styled(doc, 'Your Property Information', level=1)
+        blank = '$___________'
+        _fill_in(doc, 'Parcel Number: ', '{parcel}')
+        _fill_in(doc, 'Property Address: ', '{address}')
+        _fill_in(doc, f'{latest} Assessed Value (SEV): ', '{sev}    ',
+                 label2='Implied TCV (SEV x 2): ', value2='{tcv}')
+        _fill_in(doc, f'{latest} Taxable Value: ', '{taxable}')
+        _fill_in(doc, 'Your Requested TCV: ', blank + '    ', label2='Your Requested SEV: ', value2=blank)
+        doc.add_paragraph()
+
+        last = self._last()
+        add_heading_styled(doc, 'Comparable Sales in {area_name} ({area})', level=1)
+        doc.add_paragraph('The following arm\'s-length sales have occurred in {area_name}, '
+                          'with each year\'s ECF (below 1.0 means the cost approach overvalues the property).')
+        add_table(doc, ["Address", "Sale Price", "Date"] + [f"ECF '{year % 100:02d}" for year in reversed(data.years)],
+                  [["-"] * (3 + len(data.years))])
+        doc.add_paragraph()
+        self._sales = self._cut(last)
+        doc.add_paragraph('{sales}')
+
+        last = self._last()
+        add_heading_styled(doc, 'Nearest Sales in Other Areas', level=2)
+        add_table(doc, ["Address (Area)", "Sale Price", "Date", "Distance"], [["-"] * 4])
+        doc.add_paragraph()
+        self._comps = self._cut(last)
+        doc.add_paragraph('{comps}')
+
+        add_heading_styled(doc, 'How to File Your Appeal', level=1)
+        add_heading_styled(doc, 'Step 1: Board of Review (Required First Step)', level=2)
+        doc.add_paragraph(
+            'You MUST file with the Pittsfield Township Board of Review first. '
+            'Skipping this forfeits your right to appeal to the Michigan Tax Tribunal.'
+        )
+        step1_bullets = []
+        if calendar:
+            step1_bullets += [f'Public Hearings: {calendar["hearings"]}',
+                              f'Written Appeal Deadline: {calendar["deadline"]}']
+        step1_bullets += [
+            'Location: 6201 W. Michigan Avenue, Ann Arbor, MI 48108',
+            'Phone: 734-822-3115 | Email: assessing@pittsfield-mi.gov',
+            'Form Required: Petition to Board of Review (Form L-4035)',
+            'Written petitions are accepted in lieu of personal appearance',
+            'If mailing, send certified with return receipt requested',
+        ]
+        for b in step1_bullets:
+            doc.add_paragraph(b, style='List Bullet')
+        add_heading_styled(doc, 'Step 2: Michigan Tax Tribunal (If Board Denies)', level=2)
+        doc.add_paragraph(
+            'If the Board does not grant adequate relief, file with the Michigan Tax Tribunal '
+            f'Small Claims Division{" by " + calendar["tribunal"] if calendar else ""}. No filing fee if your '
+            'property has a Principal Residence Exemption of at least 50%. File at michigan.gov/taxtrib.'
+        )
+
+        add_heading_styled(doc, 'What to Include in Your Appeal', level=1)
+        for b in [
+            'Completed Form L-4035 (download from michigan.gov or request from township)',
+            'Your property record card - VERIFY that square footage, bedrooms, bathrooms, '
+            'lot size, and condition rating are correct. Request from BSA Online (bsaonline.com/?uid=193)',
+            'Comparable sales analysis (use the table above or customize with your own comps)',
+        ]:
+            doc.add_paragraph(b, style='List Bullet')
+        doc.add_paragraph('{evidence}')
+        for b in [
+            'Any property-specific issues: needed repairs, functional obsolescence, etc.',
+            'Professional appraisal ($300-$500) for the strongest possible case',
+        ]:
+            doc.add_paragraph(b, style='List Bullet')
+
+        add_heading_styled(doc, 'Legal Standards That Favor Homeowners', level=1)
+        doc.add_paragraph(
+            'Under Michigan law (MCL 211.27), "true cash value" means the usual selling price - '
+            'not replacement cost, not automated valuations (like Zillow Zestimates), and not '
+            'listing prices. Key legal precedents:'
+        )
+        legal_bullets = [
+            'There is NO presumption that the assessor\'s value is correct '
+            '(Alhi Development Co v Orion Twp, 110 Mich App 764, 1981)',
+            'The sales-comparison approach is the most persuasive method for residential property '
+            '(Meadowlanes Ltd v Holland, 437 Mich 473, 1991)',
+            '"True cash value" is the usual selling price in an arm\'s-length transaction '
+            '(Huron Ridge LP v Ypsilanti Twp, 275 Mich App 23, 2007)',
+        ]
+        for b in legal_bullets:
+            doc.add_paragraph(b, style='List Bullet')
+
+        doc.add_paragraph('_' * 75)
+        contact = doc.add_paragraph()
+        contact.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        run = contact.add_run('Pittsfield Township Assessing Office\n')
+        run.bold = True
+        run.font.size = Pt(11)
+        contact.add_run('6201 W. Michigan Avenue, Ann Arbor, MI 48108\n')
+        contact.add_run('Phone: 734-822-3115 | Email: assessing@pittsfield-mi.gov\n')
+        contact.add_run('BSA Online: bsaonline.com/?uid=193 | Township: pittsfield-mi.gov')
+
+        self._bullet = _detach(doc.add_paragraph('-', style='List Bullet')._p)
+        body = doc.element.body
+        # Marker paragraphs by position, last first so filling one keeps the others' positions.
+        self._markers = [(i, _text(child)[1:-1]) for i, child in enumerate(body)
+                         if child.tag == qn("w:p") and _text(child) in ("{why}", "{sales}", "{comps}", "{evidence}")]
+        self._markers.reverse()
+
+    def _last(self):
+        """The skeleton's last body element (the section properties always follow it)."""
+        return self.skeleton.element.body[-2]
+
+    def _cut(self, last):
+        """Remove and return the skeleton's body elements added after last."""
+        return [_detach(element) for element in list(last.itersiblings()) if element.tag != qn("w:sectPr")]
+
+    def _bullets(self, texts):
+        bullets = []
+        for text in texts:
+            bullet = copy.deepcopy(self._bullet)
+            _set_text(bullet, [text])
+            bullets.append(bullet)
+        return bullets
+
+    @staticmethod
+    def _section(prototype, rows):
+        """Copies of a cut-out section with its table's prototype row replaced by rows."""
+        if not rows:
+            return []
+        section = [copy.deepcopy(element) for element in prototype]
+        table = next(element for element in section if element.tag == qn("w:tbl"))
+        row = _detach(table.findall(qn("w:tr"))[-1])
+        for values in rows:
+            tr = copy.deepcopy(row)
+            _set_text(tr, values)
+            table.append(tr)
+        return section
+
+    def _fill(self, body, subject):
+        """Fill the slots of body, a copy of the skeleton's w:body, for subject."""
+        data = self.data
+        ecf = data.area_ecf(self.latest, subject.area)
+        blocks = {
+            "why": self._bullets(why_bullets(data, subject)),
+            "sales": self._section(self._sales, sales_rows(data, subject)),
+            "comps": self._section(self._comps, comp_rows(data, subject)),
+            "evidence": self._bullets(
+                [f'The township\'s own ECF data showing {subject.area} ECF of {ecf:.3f} ({self.latest})']
+                if ecf is not None else []),
+        }
+        tcv = implied_tcv(subject)
+        blank = '$___________'
+        values = {
+            "parcel": subject.parcel, "address": subject.address, "area": subject.area,
+            "area_name": subject.area_name, "sev": money(subject.sev) if subject.sev else blank,
+            "tcv": money(tcv) if tcv else blank, "taxable": money(subject.taxable) if subject.taxable else blank,
+        }
+        for i, name in self._markers:
+            marker = body[i]
+            for element in blocks[name]:
+                marker.addprevious(element)
+            body.remove(marker)
+        for t in body.iter(qn("w:t")):
+            if t.text and "{" in t.text:
+                t.text = _SLOT.sub(lambda m: values.get(m.group(1), m.group(0)), t.text)
+
+    def document(self, subject):
+        """subject's guide, as a python-docx Document read back from the package save() writes.
+
+        >>> from pittsfield_tax.reports.engine import ReportData
+        >>> data = ReportData()
+        >>> template, subject = GuideTemplate(data), data.subject("L-12-13-311-036")
+        >>> buffer = io.BytesIO()
+        >>> template.save(subject, buffer)
+        >>> texts = [p.text for p in template.document(subject).paragraphs]
+        >>> texts == [p.text for p in Document(buffer).paragraphs]
+        True
+        >>> any("{" in text for text in texts)
+        False
+        """
+        return Document(io.BytesIO(self.package(subject)))
+
+    def _static_package(self):
+        """The skeleton's .docx bytes without its main document part, and that part's name.
+
+        Styles, numbering, theme, settings and relationships are the same in
+        every guide, so they are serialized and compressed once; save() only
+        appends each parcel's document.xml.
+        """
+        if self._static is None:
+            buffer = io.BytesIO()
+            self.skeleton.save(buffer)
+            name = self.skeleton.part.partname.lstrip("/")
+            static = io.BytesIO()
+            with zipfile.ZipFile(buffer) as source, zipfile.ZipFile(static, "w", zipfile.ZIP_DEFLATED) as target:
+                for info in source.infolist():
+                    if info.filename != name:
+                        target.writestr(info, source.read(info))
+            self._static = (static.getvalue(), name)
+        return self._static
+
+    def package(self, subject):
+        """subject's guide as .docx bytes."""
+        static, name = self._static_package()
+        root = self.skeleton.element
+        body = copy.deepcopy(root.body)
+        self._fill(body, subject)
+        document = root.makeelement(root.tag, root.attrib, root.nsmap)
+        document.append(body)
+        buffer = io.BytesIO(static)
+        with zipfile.ZipFile(buffer, "a", zipfile.ZIP_DEFLATED) as package:
+            package.writestr(name, etree.tostring(document, encoding="UTF-8", standalone=True))
+        return buffer.getvalue()
+
+    def save(self, subject, path):
+        """Write subject's guide to path, a file name or a binary file (not atomically; see build_guide)."""
+        if hasattr(path, "write"):
+            path.write(self.package(subject))
+            return
+        with open(path, "wb") as f:
+            f.write(self.package(subject))
+
+
+def build_guide_document(data, subject):
+    """The guide as a python-docx Document (GuideTemplate(data).document(subject))."""
+    return GuideTemplate(data).document(subject)
+
+
+def guide_path(subject, report_dir=DEFAULT_REPORT_DIR):
+    return os.path.join(report_dir, f"{subject.parcel}_Appeal_Guide.docx")
+
+
+def build_guide(data, subject, output=None, template=None):
+    """Write subject's Word appeal guide atomically; returns the path written.
+
+    Pass a GuideTemplate of data when writing many guides so the skeleton
+    is built once.
+    """
+    template = template or GuideTemplate(data)
+    output = output or guide_path(subject)
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    tmp = output + ".tmp"
+    template.save(subject, tmp)
+    os.replace(tmp, output)
+    return output
@@ -0,0 +1,337 @@
+"""Analysis PDFs straight from the analysis Markdown.
+
+python -m pittsfield_tax.reports.markdown FILE.md [--output PATH] [--watch]
+
+Draws FILE.md with AnalysisPDF (default: FILE.pdf next to it), the way the
+hand-written generate_analysis_pdf.py scripts draw their copies of the
+same text:
+
+    front matter          # title, ## subject, ### data years, **Prepared**
+                          and **Appeal Deadline** lines -> title_block and
+                          deadline_box
+    ## / ### heading      section_heading level 1 / 2
+    #### heading          bold_text
+    ``` fenced block      code_block, lines kept verbatim
+    | table |             add_table, columns sized to their contents
+    - item, 1. item       bullet / numbered_item; a leading **Label:** is the
+                          bold prefix, indented - items are the item's bullets
+    paragraph             body_text (bold_text / italic_text when it is all
+                          **bold** / *italic*), with inline bold and italic;
+                          `code` spans lose their backticks and keep their text
+
+The file is read a line at a time and each block is drawn as soon as it
+ends. Parsing a block gives the AnalysisPDF calls that draw it; a
+MarkdownRenderer keeps them keyed by the block's source lines, so after an
+edit only the changed blocks are parsed again. Pages are laid out in
+order, so the drawing itself always re-runs (a fifth of a second for the
+analysis files). --watch re-renders whenever the file changes.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+from pittsfield_tax.reports.pdf import AnalysisPDF
+
+# Characters the PDF core fonts (latin-1) lack, as the hand-written generators type them.
+PLAIN = str.maketrans({"—": "--", "–": "-", "→": "->", "←": "<-", "≥": ">=",
+                       "≤": "<=", "≈": "~", "†": "+", "‘": "'", "’": "'",
+                       "“": '"', "”": '"', "…": "...", "•": "-"})
+
+_FENCE = re.compile(r"```|~~~")
+_CODE_SPAN = re.compile(r"`([^`]+)`")
+_LIST_ITEM = re.compile(r"( *)(?:[-*+]|(\d+)\.) (.*)")
+_FRONT_LINE = re.compile(r"(?:Prepared|(Appeal Deadline)):\s*(.*)")
+_RULE = re.compile(r"(?:-{3,}|\*{3,}|_{3,})\s*")
+_TABLE_SEPARATOR = re.compile(r"\|?(\s*:?-+:?\s*\|)+\s*:?-*:?\s*")
+_LEADING_BOLD = re.compile(r"\*\*(.+?)\*\*(:?)\s*(.*)")
+# `code`, Markdown escapes, **, *, and the character pairs FPDF itself treats as markers.
+_INLINE = re.compile(r"`([^`]+)`|\\([\\`*_{}\[\]()#+\-.!|])|(\*\*)|(\*)|(--|__|~~)")
+_MARKER = re.compile(r"(\*\*|--|__|~~)")
+
+
+def plain(text):
+    """text with the characters the core fonts lack spelled out, and any others replaced by ?."""
+    return text.translate(PLAIN).encode("latin-1", "replace").decode("latin-1")
+
+
+def inline(text):
+    """Markdown inline emphasis as FPDF markdown: **bold** stays, *italic* becomes __italic__."""
+    def convert(m):
+        code, escaped, bold, italic, marker = m.groups()
+        if code is not None:
+            return _MARKER.sub(r"\\\1", code)
+        if escaped is not None:
+            return escaped
+        if bold:
+            return "**"
+        if italic:
+            return "__"
+        return "\\" + marker
+    return _INLINE.sub(convert, plain(text))
+
+
+def strip(text):
+    """Markdown inline text without its emphasis markers or code backticks."""
+    parts = _CODE_SPAN.split(plain(text))
+    return "".join(part if i % 2 else re.sub(r"\\(.)", r"\1", re.sub(r"(?<!\\)\*+", "", part))
+                   for i, part in enumerate(parts)).strip()
+
+
+def _emphasised(text):
+    """(style, text) when all of text is one **bold** or *italic* run, else None."""
+    m = re.fullmatch(r"\*\*((?:\\\*|[^*])+)\*\*", text) or re.fullmatch(r"\*((?:\\\*|[^*])+)\*", text)
+    if m:
+        return "B" if text.startswith("**") else "I", m.group(1)
+    return None
+
+
+def _has_emphasis(text):
+    return bool(re.search(r"(?<!\\)\*", text))
+
+
+# --- Blocks -----------------------------------------------------------------------------------------------
+
+def blocks(lines):
+    """(kind, lines) for each block of a Markdown file, yielded as soon as the block ends.
+
+    kind is "front", "heading", "rule", "code", "table", "list" or "text". A
+    fenced code block runs from its opening ``` (or ~~~) line to the closing
+    one, both included. A file that opens with a # title has front matter:
+    the title, the ## subject and ### years lines directly under it, and the
+    Prepared and Appeal Deadline lines after those. It ends at the first
+    other line, or at the first blank line after a Prepared or Appeal
+    Deadline line.
+
+    >>> [kind for kind, _ in blocks(["# T", "", "| a |", "|---|", "| 1 |", "", "Text."])]
+    ['front', 'table', 'text']
+    >>> [kind for kind, _ in blocks(["# T", "## S", "", "**Prepared: May 1**", "", "---", "Text."])]
+    ['front', 'rule', 'text']
+    >>> [kind for kind, _ in blocks(["Run:", "```bash", "ptax lookup 4807", "", "# not a heading", "```", "Done."])]
+    ['text', 'code', 'text']
+    """
+    kind, block = None, []
+    first = True
+    gap = closing = False   # in the front matter: a blank line seen; a Prepared/Deadline line seen
+    for line in lines:
+        line = line.rstrip("\r\n")
+        stripped = line.strip()
+        if kind == "code":
+            block.append(line)
+            if stripped.startswith(fence):
+                yield kind, tuple(block)
+                kind, block = None, []
+            continue
+        if kind == "front":
+            if not stripped and not closing:
+                gap = True
+                block.append(line)
+                continue
+            if stripped.startswith(("## ", "### ")) and not (gap or closing):
+                block.append(line)
+                continue
+            if stripped and _FRONT_LINE.fullmatch(strip(stripped)):
+                closing = True
+                block.append(line)
+                continue
+        elif first and stripped:
+            first = False
+            if stripped.startswith("# "):
+                kind, block = "front", [line]
+                continue
+        fence = _FENCE.match(stripped)
+        if fence:
+            fence = fence.group()
+            new = "code"
+        elif _RULE.fullmatch(stripped):
+            new = "rule"
+        elif stripped.startswith("#"):
+            new = "heading"
+        elif stripped.startswith("|"):
+            new = "table"
+        elif _LIST_ITEM.match(line) or (kind == "list" and line.startswith(" ") and stripped):
+            new = "list"
+        elif stripped:
+            new = "text"
+        else:
+            new = None
+        if block and (new != kind or new in ("heading", "rule", "code")):
+            yield kind, tuple(block)
+            block = []
+        kind = new
+        if new:
+            block.append(line)
+    if block:
+        yield kind, tuple(block)
+
+
+def _front(pdf, subject, subtitle, years, prepared, deadline):
+    pdf.subject = subject
+    pdf.title_block(subtitle, years, prepared)
+    if deadline:
+        pdf.deadline_box(f"APPEAL DEADLINE: {deadline}")
+
+
+def _table(pdf, headers, rows):
+    """add_table with each column as wide as its widest entry, scaled to the page."""
+    header_widths = pdf.text_widths("B", 8, headers)
+    widths = pdf.text_widths("", 8, {v for row in rows for v in row})
+    natural = [max([header_widths[h]] + [widths[row[i]] for row in rows]) + 2 * pdf.c_margin
+               for i, h in enumerate(headers)]
+    available = pdf.w - pdf.l_margin - pdf.r_margin
+    pdf.add_table(headers, rows, [w * available / sum(natural) for w in natural])
+
+
+def _item(pdf, text, number=None):
+    """One list item: a **Label:** opening it is its bold prefix."""
+    prefix = ""
+    m = _LEADING_BOLD.fullmatch(text)
+    if m:
+        prefix, text = strip(m.group(1)) + m.group(2) + " ", m.group(3)
+    markdown = _has_emphasis(text)
+    text = inline(text) if markdown else strip(text)
+    if number is None:
+        pdf.bullet(text, bold_prefix=prefix, markdown=markdown)
+    else:
+        pdf.numbered_item(number, prefix, text, markdown=markdown)
+
+
+def _cells(line):
+    return [cell.strip() for cell in line.strip().strip("|").split("|")]
+
+
+def parse(kind, lines):
+    """The AnalysisPDF calls that draw one block, as (function, args) pairs."""
+    if kind == "rule":
+        return ()
+    if kind == "front":
+        found = {}
+        for line in lines:
+            text = line.strip()
+            if text.startswith("### "):
+                found["years"] = tuple(int(y) for y in re.findall(r"\b\d{4}\b", text))
+            elif text.startswith("## "):
+                found["subtitle"] = strip(text[3:])
+            elif text:
+                m = _FRONT_LINE.fullmatch(strip(text))
+                if m:
+                    found["deadline" if m.group(1) else "prepared"] = m.group(2)
+        subtitle = found.get("subtitle", strip(lines[0].lstrip("#")))
+        return ((_front, (subtitle.split(",")[0], subtitle, found.get("years", ()), found.get("prepared", ""),
+                          found.get("deadline"))),)
+    if kind == "code":
+        end = -1 if len(lines) > 1 and _FENCE.match(lines[-1].strip()) else len(lines)
+        return ((AnalysisPDF.code_block, (tuple(plain(line.rstrip()) for line in lines[1:end]),)),)
+    if kind == "heading":
+        level = len(lines[0]) - len(lines[0].lstrip("#"))
+        text = strip(lines[0].lstrip("#"))
+        if level <= 3:
+            return ((AnalysisPDF.section_heading, (text, max(1, level - 1))),)
+        return ((AnalysisPDF.bold_text, (text,)),)
+    if kind == "table":
+        rows = [_cells(line) for line in lines if not _TABLE_SEPARATOR.fullmatch(line.strip())]
+        headers = [strip(h) for h in rows[0]]
+        body = [[strip(v) for v in row] + [""] * (len(headers) - len(row)) for row in rows[1:]]
+        return ((_table, (headers, [row[:len(headers)] for row in body])),)
+    if kind == "list":
+        calls = []
+        for line in lines:
+            m = _LIST_ITEM.match(line)
+            if not m:
+                continue
+            indent, number, text = m.groups()
+            if number and not indent:
+                if calls:
+                    calls.append((AnalysisPDF.ln, (1,)))
+                calls.append((_item, (text, number)))
+            else:
+                calls.append((_item, (text,)))
+        calls.append((AnalysisPDF.ln, (1 if _LIST_ITEM.match(lines[0]).group(2) else 3,)))
+        return tuple(calls)
+    text = " ".join(line.strip() for line in lines)
+    emphasised = _emphasised(text)
+    if emphasised:
+        style, text = emphasised
+        return (({"B": AnalysisPDF.bold_text, "I": AnalysisPDF.italic_text}[style], (strip(text),)),)
+    if _has_emphasis(text):
+        return ((AnalysisPDF.body_text, (inline(text), True)),)
+    return ((AnalysisPDF.body_text, (strip(text),)),)
+
+
+class MarkdownRenderer:
+    """Draws Markdown files, keeping every block it has parsed for the next render.
+
+    After each render, parsed and reused count the blocks that were parsed
+    afresh and those taken from earlier renders.
+    """
+
+    def __init__(self):
+        self._parsed = {}
+        self.parsed = self.reused = 0
+
+    def calls(self, kind, lines):
+        key = (kind, lines)
+        if key in self._parsed:
+            self.reused += 1
+        else:
+            self._parsed[key] = parse(kind, lines)
+            self.parsed += 1
+        return self._parsed[key]
+
+    def render(self, lines, output):
+        """Draw the Markdown lines (an open file, or any iterable of lines) and write the PDF atomically."""
+        self.parsed = self.reused = 0
+        seen = set()
+        pdf = AnalysisPDF()
+        pdf.alias_nb_pages()
+        pdf.set_auto_page_break(auto=True, margin=20)
+        pdf.add_page()
+        for kind, block in blocks(lines):
+            seen.add((kind, block))
+            for function, args in self.calls(kind, block):
+                function(pdf, *args)
+        # Blocks that are gone from the file will not come back as they were.
+        for key in set(self._parsed) - seen:
+            del self._parsed[key]
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        tmp = output + ".tmp"
+        pdf.output(tmp)
+        os.replace(tmp, output)
+        return output
+
+
+def render_markdown(path, output=None, renderer=None):
+    """Draw the Markdown file at path as an analysis PDF; returns the path written."""
+    output = output or os.path.splitext(path)[0] + ".pdf"
+    with open(path, encoding="utf-8") as f:
+        return (renderer or MarkdownRenderer()).render(f, output)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pittsfield_tax.reports.markdown",
+                                     description="Draw an analysis Markdown file as an appeal-analysis PDF.")
+    parser.add_argument("path", metavar="FILE.md", help="the analysis Markdown")
+    parser.add_argument("--output", help="PDF path (default: FILE.pdf)")
+    parser.add_argument("--watch", action="store_true", help="render again every time FILE.md changes")
+    args = parser.parse_args(argv)
+
+    renderer = MarkdownRenderer()
+    modified = None
+    while True:
+        start = time.perf_counter()
+        modified = os.stat(args.path).st_mtime_ns
+        output = render_markdown(args.path, args.output, renderer)
+        print(f"Wrote {output} ({renderer.parsed} blocks parsed, {renderer.reused} reused, "
+              f"{time.perf_counter() - start:.2f}s)")
+        if not args.watch:
+            return 0
+        try:
+            while os.stat(args.path).st_mtime_ns == modified:
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
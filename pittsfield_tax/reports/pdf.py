@@ -0,0 +1,254 @@
+"""The PDF document class of the appeal-analysis reports."""
+from fpdf import FPDF
+
+
+class AnalysisPDF(FPDF):
+    """A4 report pages with the appeal analyses' headings, body text, bullets and tables.
+
+    `subject` (e.g. "Meadows of Arbor Ridge (AR-4)") is named in the running
+    header of every page after the first. With markdown=True, body_text,
+    bullet and numbered_item text may carry FPDF's **bold** and __italic__
+    markers.
+    """
+
+    def __init__(self, subject="", *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.subject = subject
+
+    def header(self):
+        if self.page_no() > 1:
+            self.set_font("Helvetica", "I", 8)
+            self.set_text_color(128, 128, 128)
+            title = "Comprehensive Tax Appeal Analysis"
+            self.cell(0, 5, f"{title} - {self.subject}" if self.subject else title, align="R")
+            self.ln(6)
+
+    def footer(self):
+        self.set_y(-15)
+        self.set_font("Helvetica", "I", 8)
+        self.set_text_color(128, 128, 128)
+        self.cell(0, 10, f"Page {self.page_no()}/{{nb}}", align="C")
+
+    def section_heading(self, text, level=1):
+        if level == 1:
+            self.ln(4)
+            self.set_font("Helvetica", "B", 13)
+            self.set_text_color(0, 51, 102)
+            self.cell(0, 8, text, new_x="LMARGIN", new_y="NEXT")
+            self.set_draw_color(0, 51, 102)
+            self.line(self.l_margin, self.get_y(), self.w - self.r_margin, self.get_y())
+            self.ln(4)
+        elif level == 2:
+            self.ln(3)
+            self.set_font("Helvetica", "B", 11)
+            self.set_text_color(0, 51, 102)
+            self.cell(0, 7, text, new_x="LMARGIN", new_y="NEXT")
+            self.ln(2)
+        self.set_text_color(0, 0, 0)
+
+    def body_text(self, text, markdown=False):
+        self.set_font("Helvetica", "", 10)
+        self.set_text_color(0, 0, 0)
+        self.multi_cell(0, 5.5, text, markdown=markdown)
+        self.ln(2)
+
+    def bold_text(self, text):
+        self.set_font("Helvetica", "B", 10)
+        self.set_text_color(0, 0, 0)
+        self.multi_cell(0, 5.5, text)
+        self.ln(2)
+
+    def italic_text(self, text):
+        self.set_font("Helvetica", "I", 10)
+        self.set_text_color(0, 0, 0)
+        self.multi_cell(0, 5.5, text)
+        self.ln(2)
+
+    def code_block(self, lines):
+        """Lines of code or commands, verbatim in Courier on a shaded band."""
+        self.set_font("Courier", "", 8.5)
+        self.set_text_color(0, 0, 0)
+        with self.local_context(fill_color=(242, 242, 242)):
+            for line in lines:
+                self.multi_cell(0, 4.5, line, fill=True, new_x="LMARGIN", new_y="NEXT")
+        self.ln(2)
+
+    def bullet(self, text, bold_prefix="", markdown=False):
+        self.set_font("Helvetica", "", 10)
+        indent = self.l_margin + 5
+        self.cell(5, 5.5, "-")
+        if bold_prefix:
+            self.set_font("Helvetica", "B", 10)
+            w = self.get_string_width(bold_prefix) + 1
+            self.cell(w, 5.5, bold_prefix)
+            self.set_font("Helvetica", "", 10)
+            indent += w
+        remaining = self.w - self.get_x() - self.r_margin
+        if remaining < 20:
+            self.ln()
+            self.set_x(indent)
+        self.multi_cell(0, 5.5, text, markdown=markdown, new_x="LMARGIN", new_y="NEXT")
+
+    def numbered_item(self, num, bold_prefix, text, markdown=False):
+        self.set_font("Helvetica", "B", 10)
+        prefix = f"{num}. {bold_prefix}"
+        self.cell(self.get_string_width(prefix) + 2, 5.5, prefix)
+        self.set_font("Helvetica", "", 10)
+        self.multi_cell(0, 5.5, text, markdown=markdown)
+        self.ln(1)
+
+    def add_table(self, headers, rows, col_widths=None, font_size=8):
+        if col_widths is None:
+            available = self.w - self.l_margin - self.r_margin
+            col_widths = [available / len(headers)] * len(headers)
+
+        # Header
+        self.set_font("Helvetica", "B", font_size)
+        self.set_fill_color(0, 51, 102)
+        self.set_text_color(255, 255, 255)
+        for i, h in enumerate(headers):
+            self.cell(col_widths[i], 6, h, border=1, fill=True, align="C")
+        self.ln()
+
+        # Rows
+        self.set_text_color(0, 0, 0)
+        self.set_font("Helvetica", "", font_size)
+        for r_idx, row in enumerate(rows):
+            fill = r_idx % 2 == 0
+            if fill:
+                self.set_fill_color(240, 245, 255)
+            for i, val in enumerate(row):
+                align = "L" if i == 0 else "C"
+                self.cell(col_widths[i], 5.5, val, border=1, fill=fill, align=align)
+            self.ln()
+        self.ln(3)
+
+    def bulk_table(self, headers, rows, col_widths=None, font_size=8, aligns=None):
+        """A table of any length, drawn a page at a time, with the header row repeated on every page.
+
+        Looks like add_table, but each page's rows are drawn as a grid, the
+        shaded rows and the text placed at measured offsets, instead of a
+        cell() call per cell, and every distinct string is measured once.
+        Without col_widths, columns are sized to their widest entry and
+        scaled to the page width. aligns is one of "L", "C", "R" per column
+        for the rows (default: first column left, the rest centred); headers
+        are centred.
+        """
+        rows = [["" if v is None else str(v) for v in row] for row in rows]
+        available = self.w - self.l_margin - self.r_margin
+        header_widths = self.text_widths("B", font_size, headers)
+        widths = self.text_widths("", font_size, {v for row in rows for v in row})
+        if col_widths is None:
+            natural = [max([header_widths[h]] + [widths[row[i]] for row in rows]) + 2 * self.c_margin
+                       for i, h in enumerate(headers)]
+            col_widths = [w * available / sum(natural) for w in natural]
+        if aligns is None:
+            aligns = ["L"] + ["C"] * (len(headers) - 1)
+        header_height, row_height = 6, 5.5
+        if self.y + header_height + row_height > self.page_break_trigger:
+            self.add_page()
+
+        done = 0
+        while True:
+            self._table_block([headers], col_widths, ["C"] * len(headers), header_height, "B", font_size, header_widths,
+                              (0, 51, 102), (255, 255, 255), first_shaded=0)
+            fit = max(1, int((self.page_break_trigger - self.y) // row_height))
+            page = rows[done:done + fit]
+            self._table_block(page, col_widths, aligns, row_height, "", font_size, widths,
+                              (240, 245, 255), (0, 0, 0), first_shaded=done % 2)
+            done += len(page)
+            if done >= len(rows):
+                break
+            self.add_page()
+        self.set_font("Helvetica", "", font_size)
+        self.set_text_color(0, 0, 0)
+        self.set_x(self.l_margin)
+        self.ln(3)
+
+    def text_widths(self, style, font_size, texts):
+        """{text: width} in the given Helvetica style and size.
+
+        The core fonts are neither kerned nor shaped, so a text is as wide as
+        its characters, and each distinct character is measured once.
+        """
+        texts = set(texts)
+        self.set_font("Helvetica", style, font_size)
+        chars = {c: self.get_string_width(c) for c in set().union(*texts)}
+        return {t: sum(chars[c] for c in t) for t in texts}
+
+    def _table_block(self, rows, col_widths, aligns, height, style, font_size, widths, fill, text,
+                     first_shaded):
+        """Draw rows at the current position with rect, line and text and move below them.
+
+        Rows first_shaded, first_shaded + 2, ... are filled with fill. The
+        text is placed from the measured widths, so no cell is measured or
+        laid out again. The colours are set in a local context and do not
+        leak into the document's own drawing state.
+        """
+        if not rows:
+            return
+        self.set_font("Helvetica", style, font_size)
+        x0, y0 = self.l_margin, self.y
+        right = x0 + sum(col_widths)
+        bottom = y0 + height * len(rows)
+        with self.local_context(fill_color=fill):
+            for r in range(first_shaded, len(rows), 2):
+                self.rect(x0, y0 + r * height, right - x0, height, style="F")
+        for r in range(len(rows) + 1):
+            self.line(x0, y0 + r * height, right, y0 + r * height)
+        x = x0
+        for w in [0] + col_widths:
+            x += w
+            self.line(x, y0, x, bottom)
+        # Text is painted in the fill colour; with the two alike, text() sets no colour per string.
+        with self.local_context(fill_color=text, text_color=text):
+            baseline = 0.5 * height + 0.3 * self.font_size
+            for r, row in enumerate(rows):
+                y = y0 + r * height + baseline
+                x = x0
+                for value, w, align in zip(row, col_widths, aligns):
+                    if value:
+                        if align == "L":
+                            dx = self.c_margin
+                        elif align == "R":
+                            dx = w - self.c_margin - widths[value]
+                        else:
+                            dx = (w - widths[value]) / 2
+                        self.text(x + dx, y, value)
+                    x += w
+        self.set_y(bottom)
+
+    def title_block(self, subtitle, years, prepared):
+        """The first page's title, subject line, data years and preparation date."""
+        self.set_font("Helvetica", "B", 18)
+        self.set_text_color(0, 51, 102)
+        self.cell(0, 10, "Comprehensive Property Tax", align="C", new_x="LMARGIN", new_y="NEXT")
+        self.cell(0, 10, "Appeal Analysis", align="C", new_x="LMARGIN", new_y="NEXT")
+        self.ln(2)
+        self.set_font("Helvetica", "", 13)
+        self.set_text_color(80, 80, 80)
+        self.cell(0, 7, subtitle, align="C", new_x="LMARGIN", new_y="NEXT")
+        self.set_font("Helvetica", "", 11)
+        self.cell(0, 7, f"Based on Township Assessment Data: {', '.join(map(str, years))}", align="C",
+                  new_x="LMARGIN", new_y="NEXT")
+        self.ln(4)
+        self.set_font("Helvetica", "B", 10)
+        self.set_text_color(0, 0, 0)
+        self.cell(0, 6, f"Prepared: {prepared}", align="C", new_x="LMARGIN", new_y="NEXT")
+
+    def deadline_box(self, text):
+        self.ln(3)
+        self.set_fill_color(255, 235, 235)
+        self.set_draw_color(180, 0, 0)
+        self.set_font("Helvetica", "B", 12)
+        self.set_text_color(180, 0, 0)
+        y = self.get_y()
+        self.rect(self.l_margin, y, self.w - self.l_margin - self.r_margin, 10, style="DF")
+        self.cell(0, 10, text, align="C", new_x="LMARGIN", new_y="NEXT")
+        self.set_text_color(0, 0, 0)
+        self.ln(4)
+
+    def footnote(self, text):
+        self.set_font("Helvetica", "I", 8)
+        self.cell(0, 5, text, new_x="LMARGIN", new_y="NEXT")
+        self.ln(2)
@@ -0,0 +1,219 @@
+"""A local, read-only JSON service over the converted study books.
+
+python -m pittsfield_tax.server [--host HOST] [--port PORT] [--cache-size N]
+                                [--bootstrap N] [--seed S] [--snapshot PATH]
+
+    GET /parcel/PARCEL          the parcel's address, ECF area and every sales,
+                                ECF and land row (ptax lookup --json)
+    GET /comps/PARCEL?k=K       its K nearest comparables (default 5)
+    GET /area/CODE              the area summary: subdivisions, parcel count,
+                                the latest arm's-length sales, the trend lines
+                                and the ratio statistics of every study year
+    GET /area/CODE/trend        the trend lines alone (ptax trend --json)
+    GET /area/CODE/ratios       the ratio statistics alone
+    GET /stats                  requests served and the area cache's hits,
+                                misses and size
+
+PARCEL may be an address (URL-quoted, "/parcel/4807%20Paulina%20Dr") and
+CODE a parcel or address in the area, as ptax takes them. A PARCEL that
+matches no parcel is a 404; one that matches several ("/parcel/paulina")
+is a 300 whose "parcels" lists their numbers.
+
+Everything is loaded once at startup: the ptax snapshot (rebuilt first if a
+CSV changed, see snapshot.py), its address index and the ratio study's
+sales. Parcel and comparable answers are read off the snapshot. An area summary needs a
+bootstrap ratio study of the area's sales, so the encoded JSON of each is
+kept in an LRU cache of --cache-size areas; /stats reports its hits and
+misses. The server is a ThreadingHTTPServer speaking HTTP/1.1 keep-alive,
+and logs nothing per request. It binds to 127.0.0.1 unless told otherwise;
+it is meant for a local tool or notebook, not the open network.
+"""
+import argparse
+import functools
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from pittsfield_tax.parcels import format_parcel
+from pittsfield_tax.ptax import (
+    address_index, area_record, comp_records, find_area, find_parcels, parcel_record, trend_records,
+)
+from pittsfield_tax.snapshot import DEFAULT_SNAPSHOT_PATH, SNAPSHOT_COMPS, load_snapshot
+
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_SIZE = 64
+# Fewer replicates than the ratio study's own default: a cold area answers in milliseconds.
+DEFAULT_BOOTSTRAP = 200
+AREA_SALES = 10
+
+
+def _number(value):
+    """A NumPy statistic as JSON: a float rounded for reading, or null for NaN."""
+    value = float(value)
+    return None if value != value else round(value, 4)
+
+
+def _encode(value):
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+class Lookup:
+    """The loaded snapshot and ratio sample, and the JSON answers drawn from them."""
+
+    def __init__(self, snapshot, sample, cache_size=DEFAULT_CACHE_SIZE, replicates=DEFAULT_BOOTSTRAP,
+                 seed=0):
+        self.snapshot = snapshot
+        self.addresses = address_index(snapshot)
+        self.replicates = replicates
+        self.seed = seed
+        self.requests = 0
+        self._lock = threading.Lock()
+        # The ratio sample's sales per area, as make_sample() takes them.
+        self._sales = {}
+        for i, g in enumerate(sample.group):
+            year, area = sample.keys[g]
+            sales = self._sales.setdefault(area, ([], [], [], []))
+            for column, value in zip(sales, (year, area, sample.assessed[i], sample.price[i])):
+                column.append(value)
+        self.area_summary = functools.lru_cache(maxsize=cache_size)(self._area_summary)
+
+    def ratios(self, code):
+        """The area's ratio statistics per study year, with bootstrap intervals."""
+        from pittsfield_tax.ratio_study import IAAO_RANGES, STATISTICS, make_sample, study
+
+        if code not in self._sales:
+            return []
+        result = study(make_sample(*self._sales[code]), self.replicates, seed=self.seed)
+        lines = []
+        for i, (year, _) in enumerate(result.keys):
+            line = {"year": year, "sales": int(result.count[i])}
+            for name in STATISTICS:
+                value = _number(getattr(result, name)[i])
+                line[name] = value
+                if name in result.intervals:
+                    line[name + "_interval"] = [_number(bound[i]) for bound in result.intervals[name]]
+                if name in IAAO_RANGES and value is not None:
+                    low, high = IAAO_RANGES[name]
+                    line[name + "_within_iaao"] = low <= value <= high
+            lines.append(line)
+        return lines
+
+    def _area_summary(self, code):
+        """The encoded JSON of an area's summary; wrapped in the LRU cache as area_summary."""
+        summary = area_record(self.snapshot, code, AREA_SALES)
+        summary["trend"] = trend_records(self.snapshot, code)
+        summary["ratios"] = self.ratios(code)
+        return _encode(summary)
+
+    def count(self):
+        with self._lock:
+            self.requests += 1
+
+    def stats(self):
+        info = self.area_summary.cache_info()
+        return {"requests": self.requests, "area_cache": {
+            "hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}}
+
+    def answer(self, path, query):
+        """(status, encoded JSON) for a request path and its parsed query string."""
+        parts = [unquote(p) for p in path.split("/") if p]
+        if parts == ["stats"]:
+            return 200, _encode(self.stats())
+        if len(parts) > 1 and not parts[1].strip():
+            return 400, _encode({"error": "empty parcel, address or area"})
+        if len(parts) == 2 and parts[0] in ("parcel", "comps"):
+            keys = find_parcels(self.snapshot, parts[1], self.addresses)
+            if not keys:
+                return 404, _encode({"error": f"{parts[1]}: no such parcel"})
+            if len(keys) > 1:
+                return 300, _encode({"error": f"{parts[1]}: matches {len(keys)} parcels",
+                                     "parcels": [format_parcel(key) for key in keys]})
+            key = keys[0]
+            if parts[0] == "parcel":
+                return 200, _encode(parcel_record(self.snapshot, key))
+            try:
+                k = max(0, min(int(query.get("k", ["5"])[0]), SNAPSHOT_COMPS))
+            except ValueError:
+                return 400, _encode({"error": "k must be a whole number"})
+            return 200, _encode({"parcel": format_parcel(key), "k": k,
+                                 "comps": comp_records(self.snapshot, key, k)})
+        if parts and parts[0] == "area" and len(parts) in (2, 3):
+            code = find_area(self.snapshot, parts[1], self.addresses)
+            if code is None:
+                return 404, _encode({"error": f"{parts[1]}: no such ECF area"})
+            if len(parts) == 2:
+                return 200, self.area_summary(code)
+            if parts[2] == "trend":
+                return 200, _encode(trend_records(self.snapshot, code))
+            if parts[2] == "ratios":
+                return 200, _encode(json.loads(self.area_summary(code))["ratios"])
+        return 404, _encode({"error": f"no such resource: {path}"})
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body leave in one buffered write (flushed after each request),
+    # with Nagle off: two small writes per answer would stall keep-alive clients
+    # on delayed ACKs, 40ms a request.
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    lookup = None   # set by serve()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        self.lookup.count()
+        try:
+            status, body = self.lookup.answer(url.path, parse_qs(url.query))
+        except Exception as e:     # one bad answer must not take the connection's thread down
+            status, body = 500, _encode({"error": f"{type(e).__name__}: {e}"})
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(lookup, host="127.0.0.1", port=DEFAULT_PORT):
+    """A ThreadingHTTPServer answering from lookup; call serve_forever() on it."""
+    handler = type("Handler", (Handler,), {"lookup": lookup})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pittsfield_tax.server",
+                                     description="Serve parcel, area and comparable lookups as JSON.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to bind (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port (default {DEFAULT_PORT})")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE, metavar="N",
+                        help=f"area summaries kept (default {DEFAULT_CACHE_SIZE})")
+    parser.add_argument("--bootstrap", type=int, default=DEFAULT_BOOTSTRAP, metavar="N",
+                        help=f"bootstrap replicates of an area's ratio study (default {DEFAULT_BOOTSTRAP})")
+    parser.add_argument("--seed", type=int, default=0, help="bootstrap seed (default 0)")
+    parser.add_argument("--snapshot", default=DEFAULT_SNAPSHOT_PATH,
+                        help="snapshot file (default analysis/ptax.snapshot)")
+    args = parser.parse_args(argv)
+
+    from pittsfield_tax.ratio_study import load_sample
+
+    lookup = Lookup(load_snapshot(args.snapshot), load_sample(), args.cache_size, args.bootstrap, args.seed)
+    server = serve(lookup, args.host, args.port)
+    print(f"Serving {len(lookup.snapshot['parcels'])} parcels, {len(lookup.snapshot['areas'])} areas "
+          f"on http://{args.host}:{server.server_port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""A prebuilt binary snapshot of what the ptax query tool answers from.
+
+The snapshot (analysis/ptax.snapshot) holds, ready to print:
+
+    parcels    parcel key -> (address, ECF area)
+    addresses  normalized address (addresses.normalize_address) -> [parcel keys]
+    history    parcel key -> its sales, ECF and land rows, a few columns each
+    areas      ECF area -> (subdivision names, number of parcels)
+    sales      ECF area -> its arm's-length sales, newest first
+    trend      ECF area -> one line per study year: the Ave. E.C.F. line
+               (the one nearest the recomputed mean when the book prints
+               several) and how many were printed, the recomputed mean
+               ECF and its row count, the arm's-length sales, their
+               median price, and the land adjustment factor
+    comps      parcel key -> its nearest comparables (comps.CompIndex)
+
+It is written with marshal, which loads in a few milliseconds, and keeps
+the size and modification time of every CSV it was built from.
+load_snapshot() checks those and rebuilds the snapshot when a CSV has
+changed; loading a current snapshot imports nothing beyond the standard
+library, and building one imports the table readers and NumPy but never
+pdfplumber, fpdf or python-docx. Dates are ISO strings and money whole
+dollars.
+"""
+import marshal
+import os
+
+from pittsfield_tax.paths import ANALYSIS_DIR, REPO_ROOT
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(ANALYSIS_DIR, "ptax.snapshot")
+# Bump when the snapshot's contents change shape.
+SNAPSHOT_VERSION = 2
+SNAPSHOT_COMPS = 10
+
+# The columns of each table a parcel's history keeps.
+HISTORY_FIELDS = {
+    "sales": ("Sale_Date", "Adj_Sale", "Terms_of_Sale", "Asd_When_Sold"),
+    "ecf": ("Sale_Date", "Adj_Sale", "Bldg_Residual", "Cost_Man", "ECF"),
+    "land": ("Sale_Date", "Adj_Sale", "Land_Value_Prior", "Land_Value_Current"),
+}
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def _plain(value):
+    """A typed CSV value as marshal stores it: dates as ISO strings."""
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def _area_of(table, row):
+    return row.get("ECF_Area") if table != "ecf" else row.get("ECF_Area_Code")
+
+
+def build_snapshot():
+    """The snapshot of the current CSVs, as a dict of plain values."""
+    import statistics
+
+    from pittsfield_tax.addresses import normalize_address
+    from pittsfield_tax.comps import CompIndex, building_style
+    from pittsfield_tax.dataset import load
+    from pittsfield_tax.parcels import parcel_key
+    from pittsfield_tax.ratio_study import ARMS_LENGTH
+    from pittsfield_tax.tables import sources
+
+    found = sources()
+    parcels, history, names = {}, {}, {}
+    sales, trend = {}, {}
+    for source in found:
+        table, year = source.table, source.year
+        rows = load(source).rows
+        if table == "ecf_summaries":
+            for row in rows:
+                names.setdefault(row["ECF_Area"], set()).add(row["Subdivision"])
+                line = trend.setdefault(row["ECF_Area"], {}).setdefault(year, {})
+                line.setdefault("summaries", []).append(row["Ave_ECF"])
+            continue
+        if table == "land_adjustments":
+            for row in rows:
+                line = trend.setdefault(row["Area_Code"], {}).setdefault(year, {})
+                line.setdefault("factor", row["Adjust_Factor"])
+            continue
+        for row in rows:
+            key = parcel_key(row["Parcel_Number"] or "")
+            area = _area_of(table, row)
+            if area and row.get("Subdivision"):
+                names.setdefault(area, set()).add(row["Subdivision"])
+            if key is None:
+                continue
+            # Later years, and within a year the later tables, win.
+            address, known = parcels.get(key, (None, None))
+            parcels[key] = (row["Street_Address"] or address, area or known)
+            history.setdefault(key, []).append(
+                (table, year) + tuple(_plain(row.get(field)) for field in HISTORY_FIELDS[table]))
+            if not area:
+                continue
+            line = trend.setdefault(area, {}).setdefault(year, {})
+            if table == "ecf" and row["Bldg_Residual"] is not None and row["Cost_Man"]:
+                line.setdefault("ecfs", []).append(row["Bldg_Residual"] / row["Cost_Man"])
+            if table == "sales" and row["Terms_of_Sale"] == ARMS_LENGTH and row["Adj_Sale"]:
+                line.setdefault("prices", []).append(row["Adj_Sale"])
+                # Each sale once, from the latest book that lists it.
+                sales.setdefault(area, {})[(key, _plain(row["Sale_Date"]))] = (
+                    _plain(row["Sale_Date"]), key, row["Street_Address"], row["Adj_Sale"], year)
+
+    counts = {}
+    for address, area in parcels.values():
+        counts[area] = counts.get(area, 0) + 1
+    addresses = {}
+    for key, (address, _) in parcels.items():
+        if address:
+            addresses.setdefault(normalize_address(address), []).append(key)
+
+    index = CompIndex(read=lambda source: load(source).rows)
+    nearest, distances = index.batch(SNAPSHOT_COMPS)
+    comps = {}
+    for s, key in enumerate(index.subject_keys):
+        comps[int(key)] = [
+            (int(index.sale_keys[i]), index.sales[i]["Street_Address"], index.sales[i]["year"],
+             index.sales[i]["Sale_Date"].isoformat(), index.sales[i]["Adj_Sale"], index.sales[i]["ECF_Area"],
+             building_style(index.sales[i]["Building_Style"]), round(float(d), 4))
+            for i, d in zip(nearest[s], distances[s])]
+
+    def trend_line(year, line):
+        ecfs, prices = line.get("ecfs", []), line.get("prices", [])
+        mean = statistics.fmean(ecfs) if ecfs else None
+        printed = [v for v in line.get("summaries", []) if v is not None]
+        ave = min(printed, key=lambda v: abs(v - mean)) if printed and mean is not None else \
+            (printed[0] if printed else None)
+        return (year, ave, len(printed), round(mean, 3) if mean is not None else None, len(ecfs),
+                len(prices), statistics.median(prices) if prices else None, line.get("factor"))
+
+    return {
+        "version": SNAPSHOT_VERSION,
+        "sources": [(os.path.relpath(s.path, REPO_ROOT),) + _stamp(s.path) for s in found],
+        "parcels": parcels,
+        "addresses": addresses,
+        "history": history,
+        "areas": {area: (sorted(names.get(area, ())), counts.get(area, 0))
+                  for area in set(names) | set(counts) | set(trend) if area},
+        "sales": {area: sorted(listed.values(), reverse=True) for area, listed in sales.items()},
+        "trend": {area: [trend_line(year, line) for year, line in sorted(years.items())]
+                  for area, years in trend.items()},
+        "comps": comps,
+    }
+
+
+def save_snapshot(snapshot, path=DEFAULT_SNAPSHOT_PATH):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        marshal.dump(snapshot, f)
+    os.replace(tmp, path)
+
+
+def read_snapshot(path=DEFAULT_SNAPSHOT_PATH):
+    """The saved snapshot, or None if it is missing, stale or from another version."""
+    try:
+        with open(path, "rb") as f:
+            snapshot = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+    for relpath, size, mtime in snapshot["sources"]:
+        try:
+            if _stamp(os.path.join(REPO_ROOT, relpath)) != (size, mtime):
+                return None
+        except OSError:
+            return None
+    return snapshot
+
+
+def load_snapshot(path=DEFAULT_SNAPSHOT_PATH):
+    """The snapshot, rebuilt and saved first if missing or stale."""
+    snapshot = read_snapshot(path)
+    if snapshot is None:
+        snapshot = build_snapshot()
+        save_snapshot(snapshot, path)
+    return snapshot
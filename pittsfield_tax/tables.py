@@ -0,0 +1,107 @@
+"""The converted CSVs as five tables spanning every study year.
+
+Each study book converts to a main CSV and, for ECF and land, a summary
+CSV; across years they form the tables
+
+    sales, ecf, ecf_summaries, land, land_adjustments
+
+Column names are harmonized across years: the land books' year-stamped
+Land_Value_<prior year> / Land_Value_<study year> columns become
+Land_Value_Prior / Land_Value_Current. Column types come from the layout
+specs (convert.columnar.field_kinds()).
+"""
+import csv
+import re
+from collections import namedtuple
+
+from pittsfield_tax.convert.columnar import (
+    DATE, MONEY, RATIO, field_kinds, parse_date, parse_money, parse_ratio, summary_kinds,
+)
+from pittsfield_tax.convert.engine import csv_path, summary_path
+from pittsfield_tax.convert.specs import registry
+
+SALES = "sales"
+ECF = "ecf"
+ECF_SUMMARIES = "ecf_summaries"
+LAND = "land"
+LAND_ADJUSTMENTS = "land_adjustments"
+TABLES = (SALES, ECF, ECF_SUMMARIES, LAND, LAND_ADJUSTMENTS)
+
+# The table each document type's summary CSV belongs to.
+SUMMARY_TABLES = {"ecf": ECF_SUMMARIES, "land": LAND_ADJUSTMENTS}
+
+# Columns holding an ECF / land area code, whatever a table calls it.
+AREA_FIELDS = ("ECF_Area", "ECF_Area_Code", "Area_Code")
+
+_YEAR_SUFFIX = re.compile(r"(.*)_(\d{4})$")
+_PARSERS = {MONEY: parse_money, RATIO: parse_ratio, DATE: parse_date}
+
+Source = namedtuple("Source", "table year path fields kinds")
+Source.__doc__ = """One CSV: its table, study year, path, CSV field -> column names, and column kinds."""
+
+
+def column_name(field, year):
+    """The harmonized column name of a CSV field in a given study year."""
+    m = _YEAR_SUFFIX.match(field)
+    if m is not None:
+        if int(m.group(2)) == year:
+            return m.group(1) + "_Current"
+        if int(m.group(2)) == year - 1:
+            return m.group(1) + "_Prior"
+    return field
+
+
+def _source(table, year, path, kinds):
+    fields = {field: column_name(field, year) for field in kinds}
+    return Source(table, year, path, fields,
+                  {fields[field]: kind for field, kind in kinds.items()})
+
+
+def spec_sources(spec):
+    """The Sources a layout spec converts to: its main CSV, then its summary CSV if any."""
+    found = [_source(spec.doc_type, spec.year, csv_path(spec), field_kinds(spec))]
+    if spec.summary is not None:
+        found.append(_source(SUMMARY_TABLES[spec.doc_type], spec.year, summary_path(spec),
+                             summary_kinds(spec)))
+    return found
+
+
+def sources(table=None, year=None):
+    """Source CSVs in (year, table) order, optionally only one table and/or year."""
+    found = []
+    for (_, spec_year), spec in registry().items():
+        if year is None or spec_year == year:
+            found += [s for s in spec_sources(spec) if table in (None, s.table)]
+    return sorted(found, key=lambda s: (s.year, TABLES.index(s.table)))
+
+
+def columns(table):
+    """Harmonized (column, kind) pairs of a table, in first-seen order across years."""
+    seen = {}
+    for source in sources(table):
+        for column, kind in source.kinds.items():
+            seen.setdefault(column, kind)
+    return list(seen.items())
+
+
+def read_rows(source):
+    """A source CSV's rows as dicts of harmonized columns holding typed values.
+
+    Money is int, ratios float, dates datetime.date; empty or unreadable
+    cells are None.
+    """
+    parsers = [(field, source.fields[field], _PARSERS.get(source.kinds[source.fields[field]]))
+               for field in source.fields]
+    rows = []
+    with open(source.path, newline="") as f:
+        for record in csv.DictReader(f):
+            row = {}
+            for field, column, parse in parsers:
+                value = record[field]
+                if not value:
+                    value = None
+                elif parse is not None:
+                    value = parse(value)
+                row[column] = value
+            rows.append(row)
+    return rows
@@ -0,0 +1,130 @@
+"""SQLite warehouse of every converted CSV.
+
+python -m pittsfield_tax.warehouse [--db PATH]
+
+Loads the sales, ECF, ECF summary, land and land adjustment CSVs of every
+study year into one database, one table per kind (tables.TABLES) with a
+`year` column. Money columns are INTEGER dollars, ratios REAL, and sale
+dates ISO "YYYY-MM-DD" text, so they compare and sort as dates. Rows with
+a parcel number also get the packed integer `parcel_key`
+(parcels.parcel_key()) and rows with an address `street_name`; both are
+indexed, as are the area code columns (with year) and Sale_Date.
+
+    SELECT s.*, e.ECF FROM sales s
+    JOIN ecf e ON e.parcel_key = s.parcel_key AND e.year = s.year
+    WHERE s.ECF_Area = 'AR-4' AND s.Terms_of_Sale LIKE '%ARM''S LENGTH'
+      AND s.Sale_Date >= '2023-01-01'
+
+The database is rebuilt from scratch into a temporary file and moved into
+place, so readers never see a half-built one.
+"""
+import argparse
+import os
+import sqlite3
+
+from pittsfield_tax.addresses import street_name
+from pittsfield_tax.convert.columnar import DATE, MONEY, RATIO
+from pittsfield_tax.parcels import parcel_key
+from pittsfield_tax.paths import ANALYSIS_DIR
+from pittsfield_tax.tables import AREA_FIELDS, TABLES, columns, read_rows, sources
+
+DEFAULT_DB = os.path.join(ANALYSIS_DIR, "pittsfield_tax.sqlite")
+
+_SQL_TYPES = {MONEY: "INTEGER", RATIO: "REAL", DATE: "TEXT"}
+
+
+def _quote(name):
+    return '"%s"' % name
+
+
+def _create_table(con, table, table_columns):
+    names = [name for name, _ in table_columns]
+    derived = []
+    if "Parcel_Number" in names:
+        derived.append("parcel_key")
+    if "Street_Address" in names:
+        derived.append("street_name")
+    definitions = ["year INTEGER NOT NULL"]
+    definitions += [f"{_quote(name)} {_SQL_TYPES.get(kind, 'TEXT')}" for name, kind in table_columns]
+    definitions += [f"{name} {'INTEGER' if name == 'parcel_key' else 'TEXT'}"
+                    for name in derived]
+    con.execute(f"CREATE TABLE {table} ({', '.join(definitions)})")
+    return names, derived
+
+
+def _create_indexes(con, table, names, derived):
+    indexed = [("parcel_key",)] if "parcel_key" in derived else []
+    indexed += [(name, "year") for name in names if name in AREA_FIELDS]
+    if "street_name" in derived:
+        indexed.append(("street_name",))
+    if "Sale_Date" in names:
+        indexed.append(("Sale_Date",))
+    for index_columns in indexed:
+        con.execute(f"CREATE INDEX {table}_{'_'.join(index_columns).lower()} "
+                    f"ON {table} ({', '.join(map(_quote, index_columns))})")
+
+
+def _load_table(con, table):
+    names, derived = _create_table(con, table, columns(table))
+    placeholders = ", ".join("?" * (1 + len(names) + len(derived)))
+    insert = f"INSERT INTO {table} VALUES ({placeholders})"
+    count = 0
+    for source in sources(table):
+        records = []
+        for row in read_rows(source):
+            record = [source.year]
+            for name in names:
+                value = row.get(name)
+                if hasattr(value, "isoformat"):
+                    value = value.isoformat()
+                record.append(value)
+            if "parcel_key" in derived:
+                record.append(parcel_key(row["Parcel_Number"] or ""))
+            if "street_name" in derived:
+                address = row["Street_Address"]
+                record.append(street_name(address) if address else None)
+            records.append(record)
+        con.executemany(insert, records)
+        count += len(records)
+    _create_indexes(con, table, names, derived)
+    return count
+
+
+def build(db_path=DEFAULT_DB):
+    """Rebuild the warehouse at db_path from the CSVs; returns {table: row count}."""
+    tmp = db_path + ".tmp"
+    if os.path.exists(tmp):
+        os.unlink(tmp)
+    con = sqlite3.connect(tmp)
+    try:
+        counts = {table: _load_table(con, table) for table in TABLES}
+        con.execute("ANALYZE")
+        con.commit()
+    except BaseException:
+        con.close()
+        os.unlink(tmp)
+        raise
+    con.close()
+    os.replace(tmp, db_path)
+    return counts
+
+
+def connect(db_path=DEFAULT_DB):
+    """A read-only connection to the warehouse whose rows can be read by column name."""
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"{db_path} does not exist; build it with "
+                                "python -m pittsfield_tax.warehouse")
+    con = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    con.row_factory = sqlite3.Row
+    return con
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m pittsfield_tax.warehouse",
+                                     description="Build the SQLite warehouse from the CSVs.")
+    parser.add_argument("--db", default=DEFAULT_DB,
+                        help="database path (default analysis/pittsfield_tax.sqlite)")
+    args = parser.parse_args()
+    for table, count in build(args.db).items():
+        print(f"Loaded {count} rows into {table}")
+    print(f"Wrote {args.db}")